@@ -9,6 +9,7 @@ from modutask.io.input import load_module_types, load_modules, load_robot_types
 from modutask.io.output import save_robot
 from modutask.optimizer.my_moo import *
 from modutask.optimizer.my_moo.core.encoding.configuration import ConfigurationVariable
+from modutask.optimizer.seeding import dependency_graph, heuristic_genomes, transfer_genome
 from modutask.io import *
 from modutask.core import *
 from modutask.simulator.simulation import Simulator
@@ -170,6 +171,7 @@ def main():
     """ロボット構成最適化の実行"""
     parser = argparse.ArgumentParser(description="Run the robotic system simulator.")
     parser.add_argument("--property_file", type=str, help="Path to the property file")
+    parser.add_argument("--resume", action="store_true", help="Resume each configuration from task_allocation.checkpoint_dir")
     args = parser.parse_args()
 
     try:
@@ -188,6 +190,8 @@ def main():
     next_modules = None
     next_tasks = None
     best_fitness = float("inf")
+    previous_genomes = []  # warm_start_previous の場合の直前の構成の非支配解
+    previous_robots = {}  # previous_genomes の優先順位の並び（直前の構成のロボット）
     for configuration_id in range(prop['configuration']['kmeans']):
         template = prop['results']['robot']
         robot_path = template.format(index=configuration_id)
@@ -220,20 +224,61 @@ def main():
         
         merged_task = tasks | additional_tasks
         items = sorted([item for item in merged_task.keys() if not str(item).startswith('assembly_')])
-        encoding = MultiPermutationVariable(items=items, n_multi=len(robots))
+        if prop['task_allocation'].get('respect_dependencies', False):
+            encoding = TopologicalMultiPermutationVariable(items=items, n_multi=len(robots), 
+                                                           dependencies=dependency_graph(merged_task, items))
+        elif prop['task_allocation'].get('priority_length') is not None:
+            encoding = TruncatedMultiPermutationVariable(items=items, n_multi=len(robots), 
+                                                         length=prop['task_allocation']['priority_length'])
+        else:
+            encoding = MultiPermutationVariable(items=items, n_multi=len(robots))
+
+        # 構成ごとにチェックポイントを分け、--resume で中断した構成から続きを実行する
+        checkpoint_dir = prop['task_allocation'].get('checkpoint_dir')
+        checkpointer = None
+        resume_from = None
+        if checkpoint_dir is not None:
+            checkpoint_dir = os.path.join(checkpoint_dir, f"configuration_{configuration_id:03}")
+            checkpointer = Checkpointer(checkpoint_dir, interval=prop['task_allocation'].get('checkpoint_interval', 10))
+            if args.resume and has_checkpoint(checkpoint_dir):
+                resume_from = checkpoint_dir
+
+        # initial_population（遺伝子の pickle・優先順位の YAML・チェックポイント）と直前の構成の非支配解を初期個体群に含める
+        # 直前の構成の優先順位は種類・モジュールが近いロボットに対応させ、残るタスクの違いは encoding.repair で修復される
+        initial_genomes = [transfer_genome(genome, previous_robots, robots) for genome in previous_genomes]
+        if prop['task_allocation'].get('initial_population'):
+            initial_genomes += load_initial_genomes(prop['task_allocation']['initial_population'], agent_names=list(robots))
+        if prop['task_allocation'].get('heuristic_seeding') is not None:
+            initial_genomes += heuristic_genomes(
+                merged_task, 
+                robots, 
+                items, 
+                population_size=prop['task_allocation']['population_size'], 
+                **prop['task_allocation']['heuristic_seeding'],
+                )
 
         algo = NSGAII(
             func=task_func,
             encoding=encoding,
             population_size=prop['task_allocation']['population_size'],
             generations=prop['task_allocation']['generations'],
+            evaluator=CachedEvaluator(SerialEvaluator(task_func), encoding),
+            checkpointer=checkpointer,
+            terminations=make_terminations(prop['task_allocation'].get('termination'), 
+                                           ref_point=prop['task_allocation'].get('hv_ref_point')),
+            initial_genomes=initial_genomes,
+            resume_from=resume_from,
         )
         start = time.time()
         algo.evolve()
         end = time.time()
         print(end - start)
+        print(f"Stopped at generation {algo.generation}: {algo.stop_reason}")
 
         nds = get_non_dominated_individuals(algo.get_result())
+        if prop['task_allocation'].get('warm_start_previous', False):
+            previous_genomes = [ind.genome for ind in nds]
+            previous_robots = robots
         for ind in nds:
             f1, f2, f3, local_modules, local_tasks = varidate_results(
                 ind.genome, 
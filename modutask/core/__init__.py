@@ -11,6 +11,8 @@ __all__ = [
     'Manufacture', 
     'Assembly', 
     'Charge',
+    'dependency_graph',
+    'topological_order',
     "PerformanceAttributes", 
     "Robot",
     "RobotState",
@@ -4,6 +4,7 @@ from .transport_module import TransportModule
 from .manufacture import Manufacture
 from .assembly import Assembly
 from .charge import Charge
+from .dependency import dependency_graph, topological_order
 
-__all__ = ['BaseTask', 'Transport', 'TransportModule', 'Manufacture', 'Assembly', 'Charge']
+__all__ = ['BaseTask', 'Transport', 'TransportModule', 'Manufacture', 'Assembly', 'Charge', 'dependency_graph', 'topological_order']
 
@@ -0,0 +1,31 @@
+from modutask.core.task.task import BaseTask
+from modutask.utils import raise_with_log
+
+def dependency_graph(tasks: dict[str, BaseTask], items: list[str]) -> dict[str, list[str]]:
+    """items 内のタスクについて、依存先（先に終える必要のあるタスク）の名前のリスト"""
+    item_set = set(items)
+    return {name: [dep.name for dep in tasks[name].task_dependency if dep.name in item_set] for name in items}
+
+def topological_order(tasks: dict[str, BaseTask], items: list[str]) -> list[str]:
+    """依存先が先に来る順序（同順位は items の順）"""
+    dependencies = dependency_graph(tasks, items)
+    order: list[str] = []
+    state: dict[str, int] = {}  # 1: 探索中, 2: 完了
+    for root in items:
+        stack = [(root, iter(dependencies[root]))]
+        while stack:
+            name, children = stack[-1]
+            if state.get(name) == 2:
+                stack.pop()
+                continue
+            state[name] = 1
+            child = next(children, None)
+            if child is None:
+                state[name] = 2
+                order.append(name)
+                stack.pop()
+            elif state.get(child) == 1:
+                raise_with_log(ValueError, f"Task dependency has a cycle: {child}.")
+            elif state.get(child) != 2:
+                stack.append((child, iter(dependencies[child])))
+    return order
@@ -1,6 +1,7 @@
 from .input import load_module_types, load_modules, load_risk_scenarios, load_robot_types, load_robots, load_simulation_map, load_task_dependency, load_task_priorities, load_tasks
 from .output import save_module_types, save_module, save_risk_scenarios, save_robot_types, save_robot, save_simulation_map, save_task_dependency, save_task_priorities, save_tasks
 from .clone import clone_module_types, clone_module, clone_risk_scenarios, clone_robots_types, clone_robots, clone_simulation_map, clone_task_priorities, clone_tasks
+from .snapshot import compile_model, restore_model, SharedModel, load_shared_model
 
 __all__ = [
     "load_module_types", 
@@ -29,4 +30,8 @@ __all__ = [
     "clone_simulation_map", 
     "clone_task_priorities", 
     "clone_tasks",
+    "compile_model",
+    "restore_model",
+    "SharedModel",
+    "load_shared_model",
 ]
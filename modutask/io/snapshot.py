@@ -0,0 +1,265 @@
+import pickle, struct
+from multiprocessing import shared_memory
+from typing import Any
+import numpy as np
+from modutask.core import *
+from modutask.utils.logger import raise_with_log
+
+_HEADER = struct.Struct("<QQ")  # (ペイロード長, バッファ数)
+_BUFFER_LENGTH = struct.Struct("<Q")
+
+def compile_model(modules: dict[str, Module], robots: dict[str, Robot], tasks: dict[str, BaseTask],
+                  combined_tasks: dict[str, BaseTask], risk_scenarios: dict[str, BaseRiskScenario],
+                  simulation_map: SimulationMap) -> dict[str, Any]:
+    """ 静的モデルを組み込み型とNumPy配列だけからなるピクル可能な形式に変換 """
+    module_types = {}
+    for module in modules.values():
+        module_types[module.type.name] = module.type.max_battery
+
+    robot_types = {}
+    for robot in robots.values():
+        robot_type = robot.type
+        robot_types[robot_type.name] = {
+            "required_modules": {module_type.name: num for module_type, num in robot_type.required_modules.items()},
+            "performance": {attr.name: value for attr, value in robot_type.performance.items()},
+            "power_consumption": robot_type.power_consumption,
+            "recharge_trigger": robot_type.recharge_trigger,
+        }
+        for module_type in robot_type.required_modules:
+            module_types[module_type.name] = module_type.max_battery
+
+    compiled_tasks = []
+    for task_name, task in combined_tasks.items():
+        data: dict[str, Any] = {
+            "class": type(task).__name__,
+            "name": task_name,
+            "coordinate": task.coordinate,
+            "total_workload": task.total_workload,
+            "completed_workload": task.completed_workload,
+            "required_performance": {attr.name: value for attr, value in task.required_performance.items()},
+            "task_dependency": [t.name for t in task.task_dependency],
+        }
+        if type(task) is Transport or type(task) is TransportModule:
+            data["origin_coordinate"] = task.origin_coordinate
+            data["destination_coordinate"] = task.destination_coordinate
+            data["transport_resistance"] = task.transport_resistance
+        if type(task) is TransportModule:
+            data["target_module"] = task._target_module.name
+        elif type(task) is Assembly:
+            data["target_robot"] = task.target_robot.name
+        elif type(task) not in (Transport, Manufacture):
+            raise_with_log(ValueError, f"Compile of {task.__class__} is not defined {task_name}.")
+        compiled_tasks.append(data)
+
+    compiled_scenarios = []
+    for scenario_name, scenario in risk_scenarios.items():
+        if type(scenario) is not ExponentialFailure:
+            raise_with_log(ValueError, f"Compile of {scenario.__class__} is not defined {scenario_name}.")
+        compiled_scenarios.append({
+            "class": type(scenario).__name__,
+            "name": scenario_name,
+            "failure_rate": scenario.failure_rate,
+            "seed": scenario.seed,
+        })
+
+    return {
+        "module_types": module_types,
+        "modules": {
+            "name": list(modules.keys()),
+            "type": [module.type.name for module in modules.values()],
+            "coordinate": np.array([module.coordinate for module in modules.values()], dtype=np.float64).reshape(-1, 2),
+            "battery": np.array([module.battery for module in modules.values()], dtype=np.float64),
+            "operating_time": np.array([module.operating_time for module in modules.values()], dtype=np.float64),
+            "state": [module.state.name for module in modules.values()],
+        },
+        "robot_types": robot_types,
+        "robots": [
+            {
+                "name": robot.name,
+                "robot_type": robot.type.name,
+                "coordinate": robot.coordinate,
+                "component": [module.name for module in robot.component_required],
+            }
+            for robot in robots.values()
+        ],
+        "tasks": list(tasks.keys()),
+        "combined_tasks": compiled_tasks,
+        "risk_scenarios": compiled_scenarios,
+        "charge_stations": [
+            {"name": name, "coordinate": station.coordinate, "charging_speed": station.charging_speed}
+            for name, station in simulation_map.charge_stations.items()
+        ],
+    }
+
+def restore_model(compiled: dict[str, Any]) -> dict[str, Any]:
+    """ compile_model の出力からモデルを再構築 """
+    module_types = {name: ModuleType(name=name, max_battery=max_battery)
+                    for name, max_battery in compiled["module_types"].items()}
+
+    data = compiled["modules"]
+    modules = {}
+    for i, name in enumerate(data["name"]):
+        modules[name] = Module(
+            module_type=module_types[data["type"][i]],
+            name=name,
+            coordinate=data["coordinate"][i],
+            battery=float(data["battery"][i]),
+            operating_time=float(data["operating_time"][i]),
+            state=ModuleState[data["state"][i]],
+        )
+
+    robot_types = {}
+    for name, data in compiled["robot_types"].items():
+        robot_types[name] = RobotType(
+            name=name,
+            required_modules={module_types[t]: num for t, num in data["required_modules"].items()},
+            performance={PerformanceAttributes[attr]: value for attr, value in data["performance"].items()},
+            power_consumption=data["power_consumption"],
+            recharge_trigger=data["recharge_trigger"],
+        )
+
+    robots = {}
+    for data in compiled["robots"]:
+        robots[data["name"]] = Robot(
+            robot_type=robot_types[data["robot_type"]],
+            name=data["name"],
+            coordinate=data["coordinate"],
+            component=[modules[module_name] for module_name in data["component"]],
+        )
+
+    combined_tasks: dict[str, BaseTask] = {}
+    for data in compiled["combined_tasks"]:
+        required_performance = {PerformanceAttributes[attr]: value for attr, value in data["required_performance"].items()}
+        if data["class"] == Transport.__name__:
+            task: BaseTask = Transport(
+                name=data["name"],
+                coordinate=data["coordinate"],
+                required_performance=required_performance,
+                origin_coordinate=data["origin_coordinate"],
+                destination_coordinate=data["destination_coordinate"],
+                transport_resistance=data["transport_resistance"],
+                total_workload=data["total_workload"],
+                completed_workload=data["completed_workload"],
+            )
+        elif data["class"] == TransportModule.__name__:
+            task = TransportModule(
+                name=data["name"],
+                coordinate=data["coordinate"],
+                required_performance=required_performance,
+                origin_coordinate=data["origin_coordinate"],
+                destination_coordinate=data["destination_coordinate"],
+                transport_resistance=data["transport_resistance"],
+                total_workload=data["total_workload"],
+                completed_workload=data["completed_workload"],
+                target_module=modules[data["target_module"]],
+            )
+        elif data["class"] == Manufacture.__name__:
+            task = Manufacture(
+                name=data["name"],
+                coordinate=data["coordinate"],
+                total_workload=data["total_workload"],
+                completed_workload=data["completed_workload"],
+                required_performance=required_performance,
+            )
+        elif data["class"] == Assembly.__name__:
+            task = Assembly(name=data["name"], robot=robots[data["target_robot"]])
+        else:
+            raise_with_log(ValueError, f"Restore of {data['class']} is not defined {data['name']}.")
+        combined_tasks[data["name"]] = task
+    for data in compiled["combined_tasks"]:
+        combined_tasks[data["name"]].initialize_task_dependency(
+            task_dependency=[combined_tasks[name] for name in data["task_dependency"]]
+        )
+    tasks = {name: combined_tasks[name] for name in compiled["tasks"]}
+
+    risk_scenarios: dict[str, BaseRiskScenario] = {}
+    for data in compiled["risk_scenarios"]:
+        risk_scenarios[data["name"]] = ExponentialFailure(name=data["name"], failure_rate=data["failure_rate"], seed=data["seed"])
+
+    charge_stations = {}
+    for data in compiled["charge_stations"]:
+        charge_stations[data["name"]] = Charge(name=data["name"], coordinate=data["coordinate"], charging_speed=data["charging_speed"])
+
+    return {
+        "modules": modules,
+        "robots": robots,
+        "tasks": tasks,
+        "combined_tasks": combined_tasks,
+        "risk_scenarios": risk_scenarios,
+        "simulation_map": SimulationMap(charge_stations=charge_stations),
+    }
+
+class SharedModel:
+    """
+    コンパイル済みモデルを共有メモリに配置する
+    NumPy配列はpickle protocol 5のアウトオブバンドバッファとして格納し、ワーカー側ではコピーせずに参照する
+    """
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self._shm = shm
+        self._owner = owner
+
+    @classmethod
+    def create(cls, compiled: dict[str, Any]) -> "SharedModel":
+        """ 共有メモリを確保してモデルを書き込む """
+        buffers: list[pickle.PickleBuffer] = []
+        payload = pickle.dumps(compiled, protocol=5, buffer_callback=buffers.append)
+        raws = [buffer.raw() for buffer in buffers]
+        size = _HEADER.size + len(payload) + sum(_BUFFER_LENGTH.size + raw.nbytes for raw in raws)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        _HEADER.pack_into(shm.buf, 0, len(payload), len(raws))
+        offset = _HEADER.size
+        shm.buf[offset:offset + len(payload)] = payload
+        offset += len(payload)
+        for raw in raws:
+            _BUFFER_LENGTH.pack_into(shm.buf, offset, raw.nbytes)
+            offset += _BUFFER_LENGTH.size
+            shm.buf[offset:offset + raw.nbytes] = raw
+            offset += raw.nbytes
+        for raw in raws:
+            raw.release()
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedModel":
+        """ 既存の共有メモリに接続 """
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def load(self) -> dict[str, Any]:
+        """ コンパイル済みモデルを読み出す（NumPy配列は共有メモリへの読み取り専用ビュー） """
+        view = self._shm.buf.toreadonly()
+        payload_length, n_buffers = _HEADER.unpack_from(view, 0)
+        offset = _HEADER.size
+        payload = view[offset:offset + payload_length]
+        offset += payload_length
+        buffers = []
+        for _ in range(n_buffers):
+            (length,) = _BUFFER_LENGTH.unpack_from(view, offset)
+            offset += _BUFFER_LENGTH.size
+            buffers.append(view[offset:offset + length])
+            offset += length
+        return pickle.loads(payload, buffers=buffers)
+
+    def close(self) -> None:
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self) -> "SharedModel":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+_attached_models: dict[str, tuple[SharedModel, dict[str, Any]]] = {}
+
+def load_shared_model(name: str) -> dict[str, Any]:
+    """ ワーカープロセスで共有メモリ上のモデルを復元（プロセスごとに一度だけ） """
+    if name not in _attached_models:
+        shared = SharedModel.attach(name)
+        _attached_models[name] = (shared, restore_model(shared.load()))
+    return _attached_models[name][1]
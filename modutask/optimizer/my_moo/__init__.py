@@ -1,19 +1,77 @@
-from .utils import dominates, get_non_dominated_individuals, select_kmeans_representatives
-from .rng_manager import get_rng, seed_rng
+from .utils import constrained_dominates, dominates, get_non_dominated_individuals, non_dominated_mask, select_kmeans_representatives
+from .constraint import ConstrainedObjective, ConstrainedObjectives, constraint_violation, dominated_objectives
+from .rng_manager import RNGService, get_rng, get_rng_service, seed_rng, use_rng
+from .evaluator import BaseEvaluator, SerialEvaluator, PoolEvaluator, CachedEvaluator
+from .broker import EvaluationBroker, SocketEvaluator, run_worker
+from .checkpoint import Checkpointer, has_checkpoint, load_checkpoint
+from .telemetry import BaseCallback, GenerationRecord, HypervolumeTracker, TelemetryWriter
+from .archive import ParetoArchive
+from .surrogate import SurrogateScreen
+from .racing import RacingEvaluator
+from .pruning import BoundPruningEvaluator
+from .local_search import LocalSearch, adjacent_swap, dependency_move
+from .warm_start import load_genomes, load_initial_genomes, load_priority_genome, save_genomes
+from .termination import BaseTermination, HypervolumeStagnation, MaxEvaluations, TimeLimit, make_terminations
 from .algorithms import *
 from .core import *
 
 __all__ = [
+    'constrained_dominates',
     'dominates',
     'get_non_dominated_individuals',
+    'non_dominated_mask',
     'select_kmeans_representatives',
+    'ConstrainedObjective',
+    'ConstrainedObjectives',
+    'constraint_violation',
+    'dominated_objectives',
+    'RNGService',
     'get_rng',
+    'get_rng_service',
     'seed_rng',
+    'use_rng',
+    'BaseEvaluator',
+    'SerialEvaluator',
+    'PoolEvaluator',
+    'CachedEvaluator',
+    'EvaluationBroker',
+    'SocketEvaluator',
+    'run_worker',
+    'Checkpointer',
+    'has_checkpoint',
+    'load_checkpoint',
+    'BaseCallback',
+    'GenerationRecord',
+    'HypervolumeTracker',
+    'TelemetryWriter',
+    'ParetoArchive',
+    'BaseTermination',
+    'HypervolumeStagnation',
+    'MaxEvaluations',
+    'TimeLimit',
+    'make_terminations',
+    'SurrogateScreen',
+    'RacingEvaluator',
+    'BoundPruningEvaluator',
+    'LocalSearch',
+    'adjacent_swap',
+    'dependency_move',
+    'load_genomes',
+    'load_initial_genomes',
+    'load_priority_genome',
+    'save_genomes',
     'IBEAHV',
+    'IslandModel',
+    'MOEAD',
     'NSGAII',
+    'NSGAIII',
+    'SteadyStateNSGAII',
     'Individual',
     'Population',
     'BaseVariable', 
     'PermutationVariable', 
     'MultiPermutationVariable',
+    'TopologicalMultiPermutationVariable',
+    'TruncatedMultiPermutationVariable',
+    'topological_repair',
     ]
@@ -1,7 +1,15 @@
 from .ibea import IBEAHV
+from .island import IslandModel
+from .moead import MOEAD
 from .nsgaii import NSGAII
+from .nsgaiii import NSGAIII
+from .ssnsgaii import SteadyStateNSGAII
 
 __all__ = [
     'IBEAHV',
-    'NSGAII'
+    'IslandModel',
+    'MOEAD',
+    'NSGAII',
+    'NSGAIII',
+    'SteadyStateNSGAII',
     ]
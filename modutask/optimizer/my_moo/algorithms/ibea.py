@@ -1,11 +1,20 @@
+import logging
+import time
 from copy import deepcopy
-from typing import Any, Callable
+from typing import Any, Callable, Optional
 import numpy as np
 from math import exp
 from pymoo.indicators.hv import HV
+from modutask.optimizer.my_moo.checkpoint import Checkpointer, restore_checkpoint
 from modutask.optimizer.my_moo.core.individual import Individual
 from modutask.optimizer.my_moo.core.population import Population
-from modutask.optimizer.my_moo.rng_manager import get_rng
+from modutask.optimizer.my_moo.evaluator import BaseEvaluator, SerialEvaluator, skipped_evaluations
+from modutask.optimizer.my_moo.telemetry import BaseCallback, HypervolumeTracker, collect_callbacks, report_generation
+from modutask.optimizer.my_moo.surrogate import SurrogateScreen
+from modutask.optimizer.my_moo.termination import BaseTermination, check_termination
+from modutask.optimizer.my_moo.rng_manager import VARIATION, RNGService, get_rng, get_rng_service, use_rng
+
+logger = logging.getLogger(__name__)
 
 def calculate_hv_contributions(individuals: list[Individual], ref_point: list[float]) -> list[float]:
     # 全個体の目的関数値を NumPy 配列に変換
@@ -42,9 +51,39 @@ def calculate_fitness(contributions: list[float], kappa: float = 0.05) -> list[f
         fitness.append(fit)
     return fitness
 
-def truncate_to_n(individuals: list[Individual], n: int, ref_point: list[float], kappa: float = 0.05) -> list[Individual]:
+def reference_point(individuals: list[Individual]) -> Optional[list[float]]:
+    """実行可能解の目的関数最大値 × 1.1（実行可能解がなければ None）"""
+    feasible = [ind for ind in individuals if ind.feasible]
+    if not feasible:
+        return None
+    num_objs = len(feasible[0].objectives)
+    return [max(ind.objectives[i] for ind in feasible) * 1.1 for i in range(num_objs)]
+
+def assign_fitness(population: list[Individual], kappa: float) -> None:
+    """
+    IBEA の適応度を fitness['ibea_fit'] に設定する（小さいほど良い）
+    HV貢献度は実行可能解だけで求め、実行不可能解は制約付き支配に合わせてどの実行可能解よりも悪く、違反量の順にする
+    """
+    feasible = [ind for ind in population if ind.feasible]
+    worst = 0.0
+    if feasible:
+        contributions = calculate_hv_contributions(feasible, reference_point(feasible))
+        fitness = calculate_fitness(contributions, kappa)
+        for ind, fit in zip(feasible, fitness):
+            ind.fitness['ibea_fit'] = fit
+        worst = max(fitness)
+    for ind in population:
+        if not ind.feasible:
+            ind.fitness['ibea_fit'] = worst + 1.0 + ind.constraint_violation
+
+def truncate_to_n(individuals: list[Individual], n: int, ref_point: Optional[list[float]], kappa: float = 0.05) -> list[Individual]:
     pool = deepcopy(individuals)
 
+    # 実行不可能解が残っていれば違反量の大きいものから削除
+    while len(pool) > n and any(not ind.feasible for ind in pool):
+        worst_idx = max(range(len(pool)), key=lambda i: pool[i].constraint_violation)
+        del pool[worst_idx]
+
     while len(pool) > n:
         # 1. HV貢献度を計算
         contributions = calculate_hv_contributions(pool, ref_point)
@@ -62,23 +101,18 @@ def tournament_selection(population: list[Individual], tournament_size=2) -> Ind
     candidates = get_rng().choice(population, size=tournament_size, replace=False)
     return min(candidates, key=lambda ind: ind.fitness['ibea_fit'])  # fitnessは小さいほど良い
 
-def generate_offspring(population: list[Individual], num_offspring: int, kappa: float, tournament_size=2) -> list[Individual]:
-    num_objs = len(population[0].objectives)
-    ref_point = [
-        max(ind.objectives[i] for ind in population) * 1.1
-        for i in range(num_objs)
-    ]
-    contributions = calculate_hv_contributions(population, ref_point)
-    fitness = calculate_fitness(contributions, kappa)
-    for i, p in enumerate(population):
-        p.fitness['ibea_fit'] = fitness[i]
+def generate_offspring(population: list[Individual], num_offspring: int, kappa: float, rng_service: RNGService, 
+                       generation: int, tournament_size=2) -> list[Individual]:
+    assign_fitness(population, kappa)
 
     offspring = []
-    for _ in range(num_offspring):
-        p1 = tournament_selection(population, tournament_size)
-        p2 = tournament_selection(population, tournament_size)
-        child = p1.crossover(p2)
-        child.mutate()
+    for slot in range(num_offspring):
+        # 子個体スロットごとに独立な乱数ストリームを使う
+        with use_rng(rng_service.stream(VARIATION, generation, slot)):
+            p1 = tournament_selection(population, tournament_size)
+            p2 = tournament_selection(population, tournament_size)
+            child = p1.crossover(p2)
+            child.mutate()
         offspring.append(child)
     return offspring
 
@@ -90,40 +124,112 @@ class IBEAHV:
         population_size: int = 50,
         generations: int = 100,
         kappa: float = 0.05,
+        evaluator: Optional[BaseEvaluator] = None,
+        rng_service: Optional[RNGService] = None,
+        checkpointer: Optional[Checkpointer] = None,
+        callbacks: Optional[list[BaseCallback]] = None,
+        hv_ref_point: Optional[list[float]] = None,
+        terminations: Optional[list[BaseTermination]] = None,
+        surrogate: Optional[SurrogateScreen] = None,
+        initial_genomes: Optional[list[Any]] = None,
+        resume_from: Optional[str] = None,
     ):
         self.simulation_func = simulation_func
         self.encoding = encoding
         self.population_size = population_size
         self.generations = generations
         self.kappa = kappa
-
-        self.population: Population = Population.initialize(population_size, encoding)
-        self.population.evaluate(simulation_func)
-
-    def evolve(self):
-        for gen in range(self.generations):
-            # 1. 子個体を生成
-            offspring = generate_offspring(list(self.population), self.population_size, self.kappa)
-
-            # 2. 評価
-            for child in offspring:
-                child.set_objectives(self.simulation_func(child.genome))
-
-            # 3. 親 + 子を統合
-            combined = list(self.population) + offspring
-
-            # 4. 参照点を決定（目的関数最大値 × 1.1）
-            num_objs = len(combined[0].objectives)
-            ref_point = [
-                max(ind.objectives[i] for ind in combined) * 1.1
-                for i in range(num_objs)
-            ]
-
-            # 5. IBEAによる生存選択
-            survivors = truncate_to_n(combined, self.population_size, ref_point, self.kappa)
-
-            # 6. 次世代へ更新
-            self.population = Population(survivors)
+        self.evaluator = evaluator if evaluator is not None else SerialEvaluator(simulation_func)  # 指定があれば simulation_func の代わりに使用
+        self.rng_service = rng_service if rng_service is not None else get_rng_service()
+        self.generation = 0  # 実行済みの世代数
+        self.checkpointer = checkpointer  # 指定があれば interval 世代ごとに状態を保存
+        self.callbacks = collect_callbacks(callbacks, self.evaluator)  # 世代ごとに GenerationRecord を受け取る
+        self.hypervolume = HypervolumeTracker(hv_ref_point) if hv_ref_point is not None else None  # 固定参照点のHV
+        self.terminations = terminations if terminations is not None else []  # generations より前に終了する条件
+        self.stop_reason: Optional[str] = None  # evolve が終了した理由
+        self.surrogate = surrogate  # 指定があれば子個体を代理モデルで選別してから評価
+
+        self.population: Population
+        self.evaluations = 0  # 実際に評価した遺伝子の累計（キャッシュヒット・枝刈り・レーシングで省略した分は含めない）
+        if resume_from is not None:
+            # チェックポイントから再開する場合は、捨てることになる初期個体群を生成・評価しない
+            restore_checkpoint(self, resume_from)
+        else:
+            self.population = Population.initialize(population_size, encoding, self.rng_service,
+                                                    initial_genomes)  # initial_genomes があれば初期個体に含める
+            skipped = skipped_evaluations(self.evaluator)
+            self.population.evaluate(self.evaluator)
+            self.evaluations = len(self.population) - (skipped_evaluations(self.evaluator) - skipped)
+        if self.surrogate is not None:
+            self.surrogate.observe(list(self.population))
+
+    def evolve(self, resume_from: Optional[str] = None):
+        """
+        resume_from にチェックポイントのディレクトリを指定すると、保存時点の世代から続きを実行する
+        （コンストラクタの resume_from なら初期個体群の評価も省ける）
+        """
+        if resume_from is not None:
+            restore_checkpoint(self, resume_from)
+        for termination in self.terminations:
+            termination.start(self)
+        self.stop_reason = None
+        while self.generation < self.generations:
+            self.step()
+            self.stop_reason = check_termination(self.terminations, self)
+            if self.checkpointer is not None and (self.checkpointer.should_save(self.generation) 
+                                                  or self.generation == self.generations
+                                                  or self.stop_reason is not None):
+                self.checkpointer.save(self)
+            if self.stop_reason is not None:
+                break
+        if self.stop_reason is None:
+            self.stop_reason = f"generations: reached {self.generations} generations"
+        logger.info(f"{type(self).__name__} stopped at generation {self.generation} ({self.stop_reason}).")
+
+    def step(self):
+        """1世代分の進化"""
+        hits = getattr(self.evaluator, 'hits', 0)
+        skipped = skipped_evaluations(self.evaluator)
+        # 1. 子個体を生成
+        start = time.perf_counter()
+        if self.surrogate is None:
+            offspring = generate_offspring(list(self.population), self.population_size, self.kappa, 
+                                           self.rng_service, self.generation)
+        else:
+            # 多めに生成した候補から代理モデルで評価対象を選ぶ
+            candidates = generate_offspring(list(self.population), self.surrogate.n_candidates(self.population_size), 
+                                            self.kappa, self.rng_service, self.generation)
+            offspring = self.surrogate.select(candidates, self.population_size, self.rng_service, self.generation)
+        variation_end = time.perf_counter()
+
+        # 2. 評価
+        Population(offspring).evaluate(self.evaluator)
+        evaluation_end = time.perf_counter()
+        if self.surrogate is not None:
+            self.surrogate.observe(offspring)
+
+        # 3. 親 + 子を統合
+        combined = list(self.population) + offspring
+
+        # 4. IBEAによる生存選択・次世代へ更新
+        self.population = Population(self.select_survivors(combined))
+        sort_end = time.perf_counter()
+        self.generation += 1
+        self.evaluations += len(offspring) - (skipped_evaluations(self.evaluator) - skipped)
+
+        # 5. 計測値をコールバックに通知
+        report_generation(self, evaluation_time=evaluation_end - variation_end, sort_time=sort_end - evaluation_end,
+                          variation_time=variation_end - start, evaluations=len(offspring),
+                          cache_hits=getattr(self.evaluator, 'hits', 0) - hits)
+
+    def select_survivors(self, combined: list[Individual]) -> list[Individual]:
+        """実行不可能解を違反量の大きい順に除いた後、HV貢献度に基づく適応度で population_size 個体に切り詰める"""
+        # 参照点を決定（実行可能解の目的関数最大値 × 1.1）
+        return truncate_to_n(combined, self.population_size, reference_point(combined), self.kappa)
+
+    def migrate(self, immigrants: list[Individual]):
+        """他の個体群からの移住個体を受け入れ、生存選択で個体数を戻す"""
+        self.population = Population(self.select_survivors(list(self.population) + immigrants))
 
     def get_result(self) -> list[Individual]:
         return self.population.individuals
\ No newline at end of file
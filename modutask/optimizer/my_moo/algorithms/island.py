@@ -0,0 +1,136 @@
+import multiprocessing as mp
+import traceback
+from typing import Any, Callable, Optional, Union
+from modutask.optimizer.my_moo.core.encoding import BaseVariable
+from modutask.optimizer.my_moo.core.individual import Individual
+from modutask.optimizer.my_moo.rng_manager import MIGRATION, RNGService, get_rng_service
+from modutask.optimizer.my_moo.utils import get_non_dominated_individuals
+from modutask.utils.logger import raise_with_log
+
+def make_topology(topology: Union[str, dict[int, list[int]]], n_islands: int) -> dict[int, list[int]]:
+    """移住先の島のリストを島ごとに返す"""
+    if isinstance(topology, dict):
+        return {i: list(topology.get(i, [])) for i in range(n_islands)}
+    if topology == 'ring':
+        return {i: [(i + 1) % n_islands] for i in range(n_islands)} if n_islands > 1 else {0: []}
+    if topology == 'fully_connected':
+        return {i: [j for j in range(n_islands) if j != i] for i in range(n_islands)}
+    raise_with_log(ValueError, f"Unknown topology: {topology}.")
+
+def select_migrants(individuals: list[Individual], n_migrants: int, rng_service: RNGService, epoch: int) -> list[Individual]:
+    """非支配個体から移住個体をランダムに選ぶ"""
+    candidates = get_non_dominated_individuals(individuals)
+    if len(candidates) <= n_migrants:
+        return candidates
+    indices = rng_service.stream(MIGRATION, epoch).choice(len(candidates), size=n_migrants, replace=False)
+    return [candidates[i] for i in sorted(indices)]
+
+def _run_island(island_id: int, factory: Callable[[RNGService], Any], rng_service: RNGService, generations: int,
+                migration_interval: int, n_migrants: int, targets: list[int], sources: list[int],
+                inboxes: list[Any], results: Any) -> None:
+    """島ごとのプロセスで実行されるループ"""
+    try:
+        algo = factory(rng_service)
+        received: dict[int, dict[int, list[tuple[Any, list[float]]]]] = {}  # epoch -> 送信元 -> (遺伝子, 目的関数値)
+        epoch = 0
+        while algo.generation < generations:
+            for _ in range(min(migration_interval, generations - algo.generation)):
+                algo.step()
+            if algo.generation >= generations:
+                break
+
+            # 1. 移住個体を送信
+            migrants = select_migrants(algo.get_result(), n_migrants, rng_service, epoch)
+            for target in targets:
+                inboxes[target].put((epoch, island_id, [(ind.genome, ind.objectives) for ind in migrants]))
+
+            # 2. 同じepochの移住個体を全送信元から受信（他の島が先行していても epoch で区別する）
+            while len(received.get(epoch, {})) < len(sources):
+                message_epoch, source, payload = inboxes[island_id].get()
+                received.setdefault(message_epoch, {})[source] = payload
+
+            # 3. 送信元の順に並べて受け入れる（プロセスの実行順に依存しない）
+            immigrants = []
+            messages = received.pop(epoch, {})
+            for source in sorted(messages):
+                for genome, objectives in messages[source]:
+                    immigrant = Individual(algo.encoding, genome=genome)
+                    immigrant.set_objectives(objectives)
+                    immigrants.append(immigrant)
+            algo.migrate(immigrants)
+            epoch += 1
+        results.put((island_id, 'ok', [(ind.genome, ind.objectives) for ind in algo.get_result()]))
+    except Exception:
+        results.put((island_id, 'error', traceback.format_exc()))
+
+class IslandModel:
+    """
+    島モデルによる並列化
+    NSGAII / IBEAHV の小さな個体群を別プロセスで独立に進化させ、migration_interval 世代ごとに
+    非支配個体を topology に従って移住させる。最後に全島の個体群を統合して1つの非支配解集合にする
+    algorithm_factory は島ごとの RNGService を受け取り、初期化済みのアルゴリズムを返す
+    """
+    def __init__(
+        self,
+        algorithm_factory: Callable[[RNGService], Any],
+        encoding: BaseVariable,
+        n_islands: int = 4,
+        generations: int = 100,
+        migration_interval: int = 10,
+        n_migrants: int = 2,
+        topology: Union[str, dict[int, list[int]]] = 'ring',
+        rng_service: Optional[RNGService] = None,
+    ):
+        self.algorithm_factory = algorithm_factory
+        self.encoding = encoding
+        self.n_islands = n_islands
+        self.generations = generations
+        self.migration_interval = migration_interval
+        self.n_migrants = n_migrants
+        self.topology = make_topology(topology, n_islands)
+        self.rng_service = rng_service if rng_service is not None else get_rng_service()
+        self.islands: dict[int, list[Individual]] = {}
+
+    def evolve(self):
+        sources: dict[int, list[int]] = {i: [] for i in range(self.n_islands)}
+        for source, targets in self.topology.items():
+            for target in targets:
+                sources[target].append(source)
+
+        inboxes = [mp.Queue() for _ in range(self.n_islands)]
+        results: Any = mp.Queue()
+        processes = [
+            mp.Process(
+                target=_run_island,
+                args=(i, self.algorithm_factory, self.rng_service.spawn(i), self.generations, self.migration_interval,
+                      self.n_migrants, self.topology[i], sources[i], inboxes, results),
+            )
+            for i in range(self.n_islands)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            for _ in range(self.n_islands):
+                island_id, status, payload = results.get()
+                if status == 'error':
+                    raise_with_log(RuntimeError, f"Island {island_id} failed:\n{payload}")
+                individuals = []
+                for genome, objectives in payload:
+                    ind = Individual(self.encoding, genome=genome)
+                    ind.set_objectives(objectives)
+                    individuals.append(ind)
+                self.islands[island_id] = individuals
+        finally:
+            for process in processes:
+                if process.is_alive() and len(self.islands) < self.n_islands:
+                    process.terminate()
+                process.join()
+
+    def get_result(self) -> list[Individual]:
+        """全島の個体を統合した非支配解集合（重複する遺伝子は除く）"""
+        merged: list[Individual] = []
+        for island_id in sorted(self.islands):
+            for ind in self.islands[island_id]:
+                if not any(ind == other for other in merged):
+                    merged.append(ind)
+        return get_non_dominated_individuals(merged)
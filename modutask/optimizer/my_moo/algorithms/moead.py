@@ -0,0 +1,223 @@
+import logging
+import time
+from typing import Any, Callable, Optional
+
+import numpy as np
+from modutask.optimizer.my_moo.algorithms.nsgaiii import das_dennis
+from modutask.optimizer.my_moo.checkpoint import Checkpointer, restore_checkpoint
+from modutask.optimizer.my_moo.core.individual import Individual
+from modutask.optimizer.my_moo.core.population import Population
+from modutask.optimizer.my_moo.evaluator import BaseEvaluator, SerialEvaluator, skipped_evaluations
+from modutask.optimizer.my_moo.telemetry import BaseCallback, HypervolumeTracker, collect_callbacks, report_generation
+from modutask.optimizer.my_moo.termination import BaseTermination, check_termination
+from modutask.optimizer.my_moo.rng_manager import MIGRATION, VARIATION, RNGService, get_rng, get_rng_service, use_rng
+from modutask.utils.logger import raise_with_log
+
+logger = logging.getLogger(__name__)
+
+def uniform_weights(n: int, n_objectives: int) -> np.ndarray:
+    """
+    単体上にほぼ一様に並んだ n 本の重みベクトル
+    本数が n 以上になる最小の分割数の Das-Dennis 格子から、各軸の端点を先頭に最遠点サンプリングで n 本選ぶ
+    """
+    n_partitions = 1
+    while len(das_dennis(n_partitions, n_objectives)) < n:
+        n_partitions += 1
+    grid = das_dennis(n_partitions, n_objectives)
+    if len(grid) == n:
+        return grid
+    corners = [int(np.argmax(grid[:, m])) for m in range(n_objectives)]
+    selected = corners[:n]
+    distances = np.min(np.linalg.norm(grid[:, None, :] - grid[None, selected, :], axis=2), axis=1)
+    while len(selected) < n:
+        k = int(np.argmax(distances))
+        selected.append(k)
+        distances = np.minimum(distances, np.linalg.norm(grid - grid[k], axis=1))
+    return grid[selected]
+
+def tchebycheff(F: np.ndarray, weights: np.ndarray, ideal: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """重み付きチェビシェフ距離（目的関数値は ideal からの差を scale で割って揃える）"""
+    return np.max(np.maximum(weights, 1e-6) * (F - ideal) / scale, axis=-1)
+
+def pbi(F: np.ndarray, weights: np.ndarray, ideal: np.ndarray, scale: np.ndarray, theta: float = 5.0) -> np.ndarray:
+    """境界交差法（重み方向への射影 d1 と、重み方向からの距離 d2 に theta を掛けたものの和）"""
+    units = weights / np.linalg.norm(weights, axis=-1, keepdims=True)
+    diff = (F - ideal) / scale
+    d1 = np.sum(diff * units, axis=-1)
+    d2 = np.linalg.norm(diff - d1[..., None] * units, axis=-1)
+    return d1 + theta * d2
+
+class MOEAD:
+    """
+    分解に基づく多目的進化（MOEA/D）
+    population_size 本の重みベクトルごとの部分問題（チェビシェフ / PBI）を、近傍 n_neighbors 本の部分問題の個体と交叉して解く
+    非支配ソートや HV による全体の生存選択はなく、子個体は近傍の部分問題のうち改善するものを最大 n_replace 個だけ置き換える
+    （置き換え判定は近傍ごとに NumPy でまとめて計算するため、1世代あたりの処理は個体数に比例する）
+    全部分問題の子個体は世代ごとにまとめて evaluator に渡すので、PoolEvaluator などで並列に評価できる
+    理想点と正規化の幅は世代の初めに個体群から求め、子個体で更新する（チェックポイントからの再開でも同じ結果になる）
+    population[i] は i 番目の重みベクトルの部分問題の現在の解
+    """
+    def __init__(
+        self,
+        func: Callable[[Any], list[float]],
+        encoding,
+        population_size: int = 50,
+        generations: int = 100,
+        n_neighbors: int = 20,
+        decomposition: str = 'tchebycheff',
+        theta: float = 5.0,
+        delta: float = 0.9,
+        n_replace: int = 2,
+        weights: Optional[np.ndarray] = None,
+        evaluator: Optional[BaseEvaluator] = None,
+        rng_service: Optional[RNGService] = None,
+        checkpointer: Optional[Checkpointer] = None,
+        callbacks: Optional[list[BaseCallback]] = None,
+        hv_ref_point: Optional[list[float]] = None,
+        terminations: Optional[list[BaseTermination]] = None,
+        initial_genomes: Optional[list[Any]] = None,
+        resume_from: Optional[str] = None,
+    ):
+        if decomposition not in ('tchebycheff', 'pbi'):
+            raise_with_log(ValueError, f"Unknown decomposition: {decomposition}.")
+        self.func = func
+        self.encoding = encoding
+        self.population_size = population_size
+        self.generations = generations
+        self.decomposition = decomposition
+        self.theta = theta  # PBI のペナルティ係数
+        self.delta = delta  # 近傍から親を選ぶ確率（それ以外は全体から選ぶ）
+        self.n_replace = n_replace  # 1つの子個体が置き換える部分問題の上限
+        self.evaluator = evaluator if evaluator is not None else SerialEvaluator(func)  # 指定があれば func の代わりに使用
+        self.rng_service = rng_service if rng_service is not None else get_rng_service()
+        self.generation = 0  # 実行済みの世代数
+        self.checkpointer = checkpointer  # 指定があれば interval 世代ごとに状態を保存
+        self.callbacks = collect_callbacks(callbacks, self.evaluator)  # 世代ごとに GenerationRecord を受け取る
+        self.hypervolume = HypervolumeTracker(hv_ref_point) if hv_ref_point is not None else None  # 固定参照点のHV
+        self.terminations = terminations if terminations is not None else []  # generations より前に終了する条件
+        self.stop_reason: Optional[str] = None  # evolve が終了した理由
+
+        self.population: Population
+        self.evaluations = 0  # 実際に評価した遺伝子の累計（キャッシュヒット・枝刈り・レーシングで省略した分は含めない）
+        if resume_from is not None:
+            # チェックポイントから再開する場合は、捨てることになる初期個体群を生成・評価しない
+            restore_checkpoint(self, resume_from)
+        else:
+            self.population = Population.initialize(population_size, encoding, self.rng_service,
+                                                    initial_genomes)  # initial_genomes があれば初期個体に含める
+            skipped = skipped_evaluations(self.evaluator)
+            self.population.evaluate(self.evaluator)
+            self.evaluations = len(self.population) - (skipped_evaluations(self.evaluator) - skipped)
+
+        n_objectives = len(self.population[0].objectives)
+        self.weights = np.asarray(weights, dtype=float) if weights is not None else uniform_weights(population_size, n_objectives)
+        if self.weights.shape != (population_size, n_objectives):
+            raise_with_log(ValueError, f"weights must have shape ({population_size}, {n_objectives}): {self.weights.shape}.")
+        # 各部分問題の近傍（重みベクトルが近い順、自身を含む）
+        self.n_neighbors = max(min(n_neighbors, population_size), 2 if population_size > 1 else 1)
+        distances = np.linalg.norm(self.weights[:, None, :] - self.weights[None, :, :], axis=2)
+        self.neighbors = np.argsort(distances, axis=1, kind='stable')[:, :self.n_neighbors]
+
+    def evolve(self, resume_from: Optional[str] = None):
+        """
+        resume_from にチェックポイントのディレクトリを指定すると、保存時点の世代から続きを実行する
+        （コンストラクタの resume_from なら初期個体群の評価も省ける）
+        """
+        if resume_from is not None:
+            restore_checkpoint(self, resume_from)
+        for termination in self.terminations:
+            termination.start(self)
+        self.stop_reason = None
+        while self.generation < self.generations:
+            self.step()
+            self.stop_reason = check_termination(self.terminations, self)
+            if self.checkpointer is not None and (self.checkpointer.should_save(self.generation)
+                                                  or self.generation == self.generations
+                                                  or self.stop_reason is not None):
+                self.checkpointer.save(self)
+            if self.stop_reason is not None:
+                break
+        if self.stop_reason is None:
+            self.stop_reason = f"generations: reached {self.generations} generations"
+        logger.info(f"{type(self).__name__} stopped at generation {self.generation} ({self.stop_reason}).")
+
+    def step(self):
+        """1世代分の進化"""
+        hits = getattr(self.evaluator, 'hits', 0)
+        skipped = skipped_evaluations(self.evaluator)
+        # 1. 部分問題ごとに子個体を生成（交配範囲と置き換え順も同じ乱数ストリームで決める）
+        start = time.perf_counter()
+        offspring = []
+        pools = []
+        for slot in range(self.population_size):
+            with use_rng(self.rng_service.stream(VARIATION, self.generation, slot)):
+                rng = get_rng()
+                pool = self.neighbors[slot] if rng.random() < self.delta else np.arange(self.population_size)
+                p1, p2 = rng.choice(pool, size=2, replace=False) if len(pool) > 1 else (pool[0], pool[0])
+                child = self.population[int(p1)].crossover(self.population[int(p2)])
+                child.mutate()
+                pools.append(rng.permutation(pool))
+            offspring.append(child)
+        variation_end = time.perf_counter()
+
+        # 2. 全部分問題の子個体をまとめて評価
+        Population(offspring).evaluate(self.evaluator)
+        evaluation_end = time.perf_counter()
+
+        # 3. 近傍の部分問題の置き換え
+        self.update(offspring, pools)
+        update_end = time.perf_counter()
+        self.generation += 1
+        self.evaluations += len(offspring) - (skipped_evaluations(self.evaluator) - skipped)
+
+        # 4. 計測値をコールバックに通知
+        report_generation(self, evaluation_time=evaluation_end - variation_end, sort_time=update_end - evaluation_end,
+                          variation_time=variation_end - start, evaluations=len(offspring),
+                          cache_hits=getattr(self.evaluator, 'hits', 0) - hits)
+
+    def aggregate(self, F: np.ndarray, weights: np.ndarray, ideal: np.ndarray, scale: np.ndarray) -> np.ndarray:
+        """分解した部分問題の値（小さいほど良い、inf を含む目的関数値は inf）"""
+        with np.errstate(invalid='ignore'):
+            if self.decomposition == 'pbi':
+                values = pbi(F, weights, ideal, scale, self.theta)
+            else:
+                values = tchebycheff(F, weights, ideal, scale)
+        return np.where(np.isnan(values), np.inf, values)
+
+    def update(self, offspring: list[Individual], pools: list[np.ndarray]) -> None:
+        """
+        子個体を順に、pools の部分問題のうち改善するものへ最大 n_replace 個まで置き換える
+        違反量の小さい方を優先し、違反量が等しければ分解した値で比べる（制約付き支配と同じ順序）
+        """
+        F = np.array([ind.objectives for ind in self.population], dtype=float)
+        V = np.array([ind.constraint_violation for ind in self.population], dtype=float)
+        finite = F[np.all(np.isfinite(F), axis=1) & (V <= 0)]
+        ideal = finite.min(axis=0) if len(finite) > 0 else np.zeros(F.shape[1])
+        nadir = finite.max(axis=0) if len(finite) > 0 else np.ones(F.shape[1])
+        scale = np.maximum(nadir - ideal, 1e-12)
+        individuals = list(self.population)
+        for child, pool in zip(offspring, pools):
+            f = np.asarray(child.objectives, dtype=float)
+            v = child.constraint_violation
+            if np.all(np.isfinite(f)) and v <= 0:
+                ideal = np.minimum(ideal, f)
+            current = self.aggregate(F[pool], self.weights[pool], ideal, scale)
+            candidate = self.aggregate(f[None, :], self.weights[pool], ideal, scale)
+            better = (v < V[pool]) | ((v == V[pool]) & (candidate < current))
+            improved = pool[better][:self.n_replace]
+            for k in improved:
+                individuals[k] = child
+            F[improved] = f
+            V[improved] = v
+        self.population = Population(individuals)
+
+    def migrate(self, immigrants: list[Individual]):
+        """他の個体群からの移住個体を受け入れ、改善する部分問題を置き換える"""
+        pools = []
+        for slot in range(len(immigrants)):
+            with use_rng(self.rng_service.stream(MIGRATION, self.generation, slot)):
+                pools.append(get_rng().permutation(self.population_size))
+        self.update(immigrants, pools)
+
+    def get_result(self) -> list[Individual]:
+        return self.population.individuals
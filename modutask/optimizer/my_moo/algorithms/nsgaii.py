@@ -1,10 +1,20 @@
-from typing import Callable
+import logging
+import time
+from typing import Any, Callable, Optional
 
 import numpy as np
+from modutask.optimizer.my_moo.checkpoint import Checkpointer, restore_checkpoint
 from modutask.optimizer.my_moo.core.individual import Individual
 from modutask.optimizer.my_moo.core.population import Population
-from modutask.optimizer.my_moo.rng_manager import get_rng
-from modutask.optimizer.my_moo.utils import dominates
+from modutask.optimizer.my_moo.evaluator import BaseEvaluator, SerialEvaluator, skipped_evaluations
+from modutask.optimizer.my_moo.local_search import LocalSearch
+from modutask.optimizer.my_moo.telemetry import BaseCallback, HypervolumeTracker, collect_callbacks, report_generation
+from modutask.optimizer.my_moo.surrogate import SurrogateScreen
+from modutask.optimizer.my_moo.termination import BaseTermination, check_termination
+from modutask.optimizer.my_moo.rng_manager import VARIATION, RNGService, get_rng, get_rng_service, use_rng
+from modutask.optimizer.my_moo.utils import constrained_dominates
+
+logger = logging.getLogger(__name__)
 
 def fast_non_dominated_sort(individuals: list[Individual]) -> list[list[Individual]]:
     fronts: list[list[Individual]] = []
@@ -19,18 +29,19 @@ def fast_non_dominated_sort(individuals: list[Individual]) -> list[list[Individu
         if any(p == q for q in seen):
             duplicates.append(p)
             p.fitness['rank'] = float('inf')  # 最悪ランクを付与
-            continue
-
-        seen.append(p)
+        else:
+            seen.append(p)
 
+    # 支配関係は重複を除いた個体の間で数える（重複個体は前のフロントに入らないため、数えると n が 0 にならない）
+    for p in seen:
         S[p] = []
         n[p] = 0
-        for q in individuals:
+        for q in seen:
             if p == q:
                 continue
-            if dominates(p.objectives, q.objectives):
+            if constrained_dominates(p, q):
                 S[p].append(q)
-            elif dominates(q.objectives, p.objectives):
+            elif constrained_dominates(q, p):
                 n[p] += 1
         if n[p] == 0:
             rank[p] = 0
@@ -75,7 +86,7 @@ def calculate_crowding_distance(front: list[Individual]) -> None:
         front[-1].fitness['crowding_distance'] = float('inf')
         obj_min = front[0].objectives[m]
         obj_max = front[-1].objectives[m]
-        if obj_max - obj_min == 0:
+        if not 0 < obj_max - obj_min < float('inf'):  # 幅が 0、または評価を省略した実行不可能解の inf を含む
             continue
         for i in range(1, len(front) - 1):
             prev_obj = front[i - 1].objectives[m]
@@ -86,7 +97,8 @@ def tournament_selection(population: list[Individual], tournament_size: int = 2)
     candidates = get_rng().choice(population, size=tournament_size, replace=False)
     return min(candidates, key=lambda ind: (ind.fitness['rank'], -ind.fitness['crowding_distance']))
 
-def generate_offspring(population: list[Individual], num_offspring: int, tournament_size=2) -> list[Individual]:
+def generate_offspring(population: list[Individual], num_offspring: int, rng_service: RNGService, generation: int, 
+                       tournament_size=2) -> list[Individual]:
     fronts = fast_non_dominated_sort(population)
     for front in fronts:
         calculate_crowding_distance(front)
@@ -95,11 +107,13 @@ def generate_offspring(population: list[Individual], num_offspring: int, tournam
         if 'crowding_distance' not in ind.fitness:
             ind.fitness['crowding_distance'] = 0.0
     offspring = []
-    for _ in range(num_offspring):
-        p1 = tournament_selection(population, tournament_size)
-        p2 = tournament_selection(population, tournament_size)
-        child = p1.crossover(p2)
-        child.mutate()
+    for slot in range(num_offspring):
+        # 子個体スロットごとに独立な乱数ストリームを使う
+        with use_rng(rng_service.stream(VARIATION, generation, slot)):
+            p1 = tournament_selection(population, tournament_size)
+            p2 = tournament_selection(population, tournament_size)
+            child = p1.crossover(p2)
+            child.mutate()
         offspring.append(child)
     return offspring
 
@@ -110,48 +124,136 @@ class NSGAII:
         encoding,
         population_size: int = 50,
         generations: int = 100,
+        evaluator: Optional[BaseEvaluator] = None,
+        rng_service: Optional[RNGService] = None,
+        checkpointer: Optional[Checkpointer] = None,
+        callbacks: Optional[list[BaseCallback]] = None,
+        hv_ref_point: Optional[list[float]] = None,
+        terminations: Optional[list[BaseTermination]] = None,
+        surrogate: Optional[SurrogateScreen] = None,
+        initial_genomes: Optional[list[Any]] = None,
+        local_search: Optional[LocalSearch] = None,
+        resume_from: Optional[str] = None,
     ):
         self.func = func
         self.encoding = encoding
         self.population_size = population_size
         self.generations = generations
+        self.evaluator = evaluator if evaluator is not None else SerialEvaluator(func)  # 指定があれば func の代わりに使用
+        self.rng_service = rng_service if rng_service is not None else get_rng_service()
+        self.generation = 0  # 実行済みの世代数
+        self.checkpointer = checkpointer  # 指定があれば interval 世代ごとに状態を保存
+        self.callbacks = collect_callbacks(callbacks, self.evaluator)  # 世代ごとに GenerationRecord を受け取る
+        self.hypervolume = HypervolumeTracker(hv_ref_point) if hv_ref_point is not None else None  # 固定参照点のHV
+        self.terminations = terminations if terminations is not None else []  # generations より前に終了する条件
+        self.stop_reason: Optional[str] = None  # evolve が終了した理由
+        self.surrogate = surrogate  # 指定があれば子個体を代理モデルで選別してから評価
+        self.local_search = local_search  # 指定があれば interval 世代ごとに非支配個体の近傍を評価して生存選択に加える
+
+        self.population: Population
+        self.evaluations = 0  # 実際に評価した遺伝子の累計（キャッシュヒット・枝刈り・レーシングで省略した分は含めない）
+        if resume_from is not None:
+            # チェックポイントから再開する場合は、捨てることになる初期個体群を生成・評価しない
+            restore_checkpoint(self, resume_from)
+        else:
+            self.population = Population.initialize(population_size, encoding, self.rng_service,
+                                                    initial_genomes)  # initial_genomes があれば初期個体に含める
+            skipped = skipped_evaluations(self.evaluator)
+            self.population.evaluate(self.evaluator)
+            self.evaluations = len(self.population) - (skipped_evaluations(self.evaluator) - skipped)
+        if self.surrogate is not None:
+            self.surrogate.observe(list(self.population))
+
+    def evolve(self, resume_from: Optional[str] = None):
+        """
+        resume_from にチェックポイントのディレクトリを指定すると、保存時点の世代から続きを実行する
+        （コンストラクタの resume_from なら初期個体群の評価も省ける）
+        """
+        if resume_from is not None:
+            restore_checkpoint(self, resume_from)
+        for termination in self.terminations:
+            termination.start(self)
+        self.stop_reason = None
+        while self.generation < self.generations:
+            self.step()
+            self.stop_reason = check_termination(self.terminations, self)
+            if self.checkpointer is not None and (self.checkpointer.should_save(self.generation) 
+                                                  or self.generation == self.generations
+                                                  or self.stop_reason is not None):
+                self.checkpointer.save(self)
+            if self.stop_reason is not None:
+                break
+        if self.stop_reason is None:
+            self.stop_reason = f"generations: reached {self.generations} generations"
+        logger.info(f"{type(self).__name__} stopped at generation {self.generation} ({self.stop_reason}).")
+
+    def step(self):
+        """1世代分の進化"""
+        hits = getattr(self.evaluator, 'hits', 0)
+        skipped = skipped_evaluations(self.evaluator)
+        # 1. 子個体を生成
+        start = time.perf_counter()
+        if self.surrogate is None:
+            offspring = Population(generate_offspring(list(self.population), self.population_size, 
+                                                      self.rng_service, self.generation))
+        else:
+            # 多めに生成した候補から代理モデルで評価対象を選ぶ
+            candidates = generate_offspring(list(self.population), self.surrogate.n_candidates(self.population_size), 
+                                            self.rng_service, self.generation)
+            offspring = Population(self.surrogate.select(candidates, self.population_size, 
+                                                         self.rng_service, self.generation))
+        variation_end = time.perf_counter()
+
+        # 2. 評価
+        offspring.evaluate(self.evaluator)
+        evaluation_end = time.perf_counter()
+        if self.surrogate is not None:
+            self.surrogate.observe(list(offspring))
+
+        # 3. 親 + 子を統合
+        combined = list(self.population) + list(offspring)
+
+        # 4. 非支配ソート・次世代の選択
+        self.population = Population(self.select_survivors(combined))
+        sort_end = time.perf_counter()
+
+        # 5. 局所探索（近傍の評価時間は評価時間に含める）
+        evaluations = len(offspring)
+        evaluation_time = evaluation_end - variation_end
+        if self.local_search is not None and self.local_search.should_run(self.generation + 1):
+            searched = self.local_search.evaluations
+            neighbors = self.local_search.improve(self)
+            if neighbors:
+                self.population = Population(self.select_survivors(list(self.population) + neighbors))
+            evaluations += self.local_search.evaluations - searched
+            evaluation_time += time.perf_counter() - sort_end
+        self.generation += 1
+        self.evaluations += evaluations - (skipped_evaluations(self.evaluator) - skipped)
+
+        # 6. 計測値をコールバックに通知
+        report_generation(self, evaluation_time=evaluation_time, sort_time=sort_end - evaluation_end,
+                          variation_time=variation_end - start, evaluations=evaluations,
+                          cache_hits=getattr(self.evaluator, 'hits', 0) - hits)
+
+    def select_survivors(self, combined: list[Individual]) -> list[Individual]:
+        """非支配ソートと混雑距離で population_size 個体を選択"""
+        fronts = fast_non_dominated_sort(combined)
+
+        next_population = []
+        for front in fronts:
+            calculate_crowding_distance(front)
+            if len(next_population) + len(front) <= self.population_size:
+                next_population.extend(front)
+            else:
+                sorted_front = sorted(front, key=lambda ind: ind.fitness['crowding_distance'], reverse=True)
+                next_population.extend(sorted_front[:self.population_size - len(next_population)])
+                break
+        # print(next_population)
+        return next_population
 
-        self.population: Population = Population.initialize(population_size, encoding)
-        self.population.evaluate(func)
-
-    def evolve(self):
-        for _ in range(self.generations):
-            # print(_)
-            # F = np.array([ind.objectives for ind in list(self.population)])
-            # from pymoo.indicators.hv import HV
-            # hv = HV(ref_point=np.array([110, 110, 110]))
-            # print(hv.do(F))
-            # 1. 子個体を生成
-            offspring = Population(generate_offspring(list(self.population), self.population_size))
-
-            # 2. 評価
-            offspring.evaluate(self.func)
-            for child in offspring:
-                child.set_objectives(self.func(child.genome))
-
-            # 3. 親 + 子を統合
-            combined = list(self.population) + list(offspring)
-
-            # 4. 非支配ソート
-            fronts = fast_non_dominated_sort(combined)
-
-            # 5. 次世代の選択
-            next_population = []
-            for front in fronts:
-                calculate_crowding_distance(front)
-                if len(next_population) + len(front) <= self.population_size:
-                    next_population.extend(front)
-                else:
-                    sorted_front = sorted(front, key=lambda ind: ind.fitness['crowding_distance'], reverse=True)
-                    next_population.extend(sorted_front[:self.population_size - len(next_population)])
-                    break
-            # print(next_population)
-            self.population = Population(next_population)
+    def migrate(self, immigrants: list[Individual]):
+        """他の個体群からの移住個体を受け入れ、生存選択で個体数を戻す"""
+        self.population = Population(self.select_survivors(list(self.population) + immigrants))
 
     def get_result(self) -> list[Individual]:
         return self.population.individuals
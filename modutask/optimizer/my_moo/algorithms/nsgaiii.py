@@ -0,0 +1,147 @@
+from math import comb
+from typing import Any, Callable, Optional
+
+import numpy as np
+from modutask.optimizer.my_moo.algorithms.nsgaii import NSGAII, fast_non_dominated_sort
+from modutask.optimizer.my_moo.core.individual import Individual
+from modutask.optimizer.my_moo.rng_manager import NICHING, get_rng, use_rng
+from modutask.utils.logger import raise_with_log
+
+def das_dennis(n_partitions: int, n_objectives: int) -> np.ndarray:
+    """単体上に n_partitions 等分の格子で並べた参照方向（Das-Dennis、C(n_partitions + M - 1, M - 1) 本）"""
+    if n_partitions < 1 or n_objectives < 1:
+        raise_with_log(ValueError, f"n_partitions and n_objectives must be at least 1: {n_partitions}, {n_objectives}.")
+    if n_objectives == 1:
+        return np.ones((1, 1))
+    directions = []
+    def fill(prefix: list[int], left: int, depth: int) -> None:
+        if depth == n_objectives - 1:
+            directions.append(prefix + [left])
+            return
+        for value in range(left + 1):
+            fill(prefix + [value], left - value, depth + 1)
+    fill([], n_partitions, 0)
+    return np.array(directions, dtype=float) / n_partitions
+
+def default_partitions(n_objectives: int, population_size: int) -> int:
+    """参照方向の本数が population_size を超えない最大の分割数（最低1）"""
+    n_partitions = 1
+    while comb(n_partitions + n_objectives, n_objectives - 1) <= population_size:
+        n_partitions += 1
+    return n_partitions
+
+def normalize(F: np.ndarray) -> np.ndarray:
+    """
+    理想点を原点に移し、各軸の極値点を通る超平面の切片で割る
+    極値点が退化して切片が求まらない（特異・非正）軸は、その軸の最大値で割る
+    """
+    ideal = F.min(axis=0)
+    translated = F - ideal
+    n_objectives = F.shape[1]
+    weights = np.full((n_objectives, n_objectives), 1e-6) + np.eye(n_objectives) * (1 - 1e-6)
+    # asf[i, j]: 個体 i の軸 j 方向の達成スカラー化関数
+    asf = np.max(translated[:, None, :] / weights[None, :, :], axis=2)
+    extremes = translated[np.argmin(asf, axis=0)]
+    nadir = translated.max(axis=0)
+    try:
+        intercepts = 1.0 / np.linalg.solve(extremes, np.ones(n_objectives))
+    except np.linalg.LinAlgError:
+        intercepts = nadir
+    invalid = ~np.isfinite(intercepts) | (intercepts <= 1e-6)
+    intercepts = np.where(invalid, nadir, intercepts)
+    intercepts = np.where(intercepts <= 1e-12, 1.0, intercepts)
+    return translated / intercepts
+
+def associate(F: np.ndarray, ref_dirs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """正規化した目的関数値を垂直距離の最も近い参照方向に対応付け、(参照方向の番号, 距離) を返す"""
+    units = ref_dirs / np.linalg.norm(ref_dirs, axis=1, keepdims=True)
+    projections = F @ units.T
+    distances = np.sqrt(np.clip(np.sum(F ** 2, axis=1, keepdims=True) - projections ** 2, 0.0, None))
+    niches = np.argmin(distances, axis=1)
+    return niches, distances[np.arange(len(F)), niches]
+
+def niching(n_select: int, niche_counts: np.ndarray, niches: np.ndarray, distances: np.ndarray) -> list[int]:
+    """
+    最後のフロント（niches, distances）から n_select 個を選ぶ
+    選択済みの個体が最も少ない参照方向から順に、その方向に個体がまだいなければ最も近い個体、いれば無作為な個体を加える
+    """
+    counts = niche_counts.astype(float).copy()
+    remaining = np.ones(len(niches), dtype=bool)
+    selected: list[int] = []
+    rng = get_rng()
+    while len(selected) < n_select:
+        available = np.unique(niches[remaining])
+        min_count = counts[available].min()
+        candidates = available[counts[available] == min_count]
+        niche = candidates[int(rng.integers(len(candidates)))]
+        members = np.flatnonzero(remaining & (niches == niche))
+        if min_count == 0:
+            member = members[np.argmin(distances[members])]
+        else:
+            member = members[int(rng.integers(len(members)))]
+        selected.append(int(member))
+        remaining[member] = False
+        counts[niche] += 1
+    return selected
+
+class NSGAIII(NSGAII):
+    """
+    参照方向による生存選択（NSGA-III）
+    目的関数が多い（4以上）と混雑距離ではほとんどの個体が区別できないため、最後のフロントは
+    Das-Dennis の参照方向への対応付け（正規化と垂直距離）で、個体の少ない方向から順に選ぶ
+    正規化は選択対象の個体だけから求める（世代をまたぐ状態を持たないのでチェックポイントからの再開でも同じ結果になる）
+    目的関数値に inf などを含む個体（評価を省略した実行不可能解など）は、有限な個体を選び切った後に無作為に選ぶ
+    子個体の生成と親選択は NSGAII と共通
+    """
+    def __init__(
+        self,
+        func: Callable[[list[int]], list[float]],
+        encoding,
+        population_size: int = 50,
+        generations: int = 100,
+        n_partitions: Optional[int] = None,
+        ref_dirs: Optional[np.ndarray] = None,
+        **kwargs: Any,
+    ):
+        super().__init__(func, encoding, population_size=population_size, generations=generations, **kwargs)
+        n_objectives = len(self.population[0].objectives)
+        if ref_dirs is None:
+            # 指定がなければ参照方向の本数が個体数を超えない最大の分割数
+            n_partitions = n_partitions if n_partitions is not None else default_partitions(n_objectives, population_size)
+            ref_dirs = das_dennis(n_partitions, n_objectives)
+        self.ref_dirs = np.asarray(ref_dirs, dtype=float)
+        if self.ref_dirs.ndim != 2 or self.ref_dirs.shape[1] != n_objectives:
+            raise_with_log(ValueError, f"ref_dirs must have shape (n, {n_objectives}): {self.ref_dirs.shape}.")
+
+    def select_survivors(self, combined: list[Individual]) -> list[Individual]:
+        """非支配ソートで前のフロントから選び、入り切らないフロントは参照方向のニッチで選択"""
+        fronts = fast_non_dominated_sort(combined)
+        next_population: list[Individual] = []
+        last: list[Individual] = []
+        for front in fronts:
+            if len(next_population) + len(front) <= self.population_size:
+                next_population.extend(front)
+            else:
+                last = front
+                break
+        if not last:
+            return next_population
+
+        n_select = self.population_size - len(next_population)
+        F = np.array([ind.objectives for ind in next_population + last], dtype=float)
+        finite = np.all(np.isfinite(F), axis=1)
+        is_last = np.arange(len(F)) >= len(next_population)
+        chosen: list[int] = []
+        with use_rng(self.rng_service.stream(NICHING, self.generation)):
+            if finite.any():
+                niches, distances = associate(normalize(F[finite]), self.ref_dirs)
+                niche_counts = np.bincount(niches[~is_last[finite]], minlength=len(self.ref_dirs))
+                last_finite = np.flatnonzero(finite & is_last)
+                mask = is_last[finite]
+                picked = niching(min(n_select, len(last_finite)), niche_counts, niches[mask], distances[mask])
+                chosen = [int(last_finite[k]) for k in picked]
+            if len(chosen) < n_select:
+                rest = np.flatnonzero(~finite & is_last)
+                chosen += [int(k) for k in get_rng().choice(rest, size=n_select - len(chosen), replace=False)]
+        individuals = next_population + last
+        return next_population + [individuals[k] for k in chosen]
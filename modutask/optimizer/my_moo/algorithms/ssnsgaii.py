@@ -0,0 +1,121 @@
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Callable, Optional
+from modutask.optimizer.my_moo.algorithms.nsgaii import calculate_crowding_distance, fast_non_dominated_sort, tournament_selection
+from modutask.optimizer.my_moo.core.individual import Individual
+from modutask.optimizer.my_moo.core.population import Population
+from modutask.optimizer.my_moo.evaluator import BaseEvaluator, SerialEvaluator
+from modutask.optimizer.my_moo.rng_manager import VARIATION, RNGService, get_rng_service, use_rng
+from modutask.optimizer.my_moo.utils import constrained_dominates
+
+def insert_into_fronts(fronts: list[list[Individual]], q: Individual) -> int:
+    """
+    非支配フロントに個体を1つ挿入し、ランクを差分更新する
+    q を支配する個体のない最初のフロントに入れ、q に支配された個体を次のフロントへ順に押し下げる
+    変化した最初のフロントの番号を返す
+    """
+    k = 0
+    while k < len(fronts) and any(constrained_dominates(p, q) for p in fronts[k]):
+        k += 1
+    first_changed = k
+    moved = [q]
+    while moved:
+        for ind in moved:
+            ind.fitness['rank'] = k
+        if k == len(fronts):
+            fronts.append(moved)
+            break
+        dominated = [p for p in fronts[k] if any(constrained_dominates(m, p) for m in moved)]
+        fronts[k] = [p for p in fronts[k] if p not in dominated] + moved
+        moved = dominated
+        k += 1
+    return first_changed
+
+def remove_worst(fronts: list[list[Individual]]) -> Individual:
+    """最後のフロントから混雑距離が最小の個体を取り除く（他のフロントのランクは変わらない）"""
+    last = fronts[-1]
+    worst = min(last, key=lambda ind: ind.fitness['crowding_distance'])
+    last.remove(worst)
+    if not last:
+        fronts.pop()
+    else:
+        calculate_crowding_distance(last)
+    return worst
+
+class SteadyStateNSGAII:
+    """
+    非同期・定常状態型のNSGA-II
+    評価が終わった子個体から順に個体群へ挿入するため、評価時間のばらつきがあっても世代の同期待ちが発生しない
+    常に max_in_flight 個の評価を投入し続ける
+    ※ 挿入順が評価の完了順に依存するため、結果が再現されるのは逐次評価（または max_in_flight=1）の場合のみ
+    """
+    def __init__(
+        self,
+        func: Callable[[list[int]], list[float]],
+        encoding,
+        population_size: int = 50,
+        max_evaluations: int = 5000,
+        evaluator: Optional[BaseEvaluator] = None,
+        max_in_flight: int = 1,
+        rng_service: Optional[RNGService] = None,
+        initial_genomes: Optional[list[Any]] = None,
+    ):
+        self.func = func
+        self.encoding = encoding
+        self.population_size = population_size
+        self.max_evaluations = max_evaluations
+        self.evaluator = evaluator if evaluator is not None else SerialEvaluator(func)  # 指定があれば func の代わりに使用
+        self.max_in_flight = max_in_flight
+        self.rng_service = rng_service if rng_service is not None else get_rng_service()
+        self.evaluations = 0  # 評価が完了した子個体の数
+        self.submitted = 0  # 投入済みの子個体の数
+
+        population = Population.initialize(population_size, encoding, self.rng_service, initial_genomes)
+        population.evaluate(self.evaluator)
+        self.fronts = [front for front in fast_non_dominated_sort(list(population))
+                       if front[0].fitness['rank'] != float('inf')]  # 重複個体は除く
+        for front in self.fronts:
+            calculate_crowding_distance(front)
+
+    @property
+    def individuals(self) -> list[Individual]:
+        return [ind for front in self.fronts for ind in front]
+
+    def _generate_child(self) -> Individual:
+        """現在の個体群から子個体を1つ生成（投入番号ごとに独立な乱数ストリームを使う）"""
+        population = self.individuals
+        with use_rng(self.rng_service.stream(VARIATION, self.submitted)):
+            p1 = tournament_selection(population)
+            p2 = tournament_selection(population)
+            child = p1.crossover(p2)
+            child.mutate()
+        self.submitted += 1
+        return child
+
+    def _insert(self, child: Individual) -> None:
+        """評価済みの子個体を挿入し、最悪個体を1つ取り除く"""
+        if any(child == ind for ind in self.individuals):
+            return  # 重複個体は挿入しない
+        first_changed = insert_into_fronts(self.fronts, child)
+        for front in self.fronts[first_changed:]:
+            calculate_crowding_distance(front)
+        if len(self.individuals) > self.population_size:
+            remove_worst(self.fronts)
+
+    def evolve(self):
+        pending: dict[Future, Individual] = {}
+        while self.evaluations < self.max_evaluations:
+            # 1. 評価中の個体数が上限になるまで子個体を投入
+            while len(pending) < self.max_in_flight and self.submitted < self.max_evaluations:
+                child = self._generate_child()
+                pending[self.evaluator.submit(child.genome)] = child
+
+            # 2. 評価が終わった個体から順に挿入
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                child = pending.pop(future)
+                child.set_objectives(future.result())
+                self._insert(child)
+                self.evaluations += 1
+
+    def get_result(self) -> list[Individual]:
+        return self.individuals
@@ -0,0 +1,159 @@
+from typing import Any, Iterator, Optional
+import numpy as np
+from modutask.optimizer.my_moo.core.individual import Individual
+from modutask.optimizer.my_moo.telemetry import BaseCallback, GenerationRecord
+
+class _Node:
+    """ND-tree のノード（葉は個体を持ち、内部ノードは子ノードを持つ。ideal / nadir は配下の目的関数値を囲む箱）"""
+    __slots__ = ('points', 'individuals', 'children', 'ideal', 'nadir')
+
+    def __init__(self, points: Optional[np.ndarray] = None, individuals: Optional[list[Individual]] = None):
+        self.points = points
+        self.individuals = individuals if individuals is not None else []
+        self.children: list['_Node'] = []
+        self.ideal = points.min(axis=0) if points is not None and len(points) > 0 else None
+        self.nadir = points.max(axis=0) if points is not None and len(points) > 0 else None
+
+    @property
+    def is_leaf(self) -> bool:
+        return not self.children
+
+def _is_empty(node: _Node) -> bool:
+    return not node.individuals if node.is_leaf else not node.children
+
+def _collect(node: _Node) -> list[Individual]:
+    """node の配下の個体"""
+    result: list[Individual] = []
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current.is_leaf:
+            result.extend(current.individuals)
+        else:
+            stack.extend(reversed(current.children))
+    return result
+
+class ParetoArchive(BaseCallback):
+    """
+    これまでに見つかった実行可能な非支配解をすべて保持するアーカイブ（ND-tree）
+    目的関数値を囲む箱（ideal / nadir）の木で、箱ごとに支配判定を打ち切るため、挿入と支配判定は非支配解の数に対してほぼ対数時間
+    すでにある解に弱支配される（同じ目的関数値を含む）解は加えず、新しい解に支配された解は取り除く
+    コールバックとして登録すると世代ごとの個体群を加える（生存選択で落ちた非支配解も残る）
+    登録したアーカイブの解はチェックポイントに保存され、再開時に復元される
+    max_leaf_size: 葉に置く解の数の上限（超えると目的関数の数 + 1 個の子に分割する）
+    """
+    def __init__(self, max_leaf_size: int = 20):
+        self.max_leaf_size = max(max_leaf_size, 2)
+        self.root: Optional[_Node] = None
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[Individual]:
+        return iter(self.individuals())
+
+    def individuals(self) -> list[Individual]:
+        return _collect(self.root) if self.root is not None else []
+
+    def clear(self) -> None:
+        self.root = None
+        self.size = 0
+
+    def on_generation(self, algorithm: Any, record: GenerationRecord) -> None:
+        self.extend(list(algorithm.population))
+
+    def extend(self, individuals: list[Individual]) -> int:
+        """個体をまとめて加え、加わった数を返す"""
+        return sum(self.add(ind) for ind in individuals)
+
+    def covers(self, objectives: list[float]) -> bool:
+        """objectives がアーカイブ中のいずれかの解に弱支配されるなら True"""
+        return self.root is not None and self._covers(self.root, np.asarray(objectives, dtype=float))
+
+    def add(self, individual: Individual) -> bool:
+        """個体を加える（実行不可能・inf を含む・既存の解に弱支配される個体は加えず False）"""
+        y = np.asarray(individual.objectives, dtype=float)
+        if not individual.feasible or not np.all(np.isfinite(y)):
+            return False
+        if self.root is not None:
+            if self._covers(self.root, y):
+                return False
+            self._remove_dominated(self.root, y)
+            if _is_empty(self.root):
+                self.root = None
+        if self.root is None:
+            self.root = _Node(y[None, :].copy(), [individual])
+        else:
+            self._insert(self.root, y, individual)
+        self.size += 1
+        return True
+
+    def _covers(self, node: _Node, y: np.ndarray) -> bool:
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if not np.all(current.ideal <= y):
+                continue  # 箱の中のどの解も y を弱支配できない
+            if np.all(current.nadir <= y):
+                return True  # 箱の中のすべての解が y を弱支配する
+            if current.is_leaf:
+                if np.any(np.all(current.points <= y, axis=1)):
+                    return True
+            else:
+                stack.extend(current.children)
+        return False
+
+    def _remove_dominated(self, node: _Node, y: np.ndarray) -> None:
+        """
+        y に支配される解を node の配下から取り除き、空になった子ノードを外す
+        解を取り除いても ideal / nadir は縮めない（配下の解を囲む箱のままなので判定は正しい）
+        """
+        if not np.all(y <= node.nadir):
+            return  # 箱の中のどの解も y に支配されない
+        if np.all(y <= node.ideal):
+            # 箱の中のすべての解を y が支配する
+            self.size -= len(_collect(node))
+            node.points = np.empty((0, len(y)))
+            node.individuals = []
+            node.children = []
+            return
+        if node.is_leaf:
+            keep = ~np.all(y <= node.points, axis=1)
+            if not np.all(keep):
+                self.size -= int(np.sum(~keep))
+                node.points = node.points[keep]
+                node.individuals = [ind for ind, k in zip(node.individuals, keep) if k]
+            return
+        for child in node.children:
+            self._remove_dominated(child, y)
+        node.children = [child for child in node.children if not _is_empty(child)]
+
+    def _insert(self, node: _Node, y: np.ndarray, individual: Individual) -> None:
+        while True:
+            node.ideal = np.minimum(node.ideal, y) if node.ideal is not None else y.copy()
+            node.nadir = np.maximum(node.nadir, y) if node.nadir is not None else y.copy()
+            if node.is_leaf:
+                node.points = np.vstack([node.points, y[None, :]])
+                node.individuals.append(individual)
+                if len(node.individuals) > self.max_leaf_size:
+                    self._split(node)
+                return
+            # 箱の中心が最も近い子に下りる
+            centers = np.array([(child.ideal + child.nadir) / 2 for child in node.children])
+            node = node.children[int(np.argmin(np.sum((centers - y) ** 2, axis=1)))]
+
+    def _split(self, node: _Node) -> None:
+        """葉を目的関数の数 + 1 個の子に分ける（互いに遠い解を種に、残りは最も近い種の子へ）"""
+        points = node.points
+        n_children = min(points.shape[1] + 1, len(points))
+        distances = np.linalg.norm(points[:, None, :] - points[None, :, :], axis=2)
+        seeds = [int(np.argmax(distances.mean(axis=1)))]
+        while len(seeds) < n_children:
+            seeds.append(int(np.argmax(distances[:, seeds].min(axis=1))))
+        assignment = np.argmin(distances[:, seeds], axis=1)
+        assignment[seeds] = np.arange(n_children)
+        node.children = [_Node(points[assignment == k], [ind for ind, a in zip(node.individuals, assignment) if a == k])
+                         for k in range(n_children)]
+        node.points = None
+        node.individuals = []
@@ -0,0 +1,310 @@
+import ipaddress
+import multiprocessing as mp
+import os
+import pickle
+import socket
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import Future
+from itertools import count
+from multiprocessing.connection import AuthenticationError, Client, Connection, Listener, answer_challenge, deliver_challenge
+from typing import Any, Callable, Optional, Union
+from modutask.optimizer.my_moo.evaluator import BaseEvaluator
+from modutask.optimizer.my_moo.rng_manager import RNGService, get_rng_service, init_worker_rng
+from modutask.utils.logger import raise_with_log
+
+AUTHKEY_ENV = 'MODUTASK_BROKER_AUTHKEY'  # 認証キーを設定ファイルに書かない場合の環境変数
+
+def parse_address(address: str) -> tuple[str, Any]:
+    """'tcp://host:port' または 'unix:///path' を multiprocessing.connection のファミリと接続先に変換"""
+    if address.startswith('tcp://'):
+        host, _, port = address[len('tcp://'):].rpartition(':')
+        return 'AF_INET', (host, int(port))
+    if address.startswith('unix://'):
+        return 'AF_UNIX', address[len('unix://'):]
+    raise_with_log(ValueError, f"Unknown address: {address}.")
+
+def resolve_authkey(authkey: Optional[Union[str, bytes]] = None) -> Optional[bytes]:
+    """認証キー（省略すると環境変数 MODUTASK_BROKER_AUTHKEY、どちらもなければ None）"""
+    if authkey is None:
+        authkey = os.environ.get(AUTHKEY_ENV) or None
+    if isinstance(authkey, str):
+        authkey = authkey.encode()
+    return authkey
+
+def is_local_address(family: str, target: Any) -> bool:
+    """Unix ソケットまたはループバックの TCP アドレスか"""
+    if family == 'AF_UNIX':
+        return True
+    try:
+        return ipaddress.ip_address(socket.gethostbyname(target[0])).is_loopback
+    except (OSError, ValueError):
+        return False
+
+class EvaluationBroker:
+    """
+    ソケット経由で評価ワーカーに遺伝子を配る仲介役
+    接続ごとのスレッドがキューからまとめて遺伝子を取り出して送り、結果を Future に返す
+    heartbeat_timeout 秒以上ワーカーから応答がない、または接続が切れた場合は、割り当て中のタスクをキューの先頭に戻す
+    メッセージは pickle で送受信するため、接続ごとに authkey による相互認証を済ませてから受信する
+    authkey を省略すると環境変数 MODUTASK_BROKER_AUTHKEY を使い、どちらもなければ手元のワーカー用に乱数のキーを作る
+    （その場合はループバック・Unix ソケットにしか待ち受けない）
+    """
+    def __init__(self, address: str = 'tcp://127.0.0.1:0', batch_size: int = 8, heartbeat_timeout: float = 10.0,
+                 max_retries: int = 3, rng_service: Optional[RNGService] = None,
+                 authkey: Optional[Union[str, bytes]] = None):
+        self.batch_size = batch_size
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_retries = max_retries
+        self.rng_service = rng_service if rng_service is not None else get_rng_service()
+
+        family, target = parse_address(address)
+        authkey = resolve_authkey(authkey)
+        if authkey is None:
+            if not is_local_address(family, target):
+                raise_with_log(ValueError, f"Refusing to listen on {address} without an authkey "
+                                           f"(set {AUTHKEY_ENV} or pass authkey).")
+            authkey = os.urandom(32)
+        self.authkey = authkey
+        if family == 'AF_UNIX' and os.path.exists(target):
+            os.unlink(target)
+        # 認証は接続ごとのスレッドで行う（認証しない接続が他のワーカーの受け付けを止めないように）
+        self.listener = Listener(target, family=family)
+        if family == 'AF_INET':
+            host, port = self.listener.address[:2]
+            self.address = f"tcp://{host}:{port}"  # ポート0を指定した場合は実際のポート番号
+        else:
+            self.address = address
+
+        self.condition = threading.Condition()
+        self.queue: deque[int] = deque()  # 未割り当てのタスク番号
+        self.futures: dict[int, Future] = {}
+        self.genomes: dict[int, Any] = {}
+        self.retries: dict[int, int] = {}
+        self.n_workers = 0  # 接続中のワーカー数
+        self.lost_tasks = 0  # ワーカーの喪失で再投入したタスク数
+        self.closed = False
+        self._task_ids = count()
+        self._worker_ids = count()
+        self._accept_thread = threading.Thread(target=self._accept_loop, daemon=True)
+        self._accept_thread.start()
+
+    def submit(self, genome: Any) -> Future:
+        future: Future = Future()
+        with self.condition:
+            if self.closed:
+                raise_with_log(RuntimeError, "Broker is closed.")
+            task_id = next(self._task_ids)
+            self.futures[task_id] = future
+            self.genomes[task_id] = genome
+            self.retries[task_id] = 0
+            self.queue.append(task_id)
+            self.condition.notify()
+        return future
+
+    def _accept_loop(self) -> None:
+        while True:
+            try:
+                conn = self.listener.accept()
+            except OSError:
+                break
+            if self.closed:
+                conn.close()  # close() が待ち受けを解除するための接続
+                break
+            threading.Thread(target=self._serve_worker, args=(conn,), daemon=True).start()
+
+    def _take_batch(self) -> list[int]:
+        """キューからタスクをまとめて取り出す（接続中のワーカーに均等に行き渡る大きさに制限）"""
+        with self.condition:
+            while not self.queue and not self.closed:
+                self.condition.wait()
+            size = max(1, min(self.batch_size, -(-len(self.queue) // max(1, self.n_workers))))
+            batch = []
+            while self.queue and len(batch) < size:
+                task_id = self.queue.popleft()
+                if task_id in self.futures:
+                    batch.append(task_id)
+            return batch
+
+    def _resolve(self, task_id: int, result: Any = None, error: Optional[BaseException] = None) -> None:
+        with self.condition:
+            future = self.futures.pop(task_id, None)
+            self.genomes.pop(task_id, None)
+            self.retries.pop(task_id, None)
+        if future is None:
+            return  # 再投入後に別のワーカーが先に返した場合
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _requeue(self, task_ids: set[int]) -> None:
+        """失われたタスクを再投入（max_retries 回を超えたものは失敗させる）"""
+        failed = []
+        with self.condition:
+            for task_id in sorted(task_ids, reverse=True):
+                if task_id not in self.futures:
+                    continue
+                self.lost_tasks += 1
+                self.retries[task_id] += 1
+                if self.retries[task_id] > self.max_retries:
+                    failed.append(task_id)
+                else:
+                    self.queue.appendleft(task_id)
+            self.condition.notify_all()
+        for task_id in failed:
+            self._resolve(task_id, error=RuntimeError(f"Task {task_id} was lost {self.max_retries + 1} times."))
+
+    def _serve_worker(self, conn: Connection) -> None:
+        try:
+            deliver_challenge(conn, self.authkey)
+            answer_challenge(conn, self.authkey)
+        except (OSError, EOFError, AuthenticationError):
+            conn.close()  # 認証できない接続からは何も受け取らない
+            return
+        worker_id = next(self._worker_ids)
+        remaining: set[int] = set()
+        with self.condition:
+            self.n_workers += 1
+        try:
+            conn.send(('welcome', worker_id, self.rng_service))
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    if self.closed:
+                        conn.send(('shutdown',))
+                        break
+                    continue
+                remaining = set(batch)
+                conn.send(('tasks', [(task_id, self.genomes[task_id]) for task_id in batch]))
+                while remaining:
+                    if not conn.poll(self.heartbeat_timeout):
+                        raise TimeoutError(f"Worker {worker_id} sent no heartbeat for {self.heartbeat_timeout} s.")
+                    message = conn.recv()
+                    if message[0] == 'result':
+                        _, task_id, objectives = message
+                        self._resolve(task_id, result=objectives)
+                        remaining.discard(task_id)
+                    elif message[0] == 'error':
+                        _, task_id, trace = message
+                        self._resolve(task_id, error=RuntimeError(f"Evaluation failed on worker {worker_id}:\n{trace}"))
+                        remaining.discard(task_id)
+                    # 'heartbeat' は受信できたことだけで十分
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self._requeue(remaining)
+        finally:
+            with self.condition:
+                self.n_workers -= 1
+            conn.close()
+
+    def close(self) -> None:
+        with self.condition:
+            self.closed = True
+            pending = list(self.futures)
+            self.condition.notify_all()
+        for task_id in pending:
+            self._resolve(task_id, error=RuntimeError("Broker was closed before the task finished."))
+        try:
+            Client(self.listener.address).close()  # accept() で待っているスレッドを起こす
+        except OSError:
+            pass
+        self._accept_thread.join()
+        self.listener.close()  # Unix ソケットのファイルも削除される
+
+def run_worker(address: str, func: Callable[[Any], list[float]], initializer: Optional[Callable[..., None]] = None,
+               initargs: tuple[Any, ...] = (), heartbeat_interval: float = 1.0, connect_timeout: float = 30.0,
+               authkey: Optional[Union[str, bytes]] = None) -> None:
+    """
+    ブローカーに接続し、受け取った遺伝子を func で評価して返すワーカー
+    別ホストでも同じ関数を呼び出せば計算資源を追加できる（ブローカーと同じ authkey か MODUTASK_BROKER_AUTHKEY が必要）
+    """
+    family, target = parse_address(address)
+    authkey = resolve_authkey(authkey)
+    if authkey is None:
+        raise_with_log(ValueError, f"An authkey is required to connect to {address} (set {AUTHKEY_ENV} or pass authkey).")
+    deadline = time.monotonic() + connect_timeout
+    while True:
+        try:
+            conn = Client(target, family=family, authkey=authkey)  # 認証に失敗すると AuthenticationError
+            break
+        except (ConnectionRefusedError, FileNotFoundError):
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)  # ブローカーの起動待ち
+
+    lock = threading.Lock()  # 評価結果とハートビートの送信を排他
+    stopped = threading.Event()
+
+    def heartbeat() -> None:
+        while not stopped.wait(heartbeat_interval):
+            try:
+                with lock:
+                    conn.send(('heartbeat',))
+            except OSError:
+                break
+
+    with conn:
+        _, worker_id, rng_service = conn.recv()
+        threading.Thread(target=heartbeat, daemon=True).start()  # 初期化に時間がかかってもタイムアウトしないよう先に開始
+        try:
+            init_worker_rng(rng_service, worker_id)
+            if initializer is not None:
+                initializer(*initargs)
+            while True:
+                try:
+                    message = conn.recv()
+                except (OSError, EOFError):
+                    break
+                if message[0] == 'shutdown':
+                    break
+                for task_id, genome in message[1]:
+                    try:
+                        reply = ('result', task_id, func(genome))
+                    except Exception:
+                        reply = ('error', task_id, traceback.format_exc())
+                    with lock:
+                        conn.send(reply)
+        finally:
+            stopped.set()
+
+class SocketEvaluator(BaseEvaluator):
+    """
+    ソケット経由でワーカーに評価を分散
+    n_local_workers 個のワーカーを手元で起動するほか、address に接続した別ホストの run_worker も同じように使われる
+    別ホストのワーカーを使う場合は、双方で同じ authkey（または MODUTASK_BROKER_AUTHKEY）を指定する
+    """
+    def __init__(self, func: Callable[[Any], list[float]], address: str = 'tcp://127.0.0.1:0', n_local_workers: int = 0,
+                 batch_size: int = 8, heartbeat_interval: float = 1.0, heartbeat_timeout: float = 10.0,
+                 max_retries: int = 3, initializer: Optional[Callable[..., None]] = None,
+                 initargs: tuple[Any, ...] = (), rng_service: Optional[RNGService] = None,
+                 authkey: Optional[Union[str, bytes]] = None):
+        self.broker = EvaluationBroker(address, batch_size=batch_size, heartbeat_timeout=heartbeat_timeout,
+                                       max_retries=max_retries, rng_service=rng_service, authkey=authkey)
+        self.workers = [
+            mp.Process(target=run_worker, args=(self.broker.address, func, initializer, initargs, heartbeat_interval,
+                                                30.0, self.broker.authkey),
+                       daemon=True)
+            for _ in range(n_local_workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    @property
+    def address(self) -> str:
+        return self.broker.address
+
+    def evaluate(self, genomes: list[Any]) -> list[list[float]]:
+        futures = [self.broker.submit(genome) for genome in genomes]
+        return [future.result() for future in futures]
+
+    def submit(self, genome: Any) -> Future:
+        return self.broker.submit(genome)
+
+    def close(self) -> None:
+        self.broker.close()
+        for worker in self.workers:
+            worker.join(timeout=5.0)
+            if worker.is_alive():
+                worker.terminate()
@@ -0,0 +1,134 @@
+import os
+import pickle
+from typing import Any
+from modutask.optimizer.my_moo.archive import ParetoArchive
+from modutask.optimizer.my_moo.core.individual import Individual
+from modutask.optimizer.my_moo.core.population import Population
+from modutask.optimizer.my_moo.evaluator import CachedEvaluator
+from modutask.optimizer.my_moo.rng_manager import RNGService, get_rng
+from modutask.utils.logger import raise_with_log
+
+STATE_FILE = 'state.pkl'  # 最新の個体群・世代数・乱数状態（毎回置き換え）
+CACHE_FILE = 'cache.pkl'  # 評価キャッシュ（差分を追記）
+
+def has_checkpoint(directory: str) -> bool:
+    return os.path.exists(os.path.join(directory, STATE_FILE))
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """書き込み途中で中断されても前回のファイルが残るように置き換える"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def load_checkpoint(directory: str) -> dict[str, Any]:
+    """チェックポイントを読み込む（'cache' には state 保存時点までの評価キャッシュが辞書で入る）"""
+    if not has_checkpoint(directory):
+        raise_with_log(FileNotFoundError, f"Checkpoint not found: {directory}.")
+    with open(os.path.join(directory, STATE_FILE), 'rb') as f:
+        state = pickle.load(f)
+    cache: dict[Any, list[float]] = {}
+    cache_path = os.path.join(directory, CACHE_FILE)
+    if state['cache_size'] > 0:
+        with open(cache_path, 'rb') as f:
+            # state 保存後に追記された（中断された可能性のある）部分は読まない
+            while f.tell() < state['cache_size']:
+                for key, objectives in pickle.load(f):
+                    cache.setdefault(key, objectives)
+    state['cache'] = cache
+    return state
+
+class Checkpointer:
+    """
+    interval 世代ごとに NSGAII / IBEAHV の状態を directory に保存する
+    個体群と乱数状態は小さいので毎回書き直し、評価キャッシュは前回からの差分だけを追記する
+    callbacks に ParetoArchive があれば、その解も個体群と一緒に書き直す
+    """
+    def __init__(self, directory: str, interval: int = 10):
+        self.directory = directory
+        self.interval = interval
+        self.cache_size = 0  # 有効な cache.pkl のバイト数
+        os.makedirs(directory, exist_ok=True)
+
+    def should_save(self, generation: int) -> bool:
+        return generation % self.interval == 0
+
+    def attach(self, state: dict[str, Any]) -> None:
+        """同じディレクトリから再開した場合に、保存済みのキャッシュに続けて追記する"""
+        self.cache_size = state['cache_size']
+        cache_path = os.path.join(self.directory, CACHE_FILE)
+        if os.path.exists(cache_path):
+            with open(cache_path, 'r+b') as f:
+                f.truncate(self.cache_size)
+
+    def save(self, algorithm: Any) -> None:
+        cache_path = os.path.join(self.directory, CACHE_FILE)
+        evaluator = algorithm.evaluator
+        if isinstance(evaluator, CachedEvaluator):
+            entries = evaluator.drain_new_entries()
+            if entries or self.cache_size == 0:
+                with open(cache_path, 'ab' if self.cache_size > 0 else 'wb') as f:
+                    pickle.dump(entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    f.flush()
+                    os.fsync(f.fileno())
+                    self.cache_size = f.tell()
+
+        state = {
+            'algorithm': type(algorithm).__name__,
+            'generation': algorithm.generation,
+            'evaluations': algorithm.evaluations,
+            'genomes': [ind.genome for ind in algorithm.population],
+            'objectives': [ind.objectives for ind in algorithm.population],
+            'rng_entropy': algorithm.rng_service.entropy,
+            'rng_spawn_key': algorithm.rng_service.seed_sequence.spawn_key,
+            'global_rng_state': get_rng().bit_generator.state,
+            'cache_size': self.cache_size,
+            'archives': [[(ind.genome, ind.objectives) for ind in archive] for archive in _archives(algorithm)],
+        }
+        _write_atomic(os.path.join(self.directory, STATE_FILE), pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL))
+
+def _archives(algorithm: Any) -> list[ParetoArchive]:
+    return [callback for callback in getattr(algorithm, 'callbacks', []) if isinstance(callback, ParetoArchive)]
+
+def _individuals(encoding: Any, genomes: list[Any], objectives: list[list[float]]) -> list[Individual]:
+    individuals = []
+    for genome, values in zip(genomes, objectives):
+        ind = Individual(encoding, genome=genome)
+        ind.set_objectives(values)
+        individuals.append(ind)
+    return individuals
+
+def restore_checkpoint(algorithm: Any, directory: str) -> None:
+    """保存時と同じ世代・個体群・乱数状態・アーカイブに戻し、評価キャッシュを復元する"""
+    state = load_checkpoint(directory)
+    if state['algorithm'] != type(algorithm).__name__:
+        raise_with_log(ValueError, f"Checkpoint was written by {state['algorithm']}, not {type(algorithm).__name__}.")
+    algorithm.population = Population(_individuals(algorithm.encoding, state['genomes'], state['objectives']))
+    saved_archives = state.get('archives', [])
+    for i, archive in enumerate(_archives(algorithm)):
+        # 復元前に加えた解（捨てられる初期個体群など）は残さない
+        archive.clear()
+        if i < len(saved_archives):
+            genomes = [genome for genome, _ in saved_archives[i]]
+            archive.extend(_individuals(algorithm.encoding, genomes, [values for _, values in saved_archives[i]]))
+        else:
+            archive.extend(list(algorithm.population))  # アーカイブなしで保存したチェックポイントは復元した個体群から始める
+    algorithm.generation = state['generation']
+    algorithm.evaluations = state['evaluations']
+    algorithm.rng_service = RNGService(state['rng_entropy'], spawn_key=state['rng_spawn_key'])
+    get_rng().bit_generator.state = state['global_rng_state']
+
+    checkpointer = getattr(algorithm, 'checkpointer', None)
+    same_directory = checkpointer is not None and os.path.samefile(checkpointer.directory, directory)
+    evaluator = algorithm.evaluator
+    if isinstance(evaluator, CachedEvaluator):
+        if same_directory:
+            # 保存済みのエントリは追記しない（初期個体群の評価など、復元前に追加された分も含む）
+            evaluator.new_entries = [(key, objectives) for key, objectives in evaluator.new_entries
+                                     if key not in state['cache']]
+        # 別のディレクトリに保存を続ける場合は、復元したキャッシュも次回の保存対象にする
+        evaluator.update(list(state['cache'].items()), new=checkpointer is not None and not same_directory)
+    if same_directory:
+        checkpointer.attach(state)
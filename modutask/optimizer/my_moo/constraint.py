@@ -0,0 +1,47 @@
+import math
+from typing import Any, Callable, Optional
+
+class ConstrainedObjectives(list):
+    """
+    制約違反量のベクトルを持つ目的関数値
+    list のままなので評価器・評価キャッシュ・チェックポイント・ブローカーをそのまま通り、Individual.set_objectives で違反量が読まれる
+    各制約は 0 以下なら満たし、正の値が違反量
+    """
+    def __init__(self, objectives: list[float], constraints: list[float]):
+        super().__init__(objectives)
+        self.constraints = [float(value) for value in constraints]
+
+    def __repr__(self) -> str:
+        return f"ConstrainedObjectives({list(self)}, constraints={self.constraints})"
+
+def dominated_objectives(objectives: list[float]) -> ConstrainedObjectives:
+    """
+    評価を省略した（支配されることが確定した）遺伝子の目的関数値
+    違反量を inf にして実行不可能解として扱い、評価したどの個体（実行不可能解を含む）よりも後ろに並べる
+    非支配解の抽出・アーカイブ・HV・IBEA の参照点には実行不可能解が入らないため、評価していない値が結果に残らない
+    """
+    return ConstrainedObjectives(objectives, constraints=[math.inf])
+
+def constraint_violation(values: Any) -> float:
+    """目的関数値の制約違反量の合計（制約のない目的関数値は 0）"""
+    return float(sum(max(value, 0.0) for value in getattr(values, 'constraints', [])))
+
+class ConstrainedObjective:
+    """
+    軽い制約の判定で重い目的関数の評価を省略する目的関数
+    constraints(genome) が違反していれば func を呼ばず、目的関数値を skipped（省略時は inf）にして違反量を付ける
+    制約付き支配では実行不可能解の目的関数値は比較されないため、省略した値は選択に影響しない
+    """
+    def __init__(self, func: Callable[[Any], list[float]], constraints: Callable[[Any], list[float]], n_objectives: int,
+                 skipped: Optional[list[float]] = None):
+        self.func = func
+        self.constraints = constraints
+        self.skipped = list(skipped) if skipped is not None else [math.inf] * n_objectives
+        self.skips = 0  # 評価を省略した数
+
+    def __call__(self, genome: Any) -> ConstrainedObjectives:
+        constraints = self.constraints(genome)
+        if any(value > 0 for value in constraints):
+            self.skips += 1
+            return ConstrainedObjectives(self.skipped, constraints)
+        return ConstrainedObjectives(self.func(genome), constraints)
@@ -8,4 +8,7 @@ __all__ = [
     'BaseVariable', 
     'PermutationVariable', 
     'MultiPermutationVariable',
+    'TopologicalMultiPermutationVariable',
+    'TruncatedMultiPermutationVariable',
+    'topological_repair',
     ]
@@ -1,9 +1,14 @@
 from .base import BaseVariable
 from .permutation import PermutationVariable
 from .multi_permutation import MultiPermutationVariable
+from .truncated import TruncatedMultiPermutationVariable
+from .topological import TopologicalMultiPermutationVariable, topological_repair
 
 __all__ = [
     'BaseVariable', 
     'PermutationVariable', 
     'MultiPermutationVariable',
+    'TopologicalMultiPermutationVariable',
+    'TruncatedMultiPermutationVariable',
+    'topological_repair',
     ]
\ No newline at end of file
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import Any
+from modutask.utils.logger import raise_with_log
 
 class BaseVariable(ABC):
     @abstractmethod
@@ -30,4 +31,23 @@ class BaseVariable(ABC):
     @abstractmethod
     def hash(self, value: Any) -> int:
         """値のハッシュ値を計算する"""
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def key(self, value: Any) -> Any:
+        """値を識別するキー（hash と異なりプロセスをまたいでも変わらないため、評価キャッシュの保存に使う）"""
+        pass
+
+    @abstractmethod
+    def features(self, value: Any) -> list[float]:
+        """代理モデル用の数値特徴量（値によらず同じ長さ）"""
+        pass
+
+    def repair(self, value: Any) -> Any:
+        """
+        保存済みの遺伝子などを現在の定義で有効な値に直す（要素の過不足の補正など）
+        既定では有効な値はそのまま返し、修復できない場合は例外を送出する
+        """
+        if not self.validate(value):
+            raise_with_log(ValueError, f"{type(self).__name__} cannot repair invalid value: {value}.")
+        return value
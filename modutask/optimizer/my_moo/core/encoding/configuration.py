@@ -74,6 +74,29 @@ class ConfigurationVariable(BaseVariable):
             ))
         return clone
 
+    def repair(self, value: list[Robot]) -> list[Robot]:
+        """
+        ロボットのモジュール・種類を名前で現在の modules / robot_types に置き換える
+        種類・モジュールが存在しない、故障している、他のロボットと重複する、必要数が合わないロボットは除く
+        """
+        repaired = []
+        used_names: set[str] = set()
+        for robot in value:
+            robot_type = self.robot_types.get(robot.type.name)
+            component = [self.modules.get(module.name) for module in robot.component_required]
+            if robot_type is None or any(module is None for module in component):
+                continue
+            names = [module.name for module in component]
+            if (len(set(names)) != len(names) or used_names.intersection(names)
+                    or any(module.state != ModuleState.ACTIVE for module in component)):
+                continue
+            required = {module_type.name: num for module_type, num in robot_type.required_modules.items() if num > 0}
+            if dict(Counter(module.type.name for module in component)) != required:
+                continue
+            repaired.append(Robot(robot_type=robot_type, name=robot.name, coordinate=robot.coordinate, component=component))
+            used_names.update(names)
+        return repaired
+
     def mutate(self, value: list[Robot]) -> list[Robot]:
         """突然変異"""
         rng = get_rng()
@@ -223,6 +246,29 @@ class ConfigurationVariable(BaseVariable):
         names2 = [m.name for m in mods2]
         return names1 == names2
     
+    def robot_key(self, robot: Robot) -> tuple:
+        """ロボット単位の寄与を識別するキー（種類・座標・必要モジュール集合）"""
+        return (
+            robot.type.name,
+            robot.coordinate,
+            tuple(sorted(module.name for module in robot.component_required)),
+        )
+
+    def key(self, value: list[Robot]) -> tuple:
+        return tuple(self.robot_key(robot) for robot in value)
+
+    def features(self, value: list[Robot]) -> list[float]:
+        """種類ごとのロボット数と、各モジュールを使っているか（0/1）を robot_types・modules の順に並べて連結"""
+        type_index = {name: i for i, name in enumerate(self.robot_types)}
+        module_index = {name: i for i, name in enumerate(self.modules)}
+        counts = [0.0] * len(self.robot_types)
+        used = [0.0] * len(self.modules)
+        for robot in value:
+            counts[type_index[robot.type.name]] += 1.0
+            for module in robot.component_required:
+                used[module_index[module.name]] = 1.0
+        return counts + used
+
     def hash(self, value: list[Robot]) -> int:
         hash_value = 0
         for robot in value:
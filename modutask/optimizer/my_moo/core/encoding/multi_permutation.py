@@ -1,6 +1,7 @@
 from typing import Any
 from copy import deepcopy
 from modutask.optimizer.my_moo.core.encoding import BaseVariable
+from modutask.optimizer.my_moo.core.encoding.permutation import repair_permutation
 from modutask.optimizer.my_moo.rng_manager import get_rng
 
 class MultiPermutationVariable(BaseVariable):
@@ -96,3 +97,25 @@ class MultiPermutationVariable(BaseVariable):
         for i, r in enumerate(value):
             hash_value += hash(tuple(r)) * (i + 1)
         return hash_value
+
+    def key(self, value: list[list[Any]]) -> tuple:
+        return tuple(tuple(r) for r in value)
+
+    def features(self, value: list[list[Any]]) -> list[float]:
+        """順列ごとに各要素の位置（0〜1に正規化）を items の順に並べて連結"""
+        index = {item: i for i, item in enumerate(self.items)}
+        scale = max(len(self.items) - 1, 1)
+        features = []
+        for permutation in value:
+            positions = [0.0] * len(self.items)
+            for position, item in enumerate(permutation):
+                positions[index[item]] = position / scale
+            features.extend(positions)
+        return features
+
+    def repair(self, value: list[list[Any]]) -> list[list[Any]]:
+        """各順列を items の順列に直し、順列の数を n_multi に揃える（余分は捨て、不足はランダムな順列で補う）"""
+        repaired = [repair_permutation(list(permutation), self.items) for permutation in list(value)[:self.n_multi]]
+        while len(repaired) < self.n_multi:
+            repaired.append(repair_permutation([], self.items))
+        return repaired
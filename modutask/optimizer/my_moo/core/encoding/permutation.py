@@ -2,6 +2,19 @@ from typing import Any
 from modutask.optimizer.my_moo.core.encoding import BaseVariable
 from modutask.optimizer.my_moo.rng_manager import get_rng
 
+def repair_permutation(value: list[Any], items: list[Any]) -> list[Any]:
+    """value の相対順序を保ったまま items の順列に直す（欠けた要素は末尾＝最低優先に加える）"""
+    reference = set(items)
+    seen = set()
+    repaired = []
+    for item in value:
+        if item in reference and item not in seen:
+            repaired.append(item)
+            seen.add(item)
+    missing = [item for item in items if item not in seen]
+    get_rng().shuffle(missing)
+    return repaired + missing
+
 class PermutationVariable(BaseVariable):
     def __init__(self, items: list[Any]):
         self.items = items  # 初期リスト（例：[0, 1, 2, 3, 4]）
@@ -55,4 +68,20 @@ class PermutationVariable(BaseVariable):
 
     def hash(self, value: list[Any]) -> int:
         """順列のハッシュ値を計算"""
-        return hash(tuple(value))
\ No newline at end of file
+        return hash(tuple(value))
+
+    def key(self, value: list[Any]) -> tuple:
+        return tuple(value)
+
+    def features(self, value: list[Any]) -> list[float]:
+        """各要素の位置（0〜1に正規化）を items の順に並べる"""
+        index = {item: i for i, item in enumerate(self.items)}
+        scale = max(len(self.items) - 1, 1)
+        positions = [0.0] * len(self.items)
+        for position, item in enumerate(value):
+            positions[index[item]] = position / scale
+        return positions
+
+    def repair(self, value: list[Any]) -> list[Any]:
+        """items にない要素と重複を除き、足りない要素をランダムな順で末尾に加える"""
+        return repair_permutation(value, self.items)
@@ -0,0 +1,95 @@
+from collections import deque
+from typing import Any, Hashable
+from modutask.optimizer.my_moo.core.encoding.multi_permutation import MultiPermutationVariable
+from modutask.optimizer.my_moo.rng_manager import get_rng
+from modutask.utils.logger import raise_with_log
+
+def topological_repair(permutation: list[Any], predecessors: dict[Hashable, list[Any]],
+                       successors: dict[Hashable, list[Any]]) -> list[Any]:
+    """
+    依存先が先に来るように順列を並べ直す（O(要素数 + 依存関係数)）
+    各要素は順列の位置で並べ、依存先が揃っていなければ最後の依存先の直後まで後ろにずらす
+    """
+    pending = {item: len(predecessors.get(item, [])) for item in permutation}
+    seen = set()
+    repaired = []
+    for item in permutation:
+        seen.add(item)
+        if pending[item] > 0:
+            continue
+        queue = deque([item])
+        while queue:
+            current = queue.popleft()
+            repaired.append(current)
+            for successor in successors.get(current, []):
+                if successor not in pending:
+                    continue
+                pending[successor] -= 1
+                if pending[successor] == 0 and successor in seen:
+                    queue.append(successor)
+    if len(repaired) != len(permutation):
+        raise_with_log(ValueError, "Dependencies have a cycle.")
+    return repaired
+
+class TopologicalMultiPermutationVariable(MultiPermutationVariable):
+    """
+    各順列が依存関係の位相順序（依存先が先）を守る MultiPermutationVariable
+    dependencies は要素 -> 先に終える必要のある要素のリスト（items にない要素は無視する）
+    サンプリング・順序交叉は結果を topological_repair で直し、突然変異は依存関係を崩さない範囲での移動を行う
+    """
+    def __init__(self, items: list[Any], n_multi: int, dependencies: dict[Hashable, list[Any]]):
+        super().__init__(items=items, n_multi=n_multi)
+        item_set = set(items)
+        self.predecessors = {item: [dep for dep in dependencies.get(item, []) if dep in item_set] for item in items}
+        self.successors: dict[Hashable, list[Any]] = {item: [] for item in items}
+        for item, deps in self.predecessors.items():
+            for dep in deps:
+                self.successors[dep].append(item)
+        topological_repair(list(items), self.predecessors, self.successors)  # 循環があればここで例外
+
+    def sample(self) -> list[list[Any]]:
+        """ランダムな順列を位相順序に直したもの"""
+        return [topological_repair(permutation, self.predecessors, self.successors) for permutation in super().sample()]
+
+    def mutate(self, value: list[list[Any]]) -> list[list[Any]]:
+        """
+        移動突然変異（スワップ突然変異の代わり）
+        1つの要素を、最後の依存先より後・最初の依存元より前の範囲のランダムな位置に移す
+        """
+        rng = get_rng()
+        p = float(1.0/self.n_multi)
+        mutated = []
+        for permutation in value:
+            new_perm = list(permutation)
+            if len(new_perm) >= 2 and rng.random() < p:
+                position = {item: i for i, item in enumerate(new_perm)}
+                i = int(rng.integers(len(new_perm)))
+                item = new_perm[i]
+                low = max((position[dep] + 1 for dep in self.predecessors[item]), default=0)
+                high = min((position[dep] - 1 for dep in self.successors[item]), default=len(new_perm) - 1)
+                if high > low:
+                    j = int(rng.integers(low, high + 1))
+                    new_perm.insert(j, new_perm.pop(i))
+            mutated.append(new_perm)
+        return mutated
+
+    def crossover(self, value1: list[list[Any]], value2: list[list[Any]]) -> list[list[Any]]:
+        """順序交叉（OX）の結果を位相順序に直したもの"""
+        return [topological_repair(permutation, self.predecessors, self.successors)
+                for permutation in super().crossover(value1, value2)]
+
+    def validate(self, value: list[list[Any]]) -> bool:
+        if not super().validate(value):
+            return False
+        for permutation in value:
+            position = {item: i for i, item in enumerate(permutation)}
+            if any(position[dep] > position[item] for item, deps in self.predecessors.items() for dep in deps):
+                return False
+        return True
+
+    def repair(self, value: list[list[Any]]) -> list[list[Any]]:
+        """MultiPermutationVariable.repair のあと各順列を位相順序に直す"""
+        return [topological_repair(permutation, self.predecessors, self.successors) for permutation in super().repair(value)]
+
+    def __repr__(self):
+        return f"TopologicalMultiPermutationVariable(items={self.items})"
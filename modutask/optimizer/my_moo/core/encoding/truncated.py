@@ -0,0 +1,119 @@
+from typing import Any
+from modutask.optimizer.my_moo.core.encoding.multi_permutation import MultiPermutationVariable
+from modutask.optimizer.my_moo.rng_manager import get_rng
+from modutask.utils.logger import raise_with_log
+
+class TruncatedMultiPermutationVariable(MultiPermutationVariable):
+    """
+    各順列を items のうち length 個だけの優先順位（先頭部分）にした MultiPermutationVariable
+    先頭部分のタスクがすべて完了したあとは RobotAgent が最も近い実行可能なタスクに向かう
+    遺伝子の大きさと演算子の計算量は n_multi × length（items の数によらない）
+    """
+    def __init__(self, items: list[Any], n_multi: int, length: int):
+        if length < 1:
+            raise_with_log(ValueError, f"length must be at least 1: {length}.")
+        super().__init__(items=items, n_multi=n_multi)
+        self.length = min(length, len(items))
+
+    def _unused(self, used: set) -> Any:
+        """used にない items の要素をランダムに1つ選ぶ（length が items より十分小さければ数回で見つかる）"""
+        rng = get_rng()
+        if len(used) * 2 < len(self.items):
+            while True:
+                item = self.items[int(rng.integers(len(self.items)))]
+                if item not in used:
+                    return item
+        candidates = [item for item in self.items if item not in used]
+        return candidates[int(rng.integers(len(candidates)))]
+
+    def sample(self) -> list[list[Any]]:
+        """items から length 個を選んだランダムな並び"""
+        rng = get_rng()
+        return [[self.items[i] for i in rng.choice(len(self.items), self.length, replace=False)]
+                for _ in range(self.n_multi)]
+
+    def mutate(self, value: list[list[Any]]) -> list[list[Any]]:
+        """スワップ突然変異、または1つの要素を先頭部分にない要素に置き換える（半々）"""
+        rng = get_rng()
+        p = float(1.0/self.n_multi)
+        mutated = []
+        for prefix in value:
+            new_prefix = list(prefix)
+            if rng.random() < p:
+                can_replace = len(new_prefix) < len(self.items)
+                if len(new_prefix) >= 2 and (not can_replace or rng.random() < 0.5):
+                    i, j = rng.choice(len(new_prefix), 2, replace=False)
+                    new_prefix[i], new_prefix[j] = new_prefix[j], new_prefix[i]
+                elif can_replace:
+                    new_prefix[int(rng.integers(len(new_prefix)))] = self._unused(set(new_prefix))
+            mutated.append(new_prefix)
+        return mutated
+
+    def crossover(self, value1: list[list[Any]], value2: list[list[Any]]) -> list[list[Any]]:
+        """
+        順序交叉（OX）を先頭部分に適用
+        p1 の区間を残し、空いた位置を p2 → p1 の順に区間にない要素で埋める
+        """
+        rng = get_rng()
+        child = []
+        for prefix1, prefix2 in zip(value1, value2):
+            p1, p2 = (prefix1, prefix2) if rng.random() < 0.5 else (prefix2, prefix1)
+            size = len(p1)
+            if size < 2:
+                child.append(list(p1))
+                continue
+            start, end = sorted(rng.choice(size, 2, replace=False))
+            segment = set(p1[start:end+1])
+            fill_values = [item for item in p2 if item not in segment]
+            used = segment | set(fill_values)
+            fill_iter = iter(fill_values + [item for item in p1 if item not in used])
+            child.append([p1[i] if start <= i <= end else next(fill_iter) for i in range(size)])
+        return child
+
+    def validate(self, value: list[list[Any]]) -> bool:
+        if not isinstance(value, list) or len(value) != self.n_multi:
+            return False
+        reference_set = set(self.items)
+        for prefix in value:
+            if not isinstance(prefix, list) or len(prefix) != self.length:
+                return False
+            if len(set(prefix)) != len(prefix) or not set(prefix) <= reference_set:
+                return False
+        return True
+
+    def __repr__(self):
+        return f"TruncatedMultiPermutationVariable(items={self.items}, length={self.length})"
+
+    def features(self, value: list[list[Any]]) -> list[float]:
+        """順列ごとに各要素の優先度（先頭が1、先頭部分にない要素は0）を items の順に並べて連結"""
+        index = {item: i for i, item in enumerate(self.items)}
+        features = []
+        for prefix in value:
+            priorities = [0.0] * len(self.items)
+            for position, item in enumerate(prefix):
+                priorities[index[item]] = 1.0 - position / self.length
+            features.extend(priorities)
+        return features
+
+    def repair(self, value: list[list[Any]]) -> list[list[Any]]:
+        """
+        items にない要素と重複を除いて length 個に切り詰め、足りなければランダムな要素で補う
+        全順列の遺伝子（warm start・ヒューリスティック）は先頭 length 個が使われる
+        """
+        reference = set(self.items)
+        repaired = []
+        for prefix in list(value)[:self.n_multi] + [[]] * max(self.n_multi - len(value), 0):
+            new_prefix = []
+            used = set()
+            for item in prefix:
+                if item in reference and item not in used:
+                    new_prefix.append(item)
+                    used.add(item)
+                    if len(new_prefix) == self.length:
+                        break
+            while len(new_prefix) < self.length:
+                item = self._unused(used)
+                new_prefix.append(item)
+                used.add(item)
+            repaired.append(new_prefix)
+        return repaired
@@ -1,5 +1,6 @@
 from typing import Any
 from copy import deepcopy
+from modutask.optimizer.my_moo.constraint import constraint_violation
 from modutask.optimizer.my_moo.core.encoding import BaseVariable
 
 class Individual:
@@ -7,10 +8,16 @@ class Individual:
         self.encoding = encoding
         self.genome = genome if genome is not None else self.encoding.sample()
         self.objectives: list[float] = []
+        self.constraint_violation = 0.0  # 制約違反量の合計（0 なら実行可能）
         self.fitness: dict[str, Any] = {}
 
     def set_objectives(self, values: list[float]):
         self.objectives = values
+        self.constraint_violation = constraint_violation(values)
+
+    @property
+    def feasible(self) -> bool:
+        return self.constraint_violation <= 0
 
     def crossover(self, other: 'Individual') -> 'Individual':
         child_genome = self.encoding.crossover(self.genome, other.genome)
@@ -23,6 +30,7 @@ class Individual:
         clone = Individual(self.encoding)
         clone.genome = self.genome[:]
         clone.objectives = self.objectives[:]
+        clone.constraint_violation = self.constraint_violation
         clone.fitness = deepcopy(self.fitness)
         return clone
 
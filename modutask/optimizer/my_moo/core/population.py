@@ -1,21 +1,37 @@
-from typing import Any, Callable
+from typing import Any, Optional
 from modutask.optimizer.my_moo.core.encoding import BaseVariable
 from modutask.optimizer.my_moo.core.individual import Individual
+from modutask.optimizer.my_moo.evaluator import BaseEvaluator
+from modutask.optimizer.my_moo.rng_manager import INITIALIZATION, RNGService, get_rng_service, use_rng
 
 class Population:
     def __init__(self, individuals: list[Individual]):
         self.individuals = individuals
 
     @classmethod
-    def initialize(cls, size: int, encoding: BaseVariable) -> 'Population':
-        """指定したサイズの個体群をランダム生成"""
-        individuals = [Individual(encoding) for _ in range(size)]
+    def initialize(cls, size: int, encoding: BaseVariable, rng_service: Optional[RNGService] = None,
+                   initial_genomes: Optional[list[Any]] = None) -> 'Population':
+        """
+        指定したサイズの個体群をランダム生成（個体ごとに独立な乱数ストリームを使用）
+        initial_genomes を指定すると先頭のスロットに encoding.repair で修復した遺伝子を使い（size を超える分は捨てる）、
+        残りをランダム生成する
+        """
+        rng_service = rng_service if rng_service is not None else get_rng_service()
+        initial_genomes = list(initial_genomes or [])[:size]
+        individuals = []
+        for slot in range(size):
+            with use_rng(rng_service.stream(INITIALIZATION, slot)):
+                if slot < len(initial_genomes):
+                    individuals.append(Individual(encoding, genome=encoding.repair(initial_genomes[slot])))
+                else:
+                    individuals.append(Individual(encoding))
         return cls(individuals)
 
-    def evaluate(self, func: Callable[[Any], list[float]]):
+    def evaluate(self, evaluator: BaseEvaluator):
         """全個体を一括評価"""
-        for ind in self.individuals:
-            ind.objectives = func(ind.genome)
+        results = evaluator.evaluate([ind.genome for ind in self.individuals])
+        for ind, objectives in zip(self.individuals, results):
+            ind.set_objectives(objectives)
 
     def __len__(self):
         return len(self.individuals)
@@ -0,0 +1,146 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import Value
+from typing import Any, Callable, Optional
+from modutask.optimizer.my_moo.rng_manager import RNGService, get_rng_service, init_worker_rng
+
+class BaseEvaluator(ABC):
+    """ 遺伝子の評価方法を定義する抽象基底クラス """
+
+    @abstractmethod
+    def evaluate(self, genomes: list[Any]) -> list[list[float]]:
+        """遺伝子のリストを評価し、入力と同じ順序で目的関数値を返す"""
+        pass
+
+    def submit(self, genome: Any) -> Future:
+        """1つの遺伝子の評価を投入し、目的関数値を返す Future を得る（既定では同期的に評価）"""
+        future: Future = Future()
+        try:
+            future.set_result(self.evaluate([genome])[0])
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def close(self) -> None:
+        """評価に使ったリソースを解放する"""
+        pass
+
+    def __enter__(self) -> "BaseEvaluator":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+class SerialEvaluator(BaseEvaluator):
+    """ 呼び出し元プロセスで逐次評価 """
+    def __init__(self, func: Callable[[Any], list[float]]):
+        self.func = func
+
+    def evaluate(self, genomes: list[Any]) -> list[list[float]]:
+        return [self.func(genome) for genome in genomes]
+
+def _initialize_worker(counter: Any, rng_service: RNGService,
+                       initializer: Optional[Callable[..., None]], initargs: tuple[Any, ...]) -> None:
+    """ワーカー番号を採番し、ワーカー固有の乱数ストリームを設定してから initializer を呼ぶ"""
+    with counter.get_lock():
+        worker_id = counter.value
+        counter.value += 1
+    init_worker_rng(rng_service, worker_id)
+    if initializer is not None:
+        initializer(*initargs)
+
+class PoolEvaluator(BaseEvaluator):
+    """
+    プロセスプールで並列評価
+    静的なモデルは initializer でワーカーごとに一度だけ読み込み、タスクごとには遺伝子と目的関数値だけを送受信する
+    """
+    def __init__(self, func: Callable[[Any], list[float]], n_workers: int,
+                 initializer: Optional[Callable[..., None]] = None, initargs: tuple[Any, ...] = (), chunksize: int = 1,
+                 rng_service: Optional[RNGService] = None):
+        self.func = func
+        self.chunksize = chunksize
+        rng_service = rng_service if rng_service is not None else get_rng_service()
+        self.executor = ProcessPoolExecutor(
+            max_workers=n_workers, 
+            initializer=_initialize_worker, 
+            initargs=(Value('i', 0), rng_service, initializer, initargs),
+            )
+
+    def evaluate(self, genomes: list[Any]) -> list[list[float]]:
+        return list(self.executor.map(self.func, genomes, chunksize=self.chunksize))
+
+    def submit(self, genome: Any) -> Future:
+        return self.executor.submit(self.func, genome)
+
+    def close(self) -> None:
+        self.executor.shutdown()
+
+class CachedEvaluator(BaseEvaluator):
+    """
+    評価済みの遺伝子の目的関数値を再利用する
+    キーは encoding.key で求めるため、キャッシュをチェックポイントに保存して別プロセスで再開しても使える
+    """
+    def __init__(self, evaluator: BaseEvaluator, encoding: Any):
+        self.evaluator = evaluator
+        self.encoding = encoding
+        self.cache: dict[Any, list[float]] = {}
+        self.new_entries: list[tuple[Any, list[float]]] = []  # 前回 drain_new_entries 以降に追加されたエントリ
+        self.hits = 0
+        self.misses = 0
+
+    def _store(self, key: Any, objectives: list[float]) -> None:
+        if key not in self.cache:
+            self.cache[key] = objectives
+            self.new_entries.append((key, objectives))
+
+    def evaluate(self, genomes: list[Any]) -> list[list[float]]:
+        keys = [self.encoding.key(genome) for genome in genomes]
+        # 未評価の遺伝子だけをまとめて評価（同じ呼び出し内の重複も1回にする）
+        missing: dict[Any, Any] = {}
+        for key, genome in zip(keys, genomes):
+            if key in self.cache:
+                self.hits += 1
+            elif key in missing:
+                self.hits += 1
+            else:
+                missing[key] = genome
+                self.misses += 1
+        if missing:
+            for key, objectives in zip(missing, self.evaluator.evaluate(list(missing.values()))):
+                self._store(key, objectives)
+        return [self.cache[key] for key in keys]
+
+    def submit(self, genome: Any) -> Future:
+        key = self.encoding.key(genome)
+        if key in self.cache:
+            self.hits += 1
+            future: Future = Future()
+            future.set_result(self.cache[key])
+            return future
+        self.misses += 1
+        future = self.evaluator.submit(genome)
+        future.add_done_callback(lambda f: self._store(key, f.result()) if f.exception() is None else None)
+        return future
+
+    def update(self, entries: list[tuple[Any, list[float]]], new: bool = False) -> None:
+        """キャッシュにエントリを追加（new=True なら次の drain_new_entries の対象にする）"""
+        for key, objectives in entries:
+            if new:
+                self._store(key, objectives)
+            else:
+                self.cache.setdefault(key, objectives)
+
+    def drain_new_entries(self) -> list[tuple[Any, list[float]]]:
+        """前回以降に追加されたエントリを返し、記録をリセットする"""
+        entries, self.new_entries = self.new_entries, []
+        return entries
+
+    def close(self) -> None:
+        self.evaluator.close()
+
+def skipped_evaluations(evaluator: BaseEvaluator) -> int:
+    """
+    evaluate に渡されたが完全には評価しなかった遺伝子の累計
+    （CachedEvaluator のキャッシュヒット、BoundPruningEvaluator の枝刈り、RacingEvaluator のレーシングで省略した数の和）
+    """
+    return sum(getattr(evaluator, name, 0) for name in ('hits', 'pruned', 'raced'))
@@ -0,0 +1,102 @@
+from typing import Any, Callable, Hashable, Optional
+from modutask.optimizer.my_moo.core.individual import Individual
+from modutask.optimizer.my_moo.core.population import Population
+from modutask.optimizer.my_moo.rng_manager import LOCAL_SEARCH, get_rng, use_rng
+from modutask.optimizer.my_moo.utils import constrained_dominates, get_non_dominated_individuals
+from modutask.utils.logger import raise_with_log
+
+def adjacent_swap(max_position: Optional[int] = None) -> Callable[[list[list[Any]]], list[list[Any]]]:
+    """
+    ランダムな1台の優先順位で隣り合う2つを入れ替える近傍（MultiPermutationVariable 系の遺伝子）
+    max_position を指定すると先頭 max_position 個の範囲だけを対象にする（max_step 内に参照されない後半は結果に影響しない）
+    """
+    def move(genome: list[list[Any]]) -> list[list[Any]]:
+        rng = get_rng()
+        i = int(rng.integers(len(genome)))
+        priority = list(genome[i])
+        size = min(len(priority), max_position) if max_position is not None else len(priority)
+        if size < 2:
+            return genome
+        j = int(rng.integers(size - 1))
+        priority[j], priority[j + 1] = priority[j + 1], priority[j]
+        return [priority if k == i else list(p) for k, p in enumerate(genome)]
+    return move
+
+def dependency_move(dependencies: dict[Hashable, list[Any]]) -> Callable[[list[list[Any]]], list[list[Any]]]:
+    """
+    依存先より前に並んでいる（依存先が未完了のまま向かって待機しうる）タスクを、最後の依存先の直後に移す近傍
+    ランダムな1台の優先順位からそのようなタスクを1つ選ぶ（なければ遺伝子をそのまま返す）
+    """
+    def move(genome: list[list[Any]]) -> list[list[Any]]:
+        rng = get_rng()
+        i = int(rng.integers(len(genome)))
+        priority = list(genome[i])
+        position = {item: k for k, item in enumerate(priority)}
+        blocked = [item for item in priority
+                   if any(position.get(dep, -1) > position[item] for dep in dependencies.get(item, []))]
+        if not blocked:
+            return genome
+        item = blocked[int(rng.integers(len(blocked)))]
+        last = max(position[dep] for dep in dependencies[item] if dep in position)
+        priority.insert(last, priority.pop(position[item]))  # pop で後ろが1つ詰まるので last の位置が依存先の直後になる
+        return [priority if k == i else list(p) for k, p in enumerate(genome)]
+    return move
+
+class LocalSearch:
+    """
+    非支配個体に対する局所探索（ミーム的アルゴリズムの局所探索段階）
+    interval 世代ごとに、個体群の非支配個体から moves（遺伝子 -> 近傍の遺伝子）で近傍を作り、
+    重複を除いた最大 budget 個をまとめて評価する。元の個体に支配されず目的関数値の異なる近傍を返し、アルゴリズムが生存選択に加える
+    近傍の生成には世代と試行番号ごとの独立な乱数ストリームを使う
+    encoding.validate を満たさない近傍（TopologicalMultiPermutationVariable で依存関係を崩した入れ替えなど）は encoding.repair で直す
+    前半が共通する遺伝子の評価を省略できる評価器（PrefixSharingEvaluator など）と組み合わせると、後半だけを変える近傍は安く評価できる
+    """
+    def __init__(self, moves: list[Callable[[Any], Any]], interval: int = 5, budget: int = 20, max_attempts: Optional[int] = None):
+        if not moves:
+            raise_with_log(ValueError, "moves must not be empty.")
+        if interval < 1 or budget < 1:
+            raise_with_log(ValueError, f"interval and budget must be at least 1: {interval}, {budget}.")
+        self.moves = moves
+        self.interval = interval
+        self.budget = budget
+        self.max_attempts = max_attempts if max_attempts is not None else 10 * budget  # 近傍が重複し続ける場合の打ち切り
+        self.evaluations = 0  # 局所探索で評価に回した遺伝子の累計
+        self.accepted = 0  # 生存選択に加えた近傍の累計
+
+    def should_run(self, generation: int) -> bool:
+        return generation % self.interval == 0
+
+    def neighbors(self, algorithm: Any) -> list[tuple[Individual, Any]]:
+        """非支配個体を順に巡って (元の個体, 近傍の遺伝子) を最大 budget 個作る（修復して元の個体と同じになった近傍は除く）"""
+        elites = get_non_dominated_individuals(list(algorithm.population))
+        encoding = algorithm.encoding
+        seen = {encoding.key(ind.genome) for ind in algorithm.population}
+        candidates = []
+        for attempt in range(self.max_attempts):
+            if len(candidates) >= self.budget:
+                break
+            with use_rng(algorithm.rng_service.stream(LOCAL_SEARCH, algorithm.generation, attempt)):
+                parent = elites[attempt % len(elites)]
+                move = self.moves[int(get_rng().integers(len(self.moves)))]
+                genome = move(parent.genome)
+                if not encoding.validate(genome):
+                    genome = encoding.repair(genome)  # 依存関係の位相順序を崩した近傍などを直す
+            key = encoding.key(genome)
+            if key in seen:
+                continue
+            seen.add(key)
+            candidates.append((parent, genome))
+        return candidates
+
+    def improve(self, algorithm: Any) -> list[Individual]:
+        """近傍を評価し、元の個体に支配されず目的関数値が異なるものを返す（結果の変わらない近傍は加えない）"""
+        candidates = self.neighbors(algorithm)
+        if not candidates:
+            return []
+        offspring = Population([Individual(algorithm.encoding, genome=genome) for _, genome in candidates])
+        offspring.evaluate(algorithm.evaluator)
+        self.evaluations += len(candidates)
+        accepted = [child for (parent, _), child in zip(candidates, offspring)
+                    if not constrained_dominates(parent, child) and list(child.objectives) != list(parent.objectives)]
+        self.accepted += len(accepted)
+        return accepted
@@ -0,0 +1,54 @@
+from concurrent.futures import Future
+from typing import Any, Callable
+import numpy as np
+from modutask.optimizer.my_moo.constraint import dominated_objectives
+from modutask.optimizer.my_moo.evaluator import BaseEvaluator, CachedEvaluator
+from modutask.optimizer.my_moo.telemetry import BaseCallback, GenerationRecord
+from modutask.optimizer.my_moo.utils import get_non_dominated_individuals
+
+class BoundPruningEvaluator(CachedEvaluator, BaseCallback):
+    """
+    目的関数の下界による枝刈り
+    bound(genome) は各目的関数の下界（楽観的な値）を返す軽い関数で、下界がすでに現在の非支配解に支配される遺伝子は
+    evaluator による評価を省略して、下界に違反量 inf を付けた目的関数値（dominated_objectives）を返す
+    省略した個体は実行不可能解として評価したすべての個体より後ろに並び、非支配解やアーカイブには入らない
+    省略した値はキャッシュしない（同じ遺伝子は次に現れたときに改めて判定する）
+    非支配解集合は on_generation で更新する（NSGAII / IBEAHV / MOEAD は evaluator に渡せば callbacks に自動で加える）
+    """
+    def __init__(self, evaluator: BaseEvaluator, encoding: Any, bound: Callable[[Any], list[float]]):
+        super().__init__(evaluator, encoding)
+        self.bound = bound
+        self.front = np.empty((0, 0))  # 現在の非支配解の目的関数値
+        self.pruned = 0  # 評価を省略した数
+
+    def on_generation(self, algorithm: Any, record: GenerationRecord) -> None:
+        front = get_non_dominated_individuals(list(algorithm.population))
+        self.front = np.array([ind.objectives for ind in front], dtype=float)
+
+    def _is_dominated(self, objectives: np.ndarray) -> bool:
+        if len(self.front) == 0:
+            return False
+        return bool(np.any(np.all(self.front <= objectives, axis=1) & np.any(self.front < objectives, axis=1)))
+
+    def evaluate(self, genomes: list[Any]) -> list[list[float]]:
+        keys = [self.encoding.key(genome) for genome in genomes]
+        bounds: dict[Any, list[float]] = {}
+        candidates: dict[Any, Any] = {}
+        for key, genome in zip(keys, genomes):
+            if key in self.cache or key in candidates or key in bounds:
+                self.hits += 1
+                continue
+            self.misses += 1
+            lower = [float(value) for value in self.bound(genome)]
+            if self._is_dominated(np.asarray(lower, dtype=float)):
+                bounds[key] = dominated_objectives(lower)
+                self.pruned += 1
+            else:
+                candidates[key] = genome
+        if candidates:
+            for key, objectives in zip(candidates, self.evaluator.evaluate(list(candidates.values()))):
+                self._store(key, objectives)
+        return [self.cache[key] if key in self.cache else bounds[key] for key in keys]
+
+    def submit(self, genome: Any) -> Future:
+        return BaseEvaluator.submit(self, genome)
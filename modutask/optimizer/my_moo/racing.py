@@ -0,0 +1,96 @@
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Union
+import numpy as np
+from modutask.optimizer.my_moo.constraint import dominated_objectives
+from modutask.optimizer.my_moo.evaluator import BaseEvaluator, CachedEvaluator
+from modutask.optimizer.my_moo.telemetry import BaseCallback, GenerationRecord
+from modutask.optimizer.my_moo.utils import get_non_dominated_individuals
+from modutask.utils.logger import raise_with_log
+
+LOW = 'low'
+HIGH = 'high'
+
+class RacingEvaluator(CachedEvaluator, BaseCallback):
+    """
+    低忠実度評価によるレーシング
+    まず low_evaluator（シナリオの一部・短いホライズンなど）で評価し、楽観的に見積もっても現在の非支配解集合に
+    支配される遺伝子は high_evaluator による完全な評価を省略し、低忠実度の値に違反量 inf を付けた目的関数値
+    （dominated_objectives）を返す（実行不可能解として評価したすべての個体より後ろに並び、非支配解やアーカイブには入らない）
+    見積もりの余裕は margin に、低忠実度と完全な評価の差（low - high）の confidence 分位点を加えたもの
+    両方で評価した遺伝子が min_pairs 個に満たないうちはすべて完全に評価する
+    差は直近 max_pairs 個だけを保持する（分位点の計算量を抑え、探索が進んで変わった差の分布に追従する）
+    キャッシュのキーは (忠実度, encoding.key) なので、低忠実度の値が完全な評価として再利用されることはない
+    非支配解集合は on_generation で更新する（NSGAII / IBEAHV / MOEAD は evaluator に渡せば callbacks に自動で加える）
+    submit も evaluate を通して同期的に評価するが、コールバックを呼ばない SteadyStateNSGAII では非支配解集合が
+    更新されないためレーシングしない
+    """
+    def __init__(self, low_evaluator: BaseEvaluator, high_evaluator: BaseEvaluator, encoding: Any,
+                 margin: Union[float, list[float]] = 0.0, confidence: float = 0.95, min_pairs: int = 20,
+                 max_pairs: int = 1000):
+        if max_pairs < min_pairs:
+            raise_with_log(ValueError, f"max_pairs must be at least min_pairs: {max_pairs} < {min_pairs}.")
+        super().__init__(high_evaluator, encoding)
+        self.low_evaluator = low_evaluator
+        self.margin = margin
+        self.confidence = confidence
+        self.min_pairs = min_pairs
+        self.front = np.empty((0, 0))  # 現在の非支配解の目的関数値
+        self.differences: deque[list[float]] = deque(maxlen=max_pairs)  # 両方で評価した直近の遺伝子の low - high
+        self.raced = 0  # 完全な評価を省略した数
+
+    def on_generation(self, algorithm: Any, record: GenerationRecord) -> None:
+        front = get_non_dominated_individuals(list(algorithm.population))
+        self.front = np.array([ind.objectives for ind in front], dtype=float)
+
+    def current_margin(self) -> Union[np.ndarray, None]:
+        """楽観的な見積もりに使う余裕（レーシングしない場合は None）"""
+        if len(self.differences) < self.min_pairs or len(self.front) == 0:
+            return None
+        spread = np.quantile(np.array(self.differences), self.confidence, axis=0)
+        return np.asarray(self.margin, dtype=float) + np.maximum(spread, 0.0)
+
+    def _is_dominated(self, objectives: np.ndarray) -> bool:
+        return bool(np.any(np.all(self.front <= objectives, axis=1) & np.any(self.front < objectives, axis=1)))
+
+    def _evaluate_missing(self, evaluator: BaseEvaluator, fidelity: str, genomes: dict[Any, Any]) -> None:
+        """キャッシュにない遺伝子だけを評価して保存"""
+        missing = {key: genome for key, genome in genomes.items() if (fidelity, key) not in self.cache}
+        if missing:
+            for key, objectives in zip(missing, evaluator.evaluate(list(missing.values()))):
+                self._store((fidelity, key), objectives)
+
+    def evaluate(self, genomes: list[Any]) -> list[list[float]]:
+        keys = [self.encoding.key(genome) for genome in genomes]
+        unique: dict[Any, Any] = {}
+        for key, genome in zip(keys, genomes):
+            if (HIGH, key) in self.cache or key in unique:
+                self.hits += 1
+            else:
+                unique[key] = genome
+                self.misses += 1
+
+        # 1. 低忠実度で評価（レーシングしない間も余裕の推定に使う）
+        self._evaluate_missing(self.low_evaluator, LOW, unique)
+        candidates = unique
+        margin = self.current_margin()
+        if margin is not None:
+            candidates = {key: genome for key, genome in unique.items()
+                          if not self._is_dominated(np.asarray(self.cache[(LOW, key)], dtype=float) - margin)}
+            self.raced += len(unique) - len(candidates)
+
+        # 2. 残った遺伝子を完全に評価
+        self._evaluate_missing(self.evaluator, HIGH, candidates)
+        for key in candidates:
+            self.differences.append(list(np.asarray(self.cache[(LOW, key)], dtype=float)
+                                         - np.asarray(self.cache[(HIGH, key)], dtype=float)))
+
+        return [self.cache[(HIGH, key)] if (HIGH, key) in self.cache else dominated_objectives(self.cache[(LOW, key)])
+                for key in keys]
+
+    def submit(self, genome: Any) -> Future:
+        return BaseEvaluator.submit(self, genome)
+
+    def close(self) -> None:
+        self.low_evaluator.close()
+        super().close()
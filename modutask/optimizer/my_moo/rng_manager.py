@@ -1,10 +1,66 @@
+from contextlib import contextmanager
+from typing import Iterator, Optional
 import numpy as np
 
+# 乱数ストリームの用途（spawn_keyの先頭要素）
+INITIALIZATION = 0  # 初期個体群の生成
+VARIATION = 1  # 子個体の生成（選択・交叉・突然変異）
+WORKER = 2  # 評価ワーカー
+MIGRATION = 3  # 島モデルの移住個体選択
+SURROGATE = 4  # 代理モデルによる候補選択（探索枠）・モデルの学習
+SEEDING = 5  # ヒューリスティックによる初期個体の生成
+LOCAL_SEARCH = 6  # 非支配個体の局所探索（近傍の生成）
+NICHING = 7  # NSGA-III の参照方向によるニッチ選択
+
+class RNGService:
+    """
+    実行シードから用途ごとに独立な乱数ストリームを導出する
+    ストリームは SeedSequence.spawn と同じ spawn_key の木構造で決まるため、
+    呼び出し順や並列数に依存せず (世代, 子個体スロット) などのキーだけで再現できる
+    """
+    def __init__(self, seed: Optional[int] = None, spawn_key: tuple[int, ...] = ()):
+        self.seed_sequence = np.random.SeedSequence(seed, spawn_key=spawn_key)
+
+    @property
+    def entropy(self) -> int:
+        return int(self.seed_sequence.entropy)  # type: ignore[arg-type]
+
+    def spawn(self, *key: int) -> "RNGService":
+        """キーを付け足した子サービスを生成（島モデルの各島など）"""
+        return RNGService(self.entropy, spawn_key=self.seed_sequence.spawn_key + key)
+
+    def stream(self, *key: int) -> np.random.Generator:
+        """キーに対応する乱数ストリームを生成"""
+        return np.random.default_rng(
+            np.random.SeedSequence(self.entropy, spawn_key=self.seed_sequence.spawn_key + key)
+        )
+
+_service = RNGService()
 _rng = np.random.default_rng()  # デフォルトGenerator
 
 def get_rng() -> np.random.Generator:
     return _rng
 
 def seed_rng(seed: int):
-    global _rng
+    global _rng, _service
     _rng = np.random.default_rng(seed)
+    _service = RNGService(seed)
+
+def get_rng_service() -> RNGService:
+    return _service
+
+@contextmanager
+def use_rng(rng: np.random.Generator) -> Iterator[np.random.Generator]:
+    """ブロック内の get_rng() が rng を返すように一時的に差し替える"""
+    global _rng
+    previous = _rng
+    _rng = rng
+    try:
+        yield rng
+    finally:
+        _rng = previous
+
+def init_worker_rng(service: RNGService, worker_id: int) -> None:
+    """ワーカープロセスの get_rng() をワーカー固有のストリームにする"""
+    global _rng
+    _rng = service.stream(WORKER, worker_id)
@@ -0,0 +1,107 @@
+import math
+from typing import Any, Callable, Optional
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from modutask.optimizer.my_moo.core.encoding import BaseVariable
+from modutask.optimizer.my_moo.core.individual import Individual
+from modutask.optimizer.my_moo.rng_manager import SURROGATE, RNGService
+from modutask.utils.logger import raise_with_log
+
+def non_dominated_ranks(Y: np.ndarray) -> list[int]:
+    """目的関数値の行列から非支配ランク（0始まり）を求める"""
+    n = len(Y)
+    # dominates[i, j]: i が j を支配する
+    dominates = np.all(Y[:, None, :] <= Y[None, :, :], axis=2) & np.any(Y[:, None, :] < Y[None, :, :], axis=2)
+    ranks = np.full(n, -1)
+    remaining = np.ones(n, dtype=bool)
+    rank = 0
+    while remaining.any():
+        indices = np.flatnonzero(remaining)
+        counts = dominates[np.ix_(indices, indices)].sum(axis=0)
+        front = indices[counts == 0]
+        ranks[front] = rank
+        remaining[front] = False
+        rank += 1
+    return ranks.tolist()
+
+class SurrogateScreen:
+    """
+    代理モデルによる子個体の事前選別
+    これまでに評価した遺伝子の特徴量（encoding.features）と目的関数値で回帰モデルを学習し、
+    必要数の 1/true_ratio 倍の候補から予測が良いものを選んで真の評価（シミュレーション）に回す
+    ただし真の評価のうち exploration の割合は、予測に関係なく残りの候補からランダムに選ぶ
+    評価済みの遺伝子が min_samples 個に満たないうちは選別せずに先頭から必要数を使う
+    実行不可能な個体（レーシング・枝刈りで評価を省略したものを含む）や値が有限でない個体は学習に使わない
+    ※ 学習データはチェックポイントに含めないため、再開すると選別結果は変わりうる
+    """
+    def __init__(
+        self,
+        encoding: BaseVariable,
+        true_ratio: float = 0.5,
+        exploration: float = 0.2,
+        min_samples: int = 50,
+        max_samples: int = 5000,
+        model_factory: Optional[Callable[[], Any]] = None,
+    ):
+        if not 0.0 < true_ratio <= 1.0:
+            raise_with_log(ValueError, f"true_ratio must be in (0, 1]: {true_ratio}.")
+        if not 0.0 <= exploration <= 1.0:
+            raise_with_log(ValueError, f"exploration must be in [0, 1]: {exploration}.")
+        self.encoding = encoding
+        self.true_ratio = true_ratio
+        self.exploration = exploration
+        self.min_samples = min_samples
+        self.max_samples = max_samples  # 学習に使う直近の評価数
+        self.model_factory = model_factory if model_factory is not None else (
+            lambda: RandomForestRegressor(n_estimators=50, random_state=0))
+        self.X: list[list[float]] = []
+        self.Y: list[list[float]] = []
+        self.model: Any = None
+        self.n_fitted = 0  # 最後に学習した時点のサンプル数
+        self.screened = 0  # 真の評価を省略した候補の累計
+
+    def n_candidates(self, n_offspring: int) -> int:
+        return int(math.ceil(n_offspring / self.true_ratio))
+
+    def observe(self, individuals: list[Individual]) -> None:
+        """評価済みの個体を学習データに加える（実行不可能な個体と値が有限でない個体は除く）"""
+        for ind in individuals:
+            # 評価を省略した個体の目的関数値は低忠実度の値・下界・仮の値で、真の評価ではない
+            if not ind.feasible or not all(math.isfinite(value) for value in ind.objectives):
+                continue
+            self.X.append(self.encoding.features(ind.genome))
+            self.Y.append(list(ind.objectives))
+        if len(self.X) > self.max_samples:
+            del self.X[:len(self.X) - self.max_samples]
+            del self.Y[:len(self.Y) - self.max_samples]
+
+    def fit(self) -> None:
+        """前回の学習以降にデータが増えていれば学習し直す"""
+        if len(self.X) < self.min_samples or len(self.X) == self.n_fitted:
+            return
+        self.model = self.model_factory()
+        self.model.fit(np.array(self.X), np.array(self.Y))
+        self.n_fitted = len(self.X)
+
+    def predict(self, individuals: list[Individual]) -> np.ndarray:
+        X = np.array([self.encoding.features(ind.genome) for ind in individuals])
+        return np.asarray(self.model.predict(X)).reshape(len(individuals), -1)
+
+    def select(self, candidates: list[Individual], n_offspring: int, rng_service: RNGService,
+               generation: int) -> list[Individual]:
+        """候補から n_offspring 個を選ぶ（候補の順序を保つ）"""
+        if len(candidates) <= n_offspring:
+            return candidates
+        self.fit()
+        if self.model is None:
+            return candidates[:n_offspring]
+        ranks = non_dominated_ranks(self.predict(candidates))
+        order = sorted(range(len(candidates)), key=lambda i: (ranks[i], i))
+        n_explore = int(round(self.exploration * n_offspring))
+        chosen = order[:n_offspring - n_explore]
+        rest = order[n_offspring - n_explore:]
+        if n_explore > 0:
+            picked = rng_service.stream(SURROGATE, generation).choice(len(rest), size=n_explore, replace=False)
+            chosen += [rest[i] for i in picked]
+        self.screened += len(candidates) - n_offspring
+        return [candidates[i] for i in sorted(chosen)]
@@ -0,0 +1,86 @@
+import csv
+import json
+import os
+from dataclasses import asdict, fields
+from typing import Any, Optional
+import numpy as np
+from pymoo.indicators.hv import HV
+from modutask.optimizer.my_moo.core.individual import Individual
+from modutask.optimizer.my_moo.utils import get_non_dominated_individuals
+from modutask.utils.callback import BaseCallback, GenerationRecord
+from modutask.utils.logger import raise_with_log
+
+def collect_callbacks(callbacks: Optional[list[BaseCallback]], evaluator: Any) -> list[BaseCallback]:
+    """
+    アルゴリズムに登録するコールバックのリスト（callbacks の複製）
+    コールバックを兼ねる評価器（RacingEvaluator・BoundPruningEvaluator）は登録し忘れると非支配解集合が更新されず
+    何も省略しないまま動くため、callbacks になければ加える
+    """
+    collected = list(callbacks) if callbacks is not None else []
+    if isinstance(evaluator, BaseCallback) and not any(callback is evaluator for callback in collected):
+        collected.append(evaluator)
+    return collected
+
+class HypervolumeTracker:
+    """
+    固定の参照点に対するハイパーボリューム
+    非支配解集合が前の世代から変わっていなければ前回の値を再利用する
+    """
+    def __init__(self, ref_point: list[float]):
+        self.ref_point = np.array(ref_point, dtype=float)
+        self.indicator = HV(ref_point=self.ref_point)
+        self._front: Optional[frozenset] = None
+        self._value = 0.0
+
+    def __call__(self, front: list[Individual]) -> float:
+        key = frozenset(tuple(ind.objectives) for ind in front)
+        if key != self._front:
+            F = np.array(sorted(key), dtype=float)
+            self._value = float(self.indicator.do(F)) if len(F) > 0 else 0.0
+            self._front = key
+        return self._value
+
+class TelemetryWriter(BaseCallback):
+    """世代ごとの記録を CSV（.csv）または JSON Lines（.jsonl）に逐次書き出す"""
+    def __init__(self, file_path: str):
+        extension = os.path.splitext(file_path)[1]
+        if extension not in ('.csv', '.jsonl'):
+            raise_with_log(ValueError, f"Unsupported telemetry format: {file_path}.")
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(file_path, 'w', newline='')
+        self.writer = None
+        if extension == '.csv':
+            self.writer = csv.DictWriter(self.file, fieldnames=[field.name for field in fields(GenerationRecord)])
+            self.writer.writeheader()
+
+    def on_generation(self, algorithm: Any, record: GenerationRecord) -> None:
+        if self.writer is not None:
+            self.writer.writerow(asdict(record))
+        else:
+            self.file.write(json.dumps(asdict(record)) + '\n')
+        self.file.flush()  # 中断されてもそこまでの記録は残す
+
+    def close(self) -> None:
+        self.file.close()
+
+def report_generation(algorithm: Any, evaluation_time: float, sort_time: float, variation_time: float,
+                      evaluations: int, cache_hits: int) -> None:
+    """コールバックが登録されていれば世代の記録を作って通知する（非支配解の抽出・HVは登録時だけ計算）"""
+    if not algorithm.callbacks:
+        return
+    front = get_non_dominated_individuals(list(algorithm.population))
+    record = GenerationRecord(
+        generation=algorithm.generation,
+        evaluation_time=evaluation_time,
+        sort_time=sort_time,
+        variation_time=variation_time,
+        evaluations=evaluations,
+        cache_hits=cache_hits,
+        front_size=len(front),
+        hypervolume=(algorithm.hypervolume([ind for ind in front if ind.feasible])  # 実行不可能解は含めない
+                     if algorithm.hypervolume is not None else None),
+        )
+    for callback in algorithm.callbacks:
+        callback.on_generation(algorithm, record)
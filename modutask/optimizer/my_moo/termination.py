@@ -0,0 +1,110 @@
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Optional
+from modutask.optimizer.my_moo.telemetry import HypervolumeTracker
+from modutask.optimizer.my_moo.utils import get_non_dominated_individuals
+from modutask.utils.logger import raise_with_log
+
+class BaseTermination(ABC):
+    """ 終了条件の抽象基底クラス """
+
+    def start(self, algorithm: Any) -> None:
+        """evolve の開始時に呼ばれる"""
+        pass
+
+    @abstractmethod
+    def check(self, algorithm: Any) -> Optional[str]:
+        """各世代の終了後に呼ばれ、終了する場合はその理由を返す"""
+        pass
+
+class MaxEvaluations(BaseTermination):
+    """
+    評価回数（algorithm.evaluations、キャッシュヒット・枝刈り・レーシングで省略した遺伝子は含めない）の上限
+    これまでの世代で最も多かった評価回数（局所探索の分を含む）を次の世代でも評価すると上限を超える場合は終了する
+    """
+    def __init__(self, max_evaluations: int):
+        self.max_evaluations = max_evaluations
+        self.last_evaluations = 0
+        self.generation_evaluations = 0  # 1世代あたりの評価回数の最大値
+
+    def start(self, algorithm: Any) -> None:
+        self.last_evaluations = algorithm.evaluations
+        self.generation_evaluations = 0
+
+    def check(self, algorithm: Any) -> Optional[str]:
+        self.generation_evaluations = max(self.generation_evaluations, algorithm.evaluations - self.last_evaluations)
+        self.last_evaluations = algorithm.evaluations
+        if algorithm.evaluations + self.generation_evaluations > self.max_evaluations:
+            return f"max_evaluations: {algorithm.evaluations} evaluations (limit {self.max_evaluations})"
+        return None
+
+class TimeLimit(BaseTermination):
+    """実行時間の上限（直前の世代と同じだけかかると上限を超える場合は終了）"""
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.start_time = 0.0
+        self.last_time = 0.0
+
+    def start(self, algorithm: Any) -> None:
+        self.start_time = self.last_time = time.monotonic()
+
+    def check(self, algorithm: Any) -> Optional[str]:
+        now = time.monotonic()
+        generation_time = now - self.last_time
+        self.last_time = now
+        if now - self.start_time + generation_time > self.seconds:
+            return f"time_limit: {now - self.start_time:.1f} s elapsed (limit {self.seconds} s)"
+        return None
+
+class HypervolumeStagnation(BaseTermination):
+    """
+    直近 window 世代のHV改善量が epsilon 未満なら終了
+    relative=True の場合は window 世代前のHVに対する相対改善量で判定する
+    """
+    def __init__(self, ref_point: list[float], window: int = 20, epsilon: float = 1e-4, relative: bool = True):
+        self.hypervolume = HypervolumeTracker(ref_point)
+        self.window = window
+        self.epsilon = epsilon
+        self.relative = relative
+        self.history: deque[float] = deque(maxlen=window + 1)
+
+    def start(self, algorithm: Any) -> None:
+        self.history.clear()
+        self.history.append(self.hypervolume(get_non_dominated_individuals(list(algorithm.population))))
+
+    def check(self, algorithm: Any) -> Optional[str]:
+        self.history.append(self.hypervolume(get_non_dominated_individuals(list(algorithm.population))))
+        if len(self.history) <= self.window:
+            return None
+        improvement = self.history[-1] - self.history[0]
+        if self.relative:
+            improvement /= max(abs(self.history[0]), 1e-12)
+        if improvement < self.epsilon:
+            return f"hv_stagnation: improvement {improvement:.3g} over {self.window} generations (epsilon {self.epsilon})"
+        return None
+
+def check_termination(terminations: list[BaseTermination], algorithm: Any) -> Optional[str]:
+    """いずれかの終了条件を満たせばその理由を返す（すべての条件の状態を更新するため全件評価する）"""
+    reasons = [termination.check(algorithm) for termination in terminations]
+    return next((reason for reason in reasons if reason is not None), None)
+
+def make_terminations(config: Optional[dict[str, Any]], ref_point: Optional[list[float]] = None) -> list[BaseTermination]:
+    """
+    設定ファイルの termination セクションから終了条件を組み立てる
+    例: {hv_window: 20, hv_epsilon: 1.0e-4, max_evaluations: 20000, time_limit: 3600}
+    """
+    if not config:
+        return []
+    terminations: list[BaseTermination] = []
+    if config.get('hv_window') is not None:
+        hv_ref_point = config.get('hv_ref_point', ref_point)
+        if hv_ref_point is None:
+            raise_with_log(ValueError, "hv_window requires hv_ref_point.")
+        terminations.append(HypervolumeStagnation(hv_ref_point, window=config['hv_window'],
+                                                  epsilon=config.get('hv_epsilon', 1e-4)))
+    if config.get('max_evaluations') is not None:
+        terminations.append(MaxEvaluations(config['max_evaluations']))
+    if config.get('time_limit') is not None:
+        terminations.append(TimeLimit(config['time_limit']))
+    return terminations
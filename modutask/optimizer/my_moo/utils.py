@@ -6,18 +6,48 @@ def dominates(obj1: list[float], obj2: list[float]) -> bool:
     """obj1 が obj2 を支配するなら True（すべての目的で劣らず、少なくとも1つで勝る）"""
     return all(a <= b for a, b in zip(obj1, obj2)) and any(a < b for a, b in zip(obj1, obj2))
 
+def constrained_dominates(ind1: Individual, ind2: Individual) -> bool:
+    """
+    Deb の制約付き支配: 実行可能解は実行不可能解を支配し、実行不可能解どうしは違反量の小さい方が支配する
+    どちらも実行可能なら目的関数値で判定する
+    """
+    if ind1.constraint_violation > 0 or ind2.constraint_violation > 0:
+        return ind1.constraint_violation < ind2.constraint_violation
+    return dominates(ind1.objectives, ind2.objectives)
+
+def non_dominated_mask(F: np.ndarray) -> np.ndarray:
+    """
+    目的関数値の行列 F の各行が非支配なら True（同じ値の行はどちらも非支配）
+    辞書式順に並べると支配する解は支配される解より前に来るため、前から順に非支配と分かった解とだけ NumPy で比べる
+    非支配と分かった解は (n, m) のバッファの先頭 n_kept 行に書き込む（行ごとに配列を作り直さない）
+    """
+    mask = np.zeros(len(F), dtype=bool)
+    if len(F) == 0:
+        return mask
+    kept = np.empty(F.shape, dtype=float)
+    n_kept = 0
+    for i in np.lexsort(F.T[::-1]):
+        front = kept[:n_kept]
+        if np.any(np.all(front <= F[i], axis=1) & np.any(front < F[i], axis=1)):
+            continue
+        mask[i] = True
+        kept[n_kept] = F[i]
+        n_kept += 1
+    return mask
+
 def get_non_dominated_individuals(individuals: list[Individual]) -> list[Individual]:
-    """与えられた個体群の中から、非支配な個体だけを抽出する"""
-    non_dominated = []
-    for i, ind_i in enumerate(individuals):
-        dominated = False
-        for j, ind_j in enumerate(individuals):
-            if i != j and dominates(ind_j.objectives, ind_i.objectives):
-                dominated = True
-                break
-        if not dominated:
-            non_dominated.append(ind_i)
-    return non_dominated
+    """
+    与えられた個体群の中から、非支配な個体だけを抽出する（制約付き支配）
+    実行可能な個体があればその中の非支配な個体、なければ違反量が最小の個体を元の順序で返す
+    """
+    if not individuals:
+        return []
+    feasible = [ind for ind in individuals if ind.feasible]
+    if not feasible:
+        least = min(ind.constraint_violation for ind in individuals)
+        return [ind for ind in individuals if ind.constraint_violation == least]
+    mask = non_dominated_mask(np.array([ind.objectives for ind in feasible], dtype=float))
+    return [ind for ind, keep in zip(feasible, mask) if keep]
 
 def select_kmeans_representatives(pareto_individuals: list[Individual], k: int) -> list[Individual]:
     if len(pareto_individuals) <= k:
@@ -0,0 +1,56 @@
+import os
+import pickle
+from typing import Any, Optional
+import yaml
+from modutask.optimizer.my_moo.checkpoint import has_checkpoint, load_checkpoint
+from modutask.utils.logger import raise_with_log
+
+def save_genomes(genomes: list[Any], file_path: str) -> None:
+    """遺伝子のリストを pickle で保存する（次回の実行の初期個体群に使う）"""
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(file_path, 'wb') as f:
+        pickle.dump(list(genomes), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+def load_genomes(file_path: str) -> list[Any]:
+    """save_genomes で保存した遺伝子のリストを読み込む"""
+    if not os.path.exists(file_path):
+        raise_with_log(FileNotFoundError, f"File not found: {file_path}.")
+    with open(file_path, 'rb') as f:
+        return list(pickle.load(f))
+
+def load_priority_genome(file_path: str, agent_names: list[str]) -> list[list[Any]]:
+    """
+    save_task_priorities 形式の YAML（ロボット名 -> タスク名のリスト）を agent_names の順の遺伝子にする
+    YAML にないロボットは空のリストになる（encoding.repair で補われる）
+    """
+    if not os.path.exists(file_path):
+        raise_with_log(FileNotFoundError, f"File not found: {file_path}.")
+    with open(file_path, 'r') as f:
+        priorities = yaml.safe_load(f) or {}
+    if not isinstance(priorities, dict):
+        raise_with_log(ValueError, f"Task priority file must map robot names to task lists: {file_path}.")
+    return [list(priorities.get(name, [])) for name in agent_names]
+
+def load_initial_genomes(sources: list[str], agent_names: Optional[list[str]] = None) -> list[Any]:
+    """
+    初期個体群に使う遺伝子を読み込む（sources の順に連結）
+    - チェックポイントのディレクトリ: 保存時点の個体群
+    - .yaml / .yml: save_task_priorities 形式の優先順位（agent_names が必要）
+    - それ以外: save_genomes で保存した遺伝子のリスト
+    現在の問題と要素が合わない遺伝子は Population.initialize で encoding.repair により修復される
+    """
+    genomes: list[Any] = []
+    for source in sources:
+        if os.path.isdir(source):
+            if not has_checkpoint(source):
+                raise_with_log(FileNotFoundError, f"Checkpoint not found: {source}.")
+            genomes.extend(load_checkpoint(source)['genomes'])
+        elif os.path.splitext(source)[1] in ('.yaml', '.yml'):
+            if agent_names is None:
+                raise_with_log(ValueError, f"agent_names is required to load task priorities: {source}.")
+            genomes.append(load_priority_genome(source, agent_names))
+        else:
+            genomes.extend(load_genomes(source))
+    return genomes
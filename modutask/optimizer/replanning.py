@@ -0,0 +1,124 @@
+import logging
+from typing import Any, Callable, Optional
+from modutask.core import *
+from modutask.optimizer.my_moo import NSGAII, BaseEvaluator, MultiPermutationVariable, RNGService, get_rng_service
+from modutask.optimizer.my_moo.core.individual import Individual
+from modutask.simulator.evaluation import average_scenario_results, scenario_objectives
+from modutask.simulator.simulation import Simulator
+from modutask.utils.logger import raise_with_log
+
+logger = logging.getLogger(__name__)
+
+class ForkObjective:
+    """
+    保存した状態から優先順位を差し替えて horizon ステップ進めたときの目的関数
+    [残タスク総量, 残タスク分散, 最長モジュール使用時間] を planning_scenarios ごとに求めて平均する
+    実際の故障シナリオの乱数を先読みしないよう、将来の故障は planning_scenarios（新しく初期化した複製）で見積もる
+    planning_scenarios が空なら故障なしで1回だけシミュレーションする
+    状態はバイト列で持つため、PoolEvaluator などのワーカーにもそのまま渡せる
+    """
+    def __init__(self, snapshot: bytes, task_names: list[str], horizon: int,
+                 planning_scenarios: Optional[list[list[BaseRiskScenario]]] = None):
+        self.snapshot = snapshot
+        self.task_names = task_names
+        self.horizon = horizon
+        self.planning_scenarios = planning_scenarios if planning_scenarios else [[]]
+        base = Simulator.restore(snapshot)
+        if base.modules is None:
+            raise_with_log(ValueError, "Simulator must be created with modules to evaluate forked states.")
+        self.agent_names = list(base.agents)
+
+    def __call__(self, order: list[list[str]]) -> list[float]:
+        task_priorities = {name: list(order[i]) for i, name in enumerate(self.agent_names)}
+        results = []
+        for scenarios in self.planning_scenarios:
+            simulator = Simulator.restore(self.snapshot)
+            simulator.set_task_priorities(task_priorities)
+            simulator.reset_scenarios(scenarios)
+            for _ in range(self.horizon):
+                simulator.run_simulation()
+            results.append(scenario_objectives(task_names=self.task_names, combined_tasks=simulator.tasks,
+                                               modules=simulator.modules))
+        return average_scenario_results(results)
+
+def select_plan(individuals: list[Individual]) -> Individual:
+    """非支配解から適用する優先順位を選ぶ（目的関数値の辞書式順序で最小：残タスク総量を最優先）"""
+    return min(individuals, key=lambda ind: tuple(ind.objectives))
+
+class RollingHorizonPlanner:
+    """
+    シミュレーションを進めながら、途中の状態から短い NSGA-II で残りの優先順位を計画し直す
+    計画し直すのは、新たに故障したモジュールがあったとき（replan_on_failure）と interval ステップごと
+    NSGA-II の初期個体には現在の優先順位を含め、最適化の結果は select で選んで simulator に適用する
+    """
+    def __init__(
+        self,
+        simulator: Simulator,
+        task_names: list[str],
+        horizon: int,
+        population_size: int = 20,
+        generations: int = 10,
+        interval: Optional[int] = None,
+        replan_on_failure: bool = True,
+        planning_scenarios: Optional[list[list[BaseRiskScenario]]] = None,
+        rng_service: Optional[RNGService] = None,
+        evaluator_factory: Optional[Callable[[ForkObjective], BaseEvaluator]] = None,
+        select: Callable[[list[Individual]], Individual] = select_plan,
+    ):
+        if simulator.modules is None:
+            raise_with_log(ValueError, "Simulator must be created with modules for re-planning.")
+        self.simulator = simulator
+        self.task_names = task_names
+        self.horizon = horizon
+        self.population_size = population_size
+        self.generations = generations
+        self.interval = interval
+        self.replan_on_failure = replan_on_failure
+        self.planning_scenarios = planning_scenarios
+        self.rng_service = rng_service if rng_service is not None else get_rng_service()
+        self.evaluator_factory = evaluator_factory  # 指定があれば ForkObjective から評価器を作る（並列評価など）
+        self.select = select
+        self.encoding = MultiPermutationVariable(items=sorted(simulator.tasks), n_multi=len(simulator.agents))
+        self.failed_modules = self._failed_modules()
+        self.history: list[dict[str, Any]] = []  # 計画し直したステップ・理由・選んだ解の目的関数値
+
+    def _failed_modules(self) -> set[str]:
+        return {name for name, module in self.simulator.modules.items() if module.state == ModuleState.ERROR}
+
+    def replan(self, reason: str = 'manual', horizon: Optional[int] = None) -> dict[str, list[str]]:
+        """現在の状態から残りの優先順位を最適化して適用する（horizon を省略すると self.horizon ステップ先まで見積もる）"""
+        horizon = horizon if horizon is not None else self.horizon
+        objective = ForkObjective(self.simulator.snapshot(), self.task_names, horizon, self.planning_scenarios)
+        current = self.simulator.task_priorities()
+        algorithm = NSGAII(
+            objective,
+            self.encoding,
+            population_size=self.population_size,
+            generations=self.generations,
+            evaluator=self.evaluator_factory(objective) if self.evaluator_factory is not None else None,
+            rng_service=self.rng_service.spawn(len(self.history)),  # 計画し直すごとに独立な乱数
+            initial_genomes=[[current[name] for name in objective.agent_names]],
+            )
+        algorithm.evolve()
+        algorithm.evaluator.close()
+        best = self.select(algorithm.get_result())
+        task_priorities = {name: list(best.genome[i]) for i, name in enumerate(objective.agent_names)}
+        self.simulator.set_task_priorities(task_priorities)
+        self.history.append({'step': self.simulator.current_step, 'reason': reason, 'objectives': list(best.objectives)})
+        logger.info(f"Re-planned at step {self.simulator.current_step} ({reason}): {best.objectives}.")
+        return task_priorities
+
+    def run(self, max_step: int) -> None:
+        """max_step まで進め、条件を満たしたステップの後で計画し直す"""
+        while self.simulator.current_step < max_step:
+            self.simulator.run_simulation()
+            if self.simulator.current_step >= max_step:
+                break
+            failed = self._failed_modules()
+            new_failures = failed - self.failed_modules
+            self.failed_modules = failed
+            horizon = min(self.horizon, max_step - self.simulator.current_step)  # 残りのステップを超えて見積もらない
+            if self.replan_on_failure and new_failures:
+                self.replan(f"failure: {sorted(new_failures)}", horizon)
+            elif self.interval is not None and self.simulator.current_step % self.interval == 0:
+                self.replan('interval', horizon)
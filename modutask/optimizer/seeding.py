@@ -0,0 +1,192 @@
+import math
+from typing import Optional
+import numpy as np
+from modutask.core import *
+from modutask.optimizer.my_moo.rng_manager import SEEDING, RNGService, get_rng, get_rng_service, use_rng
+from modutask.utils.logger import raise_with_log
+
+def remaining_workload(task: BaseTask) -> float:
+    return max(float(task.total_workload - task.completed_workload), 0.0)
+
+def end_coordinate(task: BaseTask) -> tuple[float, float]:
+    """タスクを終えたときにロボットがいる位置（運搬タスクは目的地）"""
+    if isinstance(task, Transport):
+        return task.destination_coordinate
+    return task.coordinate
+
+def critical_path_lengths(tasks: dict[str, BaseTask], items: list[str]) -> dict[str, float]:
+    """各タスクから始まる依存関係の最長経路（残り仕事量の和）"""
+    dependencies = dependency_graph(tasks, items)
+    successors: dict[str, list[str]] = {name: [] for name in items}
+    for name, deps in dependencies.items():
+        for dep in deps:
+            successors[dep].append(name)
+    lengths: dict[str, float] = {}
+    for name in reversed(topological_order(tasks, items)):
+        lengths[name] = remaining_workload(tasks[name]) + max((lengths[s] for s in successors[name]), default=0.0)
+    return lengths
+
+def can_contribute(robot: Robot, task: BaseTask) -> bool:
+    """ロボットがタスクの必要能力のいずれかを持っているか（必要能力がなければ常に True）"""
+    required = [attr for attr, value in task.required_performance.items() if value > 0]
+    return not required or any(robot.type.performance.get(attr, 0.0) > 0 for attr in required)
+
+def estimated_duration(robot: Robot, task: BaseTask) -> float:
+    """ロボット1台でタスクを終えるまでのおおよそのステップ数（運搬は移動能力、それ以外は1ステップに1の仕事量）"""
+    if isinstance(task, Transport):
+        mobility = robot.type.performance.get(PerformanceAttributes.MOBILITY, 0.0)
+        return remaining_workload(task) / mobility if mobility > 0 else math.inf
+    return remaining_workload(task)
+
+def travel_time(robot: Robot, origin: tuple[float, float], target: tuple[float, float]) -> float:
+    mobility = robot.type.performance.get(PerformanceAttributes.MOBILITY, 0.0)
+    distance = float(np.linalg.norm(np.array(target, dtype=float) - np.array(origin, dtype=float)))
+    if distance == 0.0:
+        return 0.0
+    return distance / mobility if mobility > 0 else math.inf
+
+class HeuristicSeeder:
+    """
+    タスクの依存関係・位置から全ロボットの優先順位をまとめて組み立てる初期個体生成（リストスケジューリング）
+    依存先を割り当て終えたタスクの中から次の順で1つずつ選び、
+      1. assembly_first なら組み立て関連（TransportModule / Assembly）を先に
+      2. クリティカルパス長（正規化） + randomness × 一様乱数 が大きいものを先に
+    必要能力を持つロボットのうち、推定終了時刻
+      max(空く時刻 + distance_weight × 直前のタスク終了位置からの移動時間, 依存先の終了時刻) + 所要時間
+    が最も早いロボットに割り当てる（距離の起点は各ロボットの初期位置）
+    各ロボットの優先順位は、自分に割り当てられたタスクのあとに残りのタスクを全体の割り当て順に並べたもの
+    randomness = 0 なら決定的な1つの遺伝子になる
+    """
+    def __init__(self, tasks: dict[str, BaseTask], robots: dict[str, Robot], items: list[str],
+                 distance_weight: float = 1.0, randomness: float = 0.2, assembly_first: bool = True):
+        missing = [name for name in items if name not in tasks]
+        if missing:
+            raise_with_log(ValueError, f"Items are missing in tasks: {missing}.")
+        if not robots:
+            raise_with_log(ValueError, "Robots must not be empty.")
+        self.tasks = tasks
+        self.robots = robots
+        self.items = items
+        self.distance_weight = distance_weight
+        self.randomness = randomness
+        self.assembly_first = assembly_first
+        self.dependencies = dependency_graph(tasks, items)
+        lengths = critical_path_lengths(tasks, items)
+        scale = max(lengths.values(), default=0.0)
+        self.critical_path = {name: length / scale if scale > 0 else 0.0 for name, length in lengths.items()}
+
+    def _tier(self, task: BaseTask) -> int:
+        return 0 if self.assembly_first and isinstance(task, (TransportModule, Assembly)) else 1
+
+    def genome(self, randomness: Optional[float] = None) -> list[list[str]]:
+        """
+        robots の順に並べた MultiPermutationVariable の遺伝子
+        randomness を省略すると self.randomness。乱数は呼び出し側の get_rng を使う
+        """
+        randomness = randomness if randomness is not None else self.randomness
+        rng = get_rng()
+        robots = list(self.robots.values())
+        available = [0.0] * len(robots)
+        position = [robot.coordinate for robot in robots]
+        finish: dict[str, float] = {}
+        pending = {name: len(deps) for name, deps in self.dependencies.items()}
+        dependents: dict[str, list[str]] = {name: [] for name in self.items}
+        for name, deps in self.dependencies.items():
+            for dep in deps:
+                dependents[dep].append(name)
+        ready = [name for name in self.items if pending[name] == 0]
+        assigned: list[list[str]] = [[] for _ in robots]
+        order = []
+        while ready:
+            noise = rng.random(len(ready)) * randomness if randomness > 0 else np.zeros(len(ready))
+            index = min(range(len(ready)),
+                        key=lambda i: (self._tier(self.tasks[ready[i]]), -(self.critical_path[ready[i]] + noise[i])))
+            name = ready.pop(index)
+            task = self.tasks[name]
+            release = max((finish[dep] for dep in self.dependencies[name]), default=0.0)
+            candidates = [i for i, robot in enumerate(robots) if can_contribute(robot, task)] or list(range(len(robots)))
+            def estimate(i: int) -> float:
+                start = available[i] + self.distance_weight * travel_time(robots[i], position[i], task.coordinate)
+                return max(start, release) + estimated_duration(robots[i], task)
+            chosen = min(candidates, key=estimate)
+            finish[name] = estimate(chosen)
+            available[chosen] = finish[name]
+            position[chosen] = end_coordinate(task)
+            assigned[chosen].append(name)
+            order.append(name)
+            for dependent in dependents[name]:
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    ready.append(dependent)
+        genome = []
+        for own in assigned:
+            own_set = set(own)
+            genome.append(own + [name for name in order if name not in own_set])
+        return genome
+
+    def genomes(self, n: int, rng_service: Optional[RNGService] = None) -> list[list[list[str]]]:
+        """n 個の遺伝子（個体ごとに独立な乱数ストリームを使い、先頭は乱数なしの遺伝子）"""
+        rng_service = rng_service if rng_service is not None else get_rng_service()
+        genomes = []
+        for slot in range(n):
+            with use_rng(rng_service.stream(SEEDING, slot)):
+                genomes.append(self.genome(0.0 if slot == 0 else None))
+        return genomes
+
+def heuristic_genomes(tasks: dict[str, BaseTask], robots: dict[str, Robot], items: list[str], population_size: int,
+                      ratio: float = 0.5, rng_service: Optional[RNGService] = None, **kwargs) -> list[list[list[str]]]:
+    """初期個体群のうち ratio の割合（切り上げ）をヒューリスティックで生成する（kwargs は HeuristicSeeder へ）"""
+    if not 0.0 <= ratio <= 1.0:
+        raise_with_log(ValueError, f"ratio must be in [0, 1]: {ratio}.")
+    n = int(math.ceil(population_size * ratio))
+    if n == 0:
+        return []
+    return HeuristicSeeder(tasks, robots, items, **kwargs).genomes(n, rng_service)
+
+def match_robots(previous: dict[str, Robot], robots: dict[str, Robot]) -> dict[str, str]:
+    """
+    robots の各ロボットに対応させる previous のロボット名
+    同じ種類で共通のモジュールが多いロボットを優先し、previous の各ロボットはなるべく一度だけ使う
+    （previous のロボットを使い切ったら重複して対応させる。種類の一致するロボットがなければ任意の種類から選ぶ）
+    """
+    if not previous:
+        raise_with_log(ValueError, "Previous robots must not be empty.")
+    def score(new: Robot, old: Robot) -> tuple[bool, int]:
+        shared = {module.name for module in new.component_required} & {module.name for module in old.component_required}
+        return (new.type.name == old.type.name, len(shared))
+    mapping: dict[str, str] = {}
+    unused = list(previous)
+    for name, robot in robots.items():
+        candidates = unused or list(previous)
+        # 同点なら previous の順で先のロボット
+        best = max(candidates, key=lambda old: score(robot, previous[old]))
+        mapping[name] = best
+        if best in unused:
+            unused.remove(best)
+    return mapping
+
+def transfer_genome(genome: list[list[str]], previous: dict[str, Robot], robots: dict[str, Robot]) -> list[list[str]]:
+    """
+    previous の順に並んだ直前の構成の遺伝子を、match_robots で対応させた robots の順に並べ替える
+    'transport_{ロボット名}_{モジュール名}' の運搬タスクは対応先のロボット名に付け替え、対応先がなければ除く
+    新しい構成にないタスク（同じモジュールが不足していない運搬タスクなど）は残るので、encoding.repair で取り除く
+    """
+    mapping = match_robots(previous, robots)
+    renames: dict[str, Optional[str]] = {old: None for old in previous}  # 対応先のないロボットの運搬タスクは除く
+    for name, old in mapping.items():
+        if renames[old] is None:
+            renames[old] = name
+    # 名前が前方一致するロボットがあっても長い方を優先する
+    prefixes = sorted(renames, key=len, reverse=True)
+    def rename(item: str) -> Optional[str]:
+        for old in prefixes:
+            prefix = f'transport_{old}_'
+            if item.startswith(prefix):
+                return None if renames[old] is None else f'transport_{renames[old]}_{item[len(prefix):]}'
+        return item
+    priorities = dict(zip(previous, genome))
+    transferred = []
+    for name in robots:
+        renamed = [rename(item) for item in priorities[mapping[name]]]
+        transferred.append([item for item in renamed if item is not None])
+    return transferred
@@ -30,6 +30,7 @@ class RobotAgent:
         self.task_priority = task_priority
         self.assigned_task = None
         self.state = AgentState.IDLE
+        self.frontier: Optional[int] = None  # 直近の update_task で選んだ task_priority の位置（全完了なら長さ、未参照なら None）
 
     def is_inactive(self):
         """ ロボットの稼働状態を確認 """
@@ -61,15 +62,40 @@ class RobotAgent:
     def update_task(self, tasks: dict[str, BaseTask]):
         # すでにタスクが割り当てられている場合はスキップ
         if isinstance(self.assigned_task, Charge):
+            self.frontier = None
             return
         # 優先順位で目標タスクを決定
-        for task_name in self.task_priority:
+        for i, task_name in enumerate(self.task_priority):
             task = tasks[task_name]
             # タスクが完了済みなら次のタスクに
             if task.is_completed():
                 continue
             self.assigned_task = task
+            self.frontier = i
             return
+        self.frontier = len(self.task_priority)
+        # 優先順位のタスクがすべて完了していれば、最も近い実行可能なタスクに向かう
+        # （優先順位が全タスクを含む場合は該当するタスクがないため何もしない）
+        self.assigned_task = self.nearest_ready_task(tasks)
+
+    def nearest_ready_task(self, tasks: dict[str, BaseTask]) -> Optional[BaseTask]:
+        """
+        未完了・依存先が完了済みで、ロボットが必要能力のいずれかを持つタスクのうち最も近いもの（同距離なら tasks の順）
+        必要能力のないタスク（組み立てなど）は対象外
+        """
+        nearest = None
+        min_dist = sys.float_info.max
+        for task in tasks.values():
+            if task.is_completed() or not task.are_dependencies_completed():
+                continue
+            required = [attr for attr, value in task.required_performance.items() if value > 0]
+            if not any(self.robot.type.performance.get(attr, 0) > 0 for attr in required):
+                continue
+            dist = math.sqrt(sum((x - y) ** 2 for x, y in zip(task.coordinate, self.robot.coordinate)))
+            if dist < min_dist:
+                min_dist = dist
+                nearest = task
+        return nearest
 
     def is_on_site(self) -> bool:
         if self.assigned_task is None:
@@ -0,0 +1,138 @@
+import math
+from typing import Any
+import numpy as np
+from modutask.core import *
+
+def travel_steps(distance: float, mobility: float) -> float:
+    """distance を移動するのに必要な最小ステップ数（移動できなければ inf）"""
+    if distance <= 1e-8:
+        return 0.0
+    if mobility <= 0:
+        return math.inf
+    return float(math.ceil(distance / mobility - 1e-9))
+
+class RemainingWorkloadBound:
+    """
+    優先順位に対する目的関数 [残タスク総量, 残タスク分散, 最長モジュール使用時間] の下界（シミュレーションなし）
+    各タスクの最初の仕事ができる最も早いステップを
+      - 必要能力を満たすロボットの組がそろう最も早い到着（移動能力と距離から）
+      - 依存先の最も早い完了
+    から求め、残りのステップで進められる量（製造・組み立ては1、運搬は最大の移動能力）を差し引いて残タスク総量の下界とする
+    優先順位は各ロボットが最初に向かうタスクにだけ使う。そのタスクが完了しうる前・充電に向かいうる前は、
+    そのタスクへ直進していることが確定するため、他のタスクへの到着はその地点から数える
+    故障・充電は到着を遅らせるだけなので、どの訓練シナリオでも下界になる
+    残タスク分散は位置の動かないタスクの残量の下界から、最長モジュール使用時間は初期値（1ステップ目に確実に移動するロボットは +1）
+    から求める（故障は1ステップ目にも起こりうるため、それ以上の稼働は仮定しない）
+    ※ configs/20250414 の問題では下界が緩く枝刈りが起きないため、task_allocation.py からは使っていない
+    """
+    def __init__(self, robots: dict[str, Robot], combined_tasks: dict[str, BaseTask], task_names: list[str],
+                 modules: dict[str, Module], max_step: int):
+        self.agent_names = list(robots)
+        self.task_names = list(task_names)
+        self.max_step = max_step
+        self.order = topological_order(combined_tasks, list(combined_tasks))
+        self.completed = {name for name, task in combined_tasks.items() if task.is_completed()}
+        self.remaining = {name: max(float(task.total_workload - task.completed_workload), 0.0)
+                          for name, task in combined_tasks.items()}
+        self.coordinates = {name: np.array(task.coordinate, dtype=float) for name, task in combined_tasks.items()}
+        self.dependencies = {name: [dep.name for dep in task.task_dependency if dep.name in combined_tasks]
+                             for name, task in combined_tasks.items()}
+        self.required = {name: {attr: value for attr, value in task.required_performance.items() if value > 0}
+                         for name, task in combined_tasks.items()}
+        max_mobility = max((robot.type.performance.get(PerformanceAttributes.MOBILITY, 0.0) for robot in robots.values()),
+                           default=0.0)
+        self.fixed = [name for name in self.task_names if not isinstance(combined_tasks[name], Transport)]
+        self.total_remaining = sum(self.remaining[name] for name in self.task_names)
+        self.rates = {name: max_mobility if isinstance(task, Transport) else 1.0 for name, task in combined_tasks.items()}
+
+        self.positions = [np.array(robot.coordinate, dtype=float) for robot in robots.values()]
+        self.mobility = [float(robot.type.performance.get(PerformanceAttributes.MOBILITY, 0.0)) for robot in robots.values()]
+        self.performance = [dict(robot.type.performance) for robot in robots.values()]
+        self.committable = []  # 1ステップ目から優先順位どおりに動くことが確定するステップ数の上限（充電に向かわない間）
+        for robot in robots.values():
+            if robot.state != RobotState.ACTIVE or not robot.is_battery_sufficient():
+                self.committable.append(0)
+            elif robot.type.power_consumption <= 0:
+                self.committable.append(max_step)
+            else:
+                steps = (robot.total_battery() - robot.type.recharge_trigger) / robot.type.power_consumption
+                self.committable.append(max(int(math.floor(steps)), 0) if robot.total_battery() >= robot.type.recharge_trigger else 0)
+        self.mounted = [[module.name for module in robot.component_mounted] for robot in robots.values()]
+        self.operating_times = {name: float(module.operating_time) for name, module in modules.items()}
+        # 優先順位によらない到着・開始・完了の下界
+        self.arrivals = [{name: travel_steps(float(np.linalg.norm(self.coordinates[name] - position)), mobility)
+                          for name in combined_tasks} for position, mobility in zip(self.positions, self.mobility)]
+        self.base_starts, self.base_finishes = self._schedule(self.arrivals)
+
+    def _schedule(self, arrivals: list[dict[str, float]]) -> tuple[dict[str, float], dict[str, float]]:
+        """各タスクの最初の仕事の直前のステップ数と完了ステップの下界"""
+        starts: dict[str, float] = {}
+        finishes: dict[str, float] = {}
+        for name in self.order:
+            if name in self.completed:
+                starts[name] = finishes[name] = 0.0
+                continue
+            release = max((max(finishes[dep] - 1.0, 0.0) for dep in self.dependencies[name]), default=0.0)
+            required = self.required[name]
+            ready = 0.0
+            if required:
+                capable = sorted((arrival[name], i) for i, arrival in enumerate(arrivals)
+                                 if any(self.performance[i].get(attr, 0.0) > 0 for attr in required))
+                total = {attr: 0.0 for attr in required}
+                ready = math.inf
+                for arrival, i in capable:
+                    for attr in required:
+                        total[attr] += self.performance[i].get(attr, 0.0)
+                    if all(total[attr] >= value for attr, value in required.items()):
+                        ready = arrival
+                        break
+            starts[name] = max(release, ready)
+            rate = self.rates[name]
+            finishes[name] = starts[name] + (self.remaining[name] / rate if rate > 0 else math.inf)
+        return starts, finishes
+
+    def __call__(self, order: list[list[Any]]) -> list[float]:
+        arrivals = []
+        moving = set()
+        for i, priority in enumerate(order):
+            first = next((name for name in priority if name not in self.completed), None)
+            if first is None or self.committable[i] == 0:
+                arrivals.append(self.arrivals[i])
+                continue
+            direct = self.arrivals[i][first]
+            committed = min(direct, math.floor(self.base_finishes[first]), self.committable[i])
+            if direct > 0:
+                moving.add(i)
+            if committed <= 0:
+                arrivals.append(self.arrivals[i])
+                continue
+            # committed ステップは first へ直進しているので、他のタスクへはその地点から向かう
+            v = self.coordinates[first] - self.positions[i]
+            distance = float(np.linalg.norm(v))
+            position = self.positions[i] + v * min(committed * self.mobility[i] / distance, 1.0) if distance > 0 else self.positions[i]
+            arrival = {name: committed + travel_steps(float(np.linalg.norm(self.coordinates[name] - position)), self.mobility[i])
+                       for name in self.coordinates}
+            arrival[first] = direct
+            arrivals.append(arrival)
+        starts, _ = self._schedule(arrivals)
+        lower = {name: max(self.remaining[name] - self.rates[name] * max(self.max_step - starts[name], 0.0), 0.0)
+                 for name in self.task_names}
+        remaining = sum(lower.values())
+        operating_times = dict(self.operating_times)
+        for i in moving:
+            for name in self.mounted[i]:
+                operating_times[name] += 1.0
+        return [float(remaining), self._variance_bound(lower), float(max(operating_times.values(), default=0.0))]
+
+    def _variance_bound(self, lower: dict[str, float]) -> float:
+        """
+        残タスク分散の下界
+        位置の動かないタスク（運搬以外）の残量の下界だけで計算した重み付き平方偏差の和を、残量の上限（初期の残量の和）で割る
+        """
+        names = [name for name in self.fixed if lower[name] > 0]
+        if not names or self.total_remaining <= 0:
+            return 0.0
+        weights = np.array([lower[name] for name in names])
+        coordinates = np.array([self.coordinates[name] for name in names])
+        center = np.average(coordinates, axis=0, weights=weights)
+        return float(np.sum(weights * np.sum((coordinates - center) ** 2, axis=1)) / self.total_remaining)
@@ -0,0 +1,322 @@
+import gc
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Any, Optional
+import numpy as np
+from modutask.core import *
+from modutask.io import *
+from modutask.simulator.simulation import Simulator
+from modutask.utils.callback import BaseCallback, GenerationRecord
+
+def variance_remaining_workload(tasks: dict[str, BaseTask]) -> float:
+    # 各タスクの座標と未完了仕事量を抽出
+    coordinates = []
+    weights = []
+
+    for task in tasks.values():
+        remaining = task.total_workload - task.completed_workload
+        coordinates.append(np.array(task.coordinate))
+        weights.append(remaining)
+
+    coordinates = np.array(coordinates)
+    weights = np.array(weights)
+    if np.sum(weights) <= 0:  # すべてのタスクが完了していれば分散は0
+        return 0.0
+
+    # 重心（重み付き平均座標）を計算
+    weighted_center = np.average(coordinates, axis=0, weights=weights)
+    # 各点の重心からの距離の二乗 × 重み の合計を求める
+    distances_squared = np.sum(weights * np.sum((coordinates - weighted_center) ** 2, axis=1))
+    # 重み付き分散（距離に基づく残タスク分散）
+    return float(distances_squared / np.sum(weights))
+
+def maximal_operating_time(modules: dict[str, Module]) -> float:
+    operating_times = np.array([module.operating_time for module in modules.values()])
+    return float(max(operating_times))
+
+def simulate_scenario(task_priorities: dict[str, list[str]], scenario_names: list[str], max_step: int,
+                      modules: dict[str, Module], robots: dict[str, Robot], tasks: dict[str, BaseTask],
+                      combined_tasks: dict[str, BaseTask], risk_scenarios: dict[str, BaseRiskScenario],
+                      simulation_map: SimulationMap) -> list[float]:
+    """
+    1つの訓練シナリオをシミュレーションする
+    [残タスク総量, 残タスク分散, 最長モジュール使用時間] を返す
+    """
+    local_modules = clone_module(modules=modules)
+    local_robots = clone_robots(robots=robots, modules=local_modules)
+    local_combined_tasks = clone_tasks(tasks=combined_tasks, modules=local_modules, robots=local_robots)
+    local_scenarios = clone_risk_scenarios(risk_scenarios=risk_scenarios)
+    local_map = clone_simulation_map(simulation_map=simulation_map)
+    simulator = Simulator(
+        tasks=local_combined_tasks,
+        robots=local_robots,
+        task_priorities=task_priorities,
+        scenarios=[local_scenarios[scenario_name] for scenario_name in scenario_names],
+        simulation_map=local_map,
+        )
+    for current_step in range(max_step):
+        simulator.run_simulation()
+    return scenario_objectives(task_names=list(tasks), combined_tasks=local_combined_tasks, modules=local_modules)
+
+def scenario_objectives(task_names: list[str], combined_tasks: dict[str, BaseTask], modules: dict[str, Module]) -> list[float]:
+    """シミュレーション後の [残タスク総量, 残タスク分散, 最長モジュール使用時間]（組み立てタスク等を除く元のタスクで計算）"""
+    local_tasks = {task_name: combined_tasks[task_name] for task_name in task_names}
+    return [float(sum(task.total_workload - task.completed_workload for task in local_tasks.values())),
+            float(variance_remaining_workload(tasks=local_tasks)),
+            float(maximal_operating_time(modules=modules))]
+
+def average_scenario_results(results: list[list[float]]) -> list[float]:
+    """シナリオごとの結果を入力順に平均（並列実行でも集計順序は変わらない）"""
+    return [sum(values) / len(values) for values in zip(*results)]
+
+class BranchingScenario(BaseRiskScenario):
+    """
+    複数の訓練シナリオをまとめて1本の軌跡で扱う故障シナリオ
+    故障判定ごとに active な訓練シナリオすべての乱数を進め、判定が一致している間は共通の軌跡として進める
+    一部だけが故障と判定した場合は、それらを splits に記録して active から外し、残りは故障なしとして続ける
+    """
+    def __init__(self, members: list[list[BaseRiskScenario]]):
+        super().__init__(name='branching', seed=0)
+        self.members = members  # 訓練シナリオごとの故障シナリオのリスト
+        self.active = list(range(len(members)))
+        self.splits: list[list[int]] = []  # 直前のステップで分岐した訓練シナリオの番号
+
+    def initialize(self) -> None:
+        for member in self.members:
+            for scenario in member:
+                scenario.initialize()
+
+    def restrict(self, indices: list[int]) -> None:
+        """分岐した訓練シナリオだけを残す"""
+        self.active = list(indices)
+        self.splits = []
+
+    def malfunction_module(self, module: Module) -> bool:
+        failed = []
+        for index in self.active:
+            # Module.update_state と同じく、最初に故障と判定したシナリオで打ち切る
+            if any(scenario.malfunction_module(module) for scenario in self.members[index]):
+                failed.append(index)
+        if failed and len(failed) < len(self.active):
+            self.splits.append(failed)
+            self.active = [index for index in self.active if index not in failed]
+            return False
+        return bool(failed)
+
+def simulate_branching_scenarios(task_priorities: dict[str, list[str]], scenarios: list[list[str]], max_step: int,
+                                 modules: dict[str, Module], robots: dict[str, Robot], tasks: dict[str, BaseTask],
+                                 combined_tasks: dict[str, BaseTask], risk_scenarios: dict[str, BaseRiskScenario],
+                                 simulation_map: SimulationMap, snapshot_interval: int = 10) -> list[list[float]]:
+    """
+    複数の訓練シナリオを、最初に故障判定が分かれるまで共通の軌跡としてシミュレーションする
+    分岐した訓練シナリオは、snapshot_interval ステップごとに保存した共通の軌跡の状態から再実行する
+    結果は simulate_scenario をシナリオごとに実行した場合と一致する（scenarios と同じ順序で返す）
+    """
+    local_modules = clone_module(modules=modules)
+    local_robots = clone_robots(robots=robots, modules=local_modules)
+    local_combined_tasks = clone_tasks(tasks=combined_tasks, modules=local_modules, robots=local_robots)
+    members = []
+    for scenario_names in scenarios:
+        local_scenarios = clone_risk_scenarios(risk_scenarios=risk_scenarios)  # 訓練シナリオごとに独立した乱数
+        members.append([local_scenarios[scenario_name] for scenario_name in scenario_names])
+    simulator = Simulator(
+        tasks=local_combined_tasks,
+        robots=local_robots,
+        task_priorities=task_priorities,
+        scenarios=[BranchingScenario(members)],
+        simulation_map=clone_simulation_map(simulation_map=simulation_map),
+        )
+
+    results: list[list[float]] = [[] for _ in scenarios]
+    # (シミュレータ, モジュール, それまでの状態の保存) を深さ優先で処理（分岐は保存から遅延して復元する）
+    pending: list[tuple[Optional[Simulator], dict[str, Module], dict[int, bytes], list[int]]] = [
+        (simulator, local_modules, {}, [])]
+    while pending:
+        simulator, local_modules, snapshots, indices = pending.pop()
+        if simulator is None:
+            base = max(snapshots)
+            simulator, local_modules = pickle.loads(snapshots[base])
+            simulator.scenarios[0].restrict(indices)
+        branching = simulator.scenarios[0]
+        while simulator.current_step < max_step:
+            step = simulator.current_step
+            if step % snapshot_interval == 0 and step not in snapshots:
+                snapshots = {**snapshots, step: pickle.dumps((simulator, local_modules), protocol=pickle.HIGHEST_PROTOCOL)}
+            simulator.run_simulation()
+            for split in branching.splits:
+                pending.append((None, {}, {s: data for s, data in snapshots.items() if s <= step}, split))
+            branching.splits = []
+        objectives = scenario_objectives(task_names=list(tasks), combined_tasks=simulator.tasks, modules=local_modules)
+        for index in branching.active:
+            results[index] = list(objectives)
+    return results
+
+_scenario_worker: dict[str, Any] = {}
+
+def _init_scenario_worker(model_name: str) -> None:
+    _scenario_worker['model'] = load_shared_model(model_name)
+
+def _simulate_shared_scenario(task_priorities: dict[str, list[str]], scenario_names: list[str], max_step: int) -> list[float]:
+    results = simulate_scenario(task_priorities, scenario_names, max_step, **_scenario_worker['model'])
+    gc.collect()
+    return results
+
+class ScenarioPool:
+    """
+    1回の目的関数評価に含まれる複数シナリオを並列にシミュレーションするワーカープール
+    個体群が小さくシナリオが多い場合に、1個体の評価時間をシナリオ1本分に近づける
+    """
+    def __init__(self, n_workers: int, modules: dict[str, Module], robots: dict[str, Robot], tasks: dict[str, BaseTask],
+                 combined_tasks: dict[str, BaseTask], risk_scenarios: dict[str, BaseRiskScenario], simulation_map: SimulationMap):
+        self.shared_model = SharedModel.create(compile_model(
+            modules=modules,
+            robots=robots,
+            tasks=tasks,
+            combined_tasks=combined_tasks,
+            risk_scenarios=risk_scenarios,
+            simulation_map=simulation_map,
+            ))
+        self.executor = ProcessPoolExecutor(max_workers=n_workers, initializer=_init_scenario_worker,
+                                            initargs=(self.shared_model.name,))
+
+    def run(self, task_priorities: dict[str, list[str]], scenarios: list[list[str]], max_step: int) -> list[list[float]]:
+        """シナリオごとの結果を scenarios と同じ順序で返す"""
+        return list(self.executor.map(_simulate_shared_scenario, repeat(task_priorities), scenarios, repeat(max_step)))
+
+    def close(self) -> None:
+        self.executor.shutdown()
+        self.shared_model.close()
+
+    def __enter__(self) -> "ScenarioPool":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+def valid_frontiers(parent: list[str], child: list[str]) -> list[bool]:
+    """
+    位置 f で止まる優先順位の走査が parent と child で同じタスクを選ぶかどうか（f = 0, ..., len(parent)）
+    先頭 f 個が集合として等しく、f 番目が同じなら、同じ状態からは同じタスクが選ばれる
+    f = len(parent) は全タスク完了（どの順列でも何も選ばれない）を表す
+    """
+    if len(parent) != len(child):
+        return [False] * (len(parent) + 1)
+    valid = []
+    counts: dict[str, int] = {}  # parent の先頭 - child の先頭（多重集合の差）
+    mismatched = 0  # counts が0でない要素の数
+    for f in range(len(parent)):
+        valid.append(mismatched == 0 and parent[f] == child[f])
+        for item, delta in ((parent[f], 1), (child[f], -1)):
+            before = counts.get(item, 0)
+            counts[item] = before + delta
+            mismatched += (counts[item] != 0) - (before != 0)
+    valid.append(mismatched == 0)
+    return valid
+
+def divergence_step(frontiers: list[tuple[Optional[int], ...]], parent: dict[str, list[str]],
+                    child: dict[str, list[str]], agent_names: list[str]) -> int:
+    """parent の軌跡を child で再現したときに、最初にいずれかのエージェントの選択が変わりうるステップ"""
+    valid = [valid_frontiers(parent[name], child[name]) for name in agent_names]
+    for step, step_frontiers in enumerate(frontiers):
+        for agent_valid, frontier in zip(valid, step_frontiers):
+            if frontier is not None and not agent_valid[frontier]:
+                return step
+    return len(frontiers)
+
+class SimulationTrace:
+    """1つの優先順位・シナリオのシミュレーション記録"""
+    def __init__(self, frontiers: list[tuple[Optional[int], ...]], snapshots: dict[int, bytes], result: list[float]):
+        self.frontiers = frontiers  # ステップごとの各エージェントの参照位置
+        self.snapshots = snapshots  # ステップ数 -> そのステップ開始時点の (Simulator, modules) の pickle
+        self.result = result
+
+class PrefixSharingEvaluator(BaseCallback):
+    """
+    優先順位の前半が共通する親のシミュレーションを途中から再開する目的関数
+    評価した優先順位ごとに、各ステップで RobotAgent.update_task が参照した位置と snapshot_interval ステップごとの
+    状態を記録しておく。子の評価では、記録のある優先順位のうち選択が変わりうる最初のステップが最も遅いものを探し、
+    そのステップ以前の最後の状態から再開する（最後まで変わらなければ結果をそのまま使う）
+    記録はアルゴリズムの callbacks に登録すると世代ごとに個体群の優先順位だけに絞られる（未登録なら max_traces 件まで）
+    記録は呼び出したプロセスに保持されるため、逐次評価（SerialEvaluator）で使う
+    """
+    def __init__(self, modules: dict[str, Module], robots: dict[str, Robot], tasks: dict[str, BaseTask],
+                 combined_tasks: dict[str, BaseTask], risk_scenarios: dict[str, BaseRiskScenario],
+                 simulation_map: SimulationMap, training_scenarios: list[list[str]], max_step: int,
+                 snapshot_interval: int = 10, max_traces: int = 200):
+        self.model = dict(modules=modules, robots=robots, tasks=tasks, combined_tasks=combined_tasks,
+                          risk_scenarios=risk_scenarios, simulation_map=simulation_map)
+        self.agent_names = list(robots)
+        self.training_scenarios = training_scenarios
+        self.max_step = max_step
+        self.snapshot_interval = snapshot_interval
+        self.max_traces = max_traces
+        self.traces: dict[Any, tuple[dict[str, list[str]], list[SimulationTrace]]] = {}  # 優先順位 -> (優先順位, シナリオごとの記録)
+        self.simulated_steps = 0  # 実際にシミュレーションしたステップ数
+        self.reused_steps = 0  # 記録の再利用で省略したステップ数
+
+    def __call__(self, order: list[list[str]]) -> list[float]:
+        task_priorities = {name: list(order[i]) for i, name in enumerate(self.agent_names)}
+        traces = [self._simulate(task_priorities, index, scenario_names)
+                  for index, scenario_names in enumerate(self.training_scenarios)]
+        key = tuple(tuple(priority) for priority in order)
+        self.traces.pop(key, None)
+        self.traces[key] = (task_priorities, traces)
+        while len(self.traces) > self.max_traces:
+            del self.traces[next(iter(self.traces))]  # 古いものから捨てる
+        return average_scenario_results([trace.result for trace in traces])
+
+    def _find_base(self, task_priorities: dict[str, list[str]], index: int) -> tuple[Optional[SimulationTrace], int]:
+        """選択が変わりうる最初のステップが最も遅い記録を探す"""
+        best: tuple[Optional[SimulationTrace], int] = (None, 0)
+        for priorities, traces in self.traces.values():
+            step = divergence_step(traces[index].frontiers, priorities, task_priorities, self.agent_names)
+            if step > best[1]:
+                best = (traces[index], step)
+        return best
+
+    def _simulate(self, task_priorities: dict[str, list[str]], index: int, scenario_names: list[str]) -> SimulationTrace:
+        base, step = self._find_base(task_priorities, index)
+        if base is not None and step >= self.max_step:
+            self.reused_steps += self.max_step
+            return base  # 最後まで同じ軌跡になる
+
+        start = max((s for s in base.snapshots if s <= step), default=0) if base is not None else 0
+        if start > 0:
+            simulator, modules = pickle.loads(base.snapshots[start])
+            for name, agent in simulator.agents.items():
+                agent.task_priority = task_priorities[name]
+            frontiers = base.frontiers[:start]
+            snapshots = {s: snapshot for s, snapshot in base.snapshots.items() if s <= start}
+        else:
+            modules = clone_module(modules=self.model['modules'])
+            robots = clone_robots(robots=self.model['robots'], modules=modules)
+            combined_tasks = clone_tasks(tasks=self.model['combined_tasks'], modules=modules, robots=robots)
+            scenarios = clone_risk_scenarios(risk_scenarios=self.model['risk_scenarios'])
+            simulator = Simulator(
+                tasks=combined_tasks,
+                robots=robots,
+                task_priorities=task_priorities,
+                scenarios=[scenarios[scenario_name] for scenario_name in scenario_names],
+                simulation_map=clone_simulation_map(simulation_map=self.model['simulation_map']),
+                )
+            frontiers = []
+            snapshots = {}
+
+        for current_step in range(start, self.max_step):
+            if current_step > 0 and current_step % self.snapshot_interval == 0 and current_step not in snapshots:
+                snapshots[current_step] = pickle.dumps((simulator, modules), protocol=pickle.HIGHEST_PROTOCOL)
+            simulator.run_simulation()
+            frontiers.append(simulator.frontiers)
+        self.simulated_steps += self.max_step - start
+        self.reused_steps += start
+        result = scenario_objectives(task_names=list(self.model['tasks']), combined_tasks=simulator.tasks, modules=modules)
+        return SimulationTrace(frontiers, snapshots, result)
+
+    def keep_elites(self, genomes: list[list[list[str]]]) -> None:
+        """指定した優先順位の記録だけを残す"""
+        keys = {tuple(tuple(priority) for priority in genome) for genome in genomes}
+        self.traces = {key: value for key, value in self.traces.items() if key in keys}
+
+    def on_generation(self, algorithm: Any, record: GenerationRecord) -> None:
+        self.keep_elites([ind.genome for ind in algorithm.population])
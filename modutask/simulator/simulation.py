@@ -1,28 +1,78 @@
+import copy
+import pickle
+from typing import Optional
 import numpy as np
 from modutask.core import *
 from modutask.simulator.agent import RobotAgent
+from modutask.utils.logger import raise_with_log
 
 
 class Simulator:
     def __init__(self, tasks: dict[str, BaseTask], robots: dict[str, Robot], task_priorities: dict[str, list[str]], 
-                 scenarios: list[BaseRiskScenario], simulation_map: SimulationMap):
+                 scenarios: list[BaseRiskScenario], simulation_map: SimulationMap, 
+                 modules: Optional[dict[str, Module]] = None):
         self.tasks = tasks
         self.agents = {robot.name: RobotAgent(robot, task_priorities[robot.name]) for _, robot in robots.items()}
         self.simulation_map = simulation_map
         self.scenarios = scenarios
         for scenario in self.scenarios:
             scenario.initialize()
+        self.modules = modules  # 指定があれば fork で一緒に複製する（目的関数の計算用）
+        self.current_step = 0  # 実行済みのステップ数
+        self.frontiers: tuple[Optional[int], ...] = ()  # 直前のステップで各エージェントが参照した優先順位の位置
+
+    def snapshot(self) -> bytes:
+        """現在の状態（タスク・ロボット・モジュール・地図・故障シナリオの乱数）を1つのバイト列にする"""
+        return pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def restore(data: bytes) -> "Simulator":
+        """snapshot から独立した Simulator を作る（同じ snapshot から何度でも復元できる）"""
+        return pickle.loads(data)
+
+    def fork(self, task_priorities: Optional[dict[str, list[str]]] = None,
+             scenarios: Optional[list[BaseRiskScenario]] = None) -> "Simulator":
+        """
+        現在の状態を複製した Simulator を返す（元の Simulator には影響しない）
+        task_priorities を指定すると複製側の優先順位を差し替え、scenarios を指定すると故障シナリオを初期化して差し替える
+        """
+        simulator = Simulator.restore(self.snapshot())
+        if task_priorities is not None:
+            simulator.set_task_priorities(task_priorities)
+        if scenarios is not None:
+            simulator.reset_scenarios(scenarios)
+        return simulator
+
+    def reset_scenarios(self, scenarios: list[BaseRiskScenario]) -> None:
+        """故障シナリオを初期化した複製に差し替える（渡したシナリオの乱数は進めない）"""
+        self.scenarios = [copy.deepcopy(scenario) for scenario in scenarios]
+        for scenario in self.scenarios:
+            scenario.initialize()
+
+    def set_task_priorities(self, task_priorities: dict[str, list[str]]) -> None:
+        """次のステップから各エージェントが使う優先順位を差し替える"""
+        missing = [name for name in self.agents if name not in task_priorities]
+        if missing:
+            raise_with_log(ValueError, f"Task priorities are missing for agents: {missing}.")
+        for name, agent in self.agents.items():
+            agent.task_priority = list(task_priorities[name])
+
+    def task_priorities(self) -> dict[str, list[str]]:
+        return {name: list(agent.task_priority) for name, agent in self.agents.items()}
 
     def run_simulation(self):
+        frontiers = []
         # 各エージェントのループ
         for _, agent in self.agents.items():
             # 稼働不可ならスキップ
             if agent.is_inactive():
+                frontiers.append(None)
                 continue
             # 充電が必要かチェック
             agent.decide_recharge(self.simulation_map.charge_stations)
             # タスクの割り当て
             agent.update_task(self.tasks)
+            frontiers.append(agent.frontier)
             if agent.assigned_task is None:  # 全タスク終了
                 continue
             # 移動が必要なエージェントは移動
@@ -62,5 +112,7 @@ class Simulator:
             agent.reset_task()
             agent.set_state_idle()
             agent.robot.update_state()  # ロボット状態更新
+        self.frontiers = tuple(frontiers)
+        self.current_step += 1
 
 
@@ -1,6 +1,9 @@
 from .logger import setup_logger, raise_with_log
+from .callback import BaseCallback, GenerationRecord
 
 __all__ = [
     "setup_logger", 
-    "raise_with_log"
+    "raise_with_log",
+    "BaseCallback",
+    "GenerationRecord",
     ]
\ No newline at end of file
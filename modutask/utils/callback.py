@@ -0,0 +1,25 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Optional
+
+@dataclass
+class GenerationRecord:
+    """1世代分の計測値（時間は秒）"""
+    generation: int
+    evaluation_time: float
+    sort_time: float  # 生存選択（非支配ソート・混雑距離 / HV貢献度）
+    variation_time: float  # 親選択・交叉・突然変異
+    evaluations: int  # 評価に回した遺伝子の数
+    cache_hits: int  # そのうち評価キャッシュで済んだ数
+    front_size: int  # 個体群中の非支配個体の数
+    hypervolume: Optional[float] = None
+
+class BaseCallback(ABC):
+    """ 世代ごとに呼ばれるコールバックの抽象基底クラス """
+
+    @abstractmethod
+    def on_generation(self, algorithm: Any, record: GenerationRecord) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
@@ -15,47 +15,94 @@ from modutask.visualization.objective import plot_objective_scatter
 logger = logging.getLogger(__name__)
 
 
-def objective(order: list[Robot]) -> list[float]:
-    """目的関数の計算"""
+def robot_contribution(robot: Robot) -> tuple[float, float, float, float, float, float]:
+    """ロボット1台分の目的関数への寄与（最後の要素は稼働可能になるまでの不足数: 不足モジュール数 + バッテリー不足）"""
+    robot_type = robot.type
+    operating_time = 0.0
+    module_distance = 0.0
+    for module in robot.component_required:
+        operating_time += module.operating_time
+        module_distance += float(np.linalg.norm(np.array(module.coordinate) - np.array(robot.coordinate)))
+    robot.update_state()
+    shortfall = 0.0
+    if robot.state != RobotState.ACTIVE:
+        shortfall = float(len(robot.missing_components()) + (0 if robot.is_battery_sufficient() else 1))
+    return (robot_type.performance[PerformanceAttributes.TRANSPORT],
+            robot_type.performance[PerformanceAttributes.MANUFACTURE],
+            robot_type.performance[PerformanceAttributes.MOBILITY],
+            operating_time,
+            module_distance,
+            shortfall,
+            )
+
+def aggregate_contributions(contributions: list[tuple[float, float, float, float, float, float]]) -> ConstrainedObjectives:
+    """ロボットごとの寄与を合計して目的関数値にする"""
     # Transportの総量 max
     # Manufactureの総量 max
     # Mobirityの総量 max
     # 使用モジュールの合計使用時間 min
     # モジュール運搬距離 min
     """制約条件の計算"""
-    # 可動可能なロボット数 >= 1
+    # 可動可能なロボット数 >= 1（違反量は最も稼働に近いロボットの不足数）
     sum_transport = 0.0
     sum_manufacture = 0.0
     sum_mobility = 0.0
     sum_operating_time = 0.0
     sum_module_distance = 0.0
-    count_active_robot = 0
-
-    for robot in order:
-        robot_type = robot.type
-        sum_transport += robot_type.performance[PerformanceAttributes.TRANSPORT]
-        sum_manufacture += robot_type.performance[PerformanceAttributes.MANUFACTURE]
-        sum_mobility += robot_type.performance[PerformanceAttributes.MOBILITY]
-
-        for module in robot.component_required:
-            sum_operating_time += module.operating_time
-            sum_module_distance += float(np.linalg.norm(np.array(module.coordinate) - np.array(robot.coordinate)))
-        robot.update_state()
-        if robot.state == RobotState.ACTIVE:
-            count_active_robot += 1
-    if count_active_robot == 0:
-        return [float('inf'), float('inf'), float('inf'), float('inf'), float('inf')]
-    return [-1 * sum_transport, 
-            -1 * sum_manufacture, 
-            -1 * sum_mobility, 
-            sum_operating_time, 
-            sum_module_distance
-            ]
+    min_shortfall = 1.0  # ロボットがいなければ1台足りない
+
+    for index, (transport, manufacture, mobility, operating_time, module_distance, shortfall) in enumerate(contributions):
+        sum_transport += transport
+        sum_manufacture += manufacture
+        sum_mobility += mobility
+        sum_operating_time += operating_time
+        sum_module_distance += module_distance
+        min_shortfall = shortfall if index == 0 else min(min_shortfall, shortfall)
+    return ConstrainedObjectives([-1 * sum_transport, 
+                                  -1 * sum_manufacture, 
+                                  -1 * sum_mobility, 
+                                  sum_operating_time, 
+                                  sum_module_distance
+                                  ], constraints=[min_shortfall])
+
+def objective(order: list[Robot]) -> ConstrainedObjectives:
+    """目的関数の計算"""
+    return aggregate_contributions([robot_contribution(robot) for robot in order])
+
+class IncrementalObjective:
+    """
+    ロボット単位の寄与をキャッシュする目的関数
+    突然変異・交叉で変化するのは2~3台のロボットのみなので、親の評価時に計算した寄与を再利用し
+    変化したロボットの寄与だけを計算する
+    """
+    def __init__(self, encoding: ConfigurationVariable, max_cache_size: int = 100000):
+        self.encoding = encoding
+        self.max_cache_size = max_cache_size
+        self.contributions: dict[tuple, tuple[float, float, float, float, float, float]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, order: list[Robot]) -> ConstrainedObjectives:
+        contributions = []
+        for robot in order:
+            key = self.encoding.robot_key(robot)
+            contribution = self.contributions.get(key)
+            if contribution is None:
+                contribution = robot_contribution(robot)
+                if len(self.contributions) >= self.max_cache_size:
+                    self.contributions.clear()
+                self.contributions[key] = contribution
+                self.misses += 1
+            else:
+                self.hits += 1
+            contributions.append(contribution)
+        return aggregate_contributions(contributions)
 
 def main():
     """ロボット構成最適化の実行"""
     parser = argparse.ArgumentParser(description="Run the robotic system simulator.")
     parser.add_argument("--property_file", type=str, help="Path to the property file")
+    parser.add_argument("--resume", action="store_true", help="Resume from configuration.checkpoint_dir if it exists")
     args = parser.parse_args()
 
     try:
@@ -69,24 +116,63 @@ def main():
     robot_types = load_robot_types(file_path=prop['load']['robot_type'], module_types=module_types)
 
     seed_rng(prop['configuration']['seed'])
-    def func(order: list[list[int]]) -> list[float]:
-        resutls = objective(order)
-        return resutls
-
     encoding = ConfigurationVariable(modules=modules, robot_types=robot_types)
-
-    algo = NSGAII(
+    func = IncrementalObjective(encoding=encoding)
+
+    # checkpoint_dir の指定があれば checkpoint_interval 世代ごとに保存し、--resume で続きから実行する
+    checkpoint_dir = prop['configuration'].get('checkpoint_dir')
+    checkpointer = None
+    if checkpoint_dir is not None:
+        checkpointer = Checkpointer(checkpoint_dir, interval=prop['configuration'].get('checkpoint_interval', 10))
+    resume_from = checkpoint_dir if args.resume and checkpoint_dir is not None and has_checkpoint(checkpoint_dir) else None
+
+    # telemetry（.csv / .jsonl）の指定があれば世代ごとの計測値を書き出す
+    callbacks = []
+    if prop['configuration'].get('telemetry') is not None:
+        callbacks.append(TelemetryWriter(prop['configuration']['telemetry']))
+    # pareto_archive の指定があれば各世代の非支配解をすべて残し、最終世代の個体群の代わりに結果として使う
+    archive = ParetoArchive() if prop['configuration'].get('pareto_archive') else None
+    if archive is not None:
+        callbacks.append(archive)
+
+    # initial_population（遺伝子の pickle・チェックポイントのディレクトリ）があれば初期個体群に含める
+    initial_genomes = None
+    if prop['configuration'].get('initial_population'):
+        initial_genomes = load_initial_genomes(prop['configuration']['initial_population'])
+
+    # nsga3 の指定があれば参照方向による生存選択（NSGAIII）を使う（n_partitions: 参照方向の分割数）
+    nsga3 = prop['configuration'].get('nsga3')
+    kwargs = {}
+    if nsga3 is not None:
+        kwargs['n_partitions'] = (nsga3 or {}).get('n_partitions')
+    algo = (NSGAIII if nsga3 is not None else NSGAII)(
         func=func,
         encoding=encoding,
         population_size=prop['configuration']['population_size'],
         generations=prop['configuration']['generations'],
+        evaluator=CachedEvaluator(SerialEvaluator(func), encoding),
+        checkpointer=checkpointer,
+        callbacks=callbacks,
+        hv_ref_point=prop['configuration'].get('hv_ref_point'),
+        terminations=make_terminations(prop['configuration'].get('termination'), ref_point=prop['configuration'].get('hv_ref_point')),
+        initial_genomes=initial_genomes,
+        resume_from=resume_from,
+        **kwargs,
     )
+    if archive is not None and resume_from is None:
+        archive.extend(list(algo.population))  # 初期個体群（再開時はチェックポイントから復元済み）
     start = time.time()
     algo.evolve()
     end = time.time()
     print(end - start)
-
-    nds = get_non_dominated_individuals(algo.get_result())
+    print(f"Stopped at generation {algo.generation}: {algo.stop_reason}")
+    for callback in callbacks:
+        callback.close()
+
+    nds = archive.individuals() if archive is not None else get_non_dominated_individuals(algo.get_result())
+    if prop['configuration'].get('save_genomes') is not None:
+        # 非支配解の遺伝子を次回の initial_population 用に保存
+        save_genomes([ind.genome for ind in nds], prop['configuration']['save_genomes'])
     kmeans = select_kmeans_representatives(pareto_individuals=nds, k=prop['configuration']['kmeans'])
     for configuration_id, ind in enumerate(kmeans):
         # ロボットの保存
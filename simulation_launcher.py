@@ -1,7 +1,7 @@
 import random
 import numpy as np
 import argparse, yaml, pickle, os, logging
-from modutask.simulator.simulation import Simulator
+from modutask.simulator.evaluation import ScenarioPool, average_scenario_results, simulate_scenario
 from modutask.core import *
 from modutask.io import *
 from modutask.utils import raise_with_log
@@ -90,33 +90,23 @@ def main():
     training_scenarios = prop['simulation']['training_scenarios']
     varidate_scenarios = prop['simulation']['varidate_scenarios']
 
-    total_remaining_workload = []
-    variance_remaining_workload = []
-    variance_operating_time = []
-
-    for scenario_names in training_scenarios:
-        local_modules = clone_module(modules=modules)
-        local_robots = clone_robots(robots=robots, modules=local_modules)
-        local_tasks = clone_tasks(tasks=combined_tasks, modules=local_modules, robots=local_robots)
-        local_scenarios = clone_risk_scenarios(risk_scenarios=risk_scenarios)
-        local_map = clone_simulation_map(simulation_map=simulation_map)
-        simulator = Simulator(
-            tasks=local_tasks, 
-            robots=local_robots, 
-            task_priorities=task_priorities, 
-            scenarios=[local_scenarios[scenario_name] for scenario_name in scenario_names],
-            simulation_map=local_map,
-            )
-        for current_step in range(max_step):
-            simulator.run_simulation()
-        total_remaining_workload.append(simulator.total_remaining_workload())
-        variance_remaining_workload.append(simulator.variance_remaining_workload())
-        variance_operating_time.append(simulator.variance_operating_time())
-    print(
-        float(sum(total_remaining_workload) / len(total_remaining_workload)), 
-        float(sum(variance_remaining_workload) / len(variance_remaining_workload)),
-        float(sum(variance_operating_time) / len(variance_operating_time))
+    # シナリオごとのシミュレーションを並列に実行し、入力順に集計する
+    scenario_workers = prop['simulation'].get('scenario_workers', 1)
+    model = dict(
+        modules=modules, 
+        robots=robots, 
+        tasks=tasks, 
+        combined_tasks=combined_tasks, 
+        risk_scenarios=risk_scenarios, 
+        simulation_map=simulation_map,
         )
+    if scenario_workers > 1:
+        with ScenarioPool(n_workers=scenario_workers, **model) as scenario_pool:
+            results = scenario_pool.run(task_priorities, training_scenarios, max_step)
+    else:
+        results = [simulate_scenario(task_priorities, scenario_names, max_step, **model) 
+                   for scenario_names in training_scenarios]
+    print(*average_scenario_results(results))
 
     # tasks = manager.combined_tasks
     # robots = manager.robots
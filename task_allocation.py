@@ -1,81 +1,88 @@
 import numpy as np
 import argparse, yaml, copy, pickle, os, logging, gc
 import time
+from typing import Optional
 from modutask.optimizer.my_moo import *
-from modutask.simulator.simulation import Simulator
+from modutask.simulator.evaluation import PrefixSharingEvaluator, ScenarioPool, average_scenario_results, simulate_branching_scenarios, simulate_scenario
 from modutask.io import *
+from modutask.optimizer.seeding import dependency_graph, heuristic_genomes
 from modutask.core import *
 from modutask.utils import raise_with_log
 from simulation_launcher import add_assembly_task, permutation_of_tasks
 
 logger = logging.getLogger(__name__)
 
-def variance_remaining_workload(tasks: dict[str, BaseTask]) -> float:
-    # 各タスクの座標と未完了仕事量を抽出
-    coordinates = []
-    weights = []
-
-    for task in tasks.values():
-        remaining = task.total_workload - task.completed_workload
-        coordinates.append(np.array(task.coordinate))
-        weights.append(remaining)
-
-    coordinates = np.array(coordinates)
-    weights = np.array(weights)
-
-    # 重心（重み付き平均座標）を計算
-    weighted_center = np.average(coordinates, axis=0, weights=weights)
-    # 各点の重心からの距離の二乗 × 重み の合計を求める
-    distances_squared = np.sum(weights * np.sum((coordinates - weighted_center) ** 2, axis=1))
-    # 重み付き分散（距離に基づく残タスク分散）
-    return float(distances_squared / np.sum(weights))
-
-def maximal_operating_time(modules: dict[str, Module]) -> float:
-    operating_times = np.array([module.operating_time for module in modules.values()])
-    return float(max(operating_times))
-
 def objective(order: list[list[str]], modules: dict[str, Module], robots: dict[str, Robot], tasks: dict[str, BaseTask], combined_tasks: dict[str, BaseTask],
-              risk_scenarios: dict[str, BaseRiskScenario], simulation_map: SimulationMap, max_step: int, training_scenarios) -> list[float]:
+              risk_scenarios: dict[str, BaseRiskScenario], simulation_map: SimulationMap, max_step: int, training_scenarios, 
+              scenario_pool: Optional[ScenarioPool] = None, branching_interval: Optional[int] = None) -> list[float]:
     # 残タスク総量　min
     # 残タスク分散　min
     # 最長モジュール使用時間 min
-    f1 = []
-    f2 = []
-    f3 = []
-
-    for scenario_names in training_scenarios:
-        local_modules = clone_module(modules=modules)
-        local_robots = clone_robots(robots=robots, modules=local_modules)
-        local_tasks = clone_tasks(tasks=tasks, modules=local_modules, robots=local_robots)
-        local_combined_tasks = clone_tasks(tasks=combined_tasks, modules=local_modules, robots=local_robots)
-        local_scenarios = clone_risk_scenarios(risk_scenarios=risk_scenarios)
-        local_map = clone_simulation_map(simulation_map=simulation_map)
-        task_priorities = {}
-        for i, robot_name in enumerate(robots):
-            task_priorities[robot_name] = order[i]
-        # permutation_of_tasks(task_priorities=task_priorities, tasks=local_combined_tasks, robots=local_robots)
-        simulator = Simulator(
-            tasks=local_combined_tasks, 
-            robots=local_robots, 
-            task_priorities=task_priorities, 
-            scenarios=[local_scenarios[scenario_name] for scenario_name in scenario_names],
-            simulation_map=local_map,
+    task_priorities = {}
+    for i, robot_name in enumerate(robots):
+        task_priorities[robot_name] = order[i]
+    # permutation_of_tasks(task_priorities=task_priorities, tasks=local_combined_tasks, robots=local_robots)
+    if scenario_pool is not None:
+        # シナリオ単位で並列に評価
+        results = scenario_pool.run(task_priorities, training_scenarios, max_step)
+    elif branching_interval is not None:
+        # 故障判定が分かれるまでは全シナリオで共通の軌跡を1回だけシミュレーション
+        results = simulate_branching_scenarios(
+            task_priorities, 
+            training_scenarios, 
+            max_step, 
+            modules=modules, 
+            robots=robots, 
+            tasks=tasks, 
+            combined_tasks=combined_tasks, 
+            risk_scenarios=risk_scenarios, 
+            simulation_map=simulation_map,
+            snapshot_interval=branching_interval,
             )
-        for current_step in range(max_step):
-            simulator.run_simulation()
-        f1.append(float(sum(task.total_workload - task.completed_workload for task in tasks.values())))
-        f2.append(float(variance_remaining_workload(tasks=local_tasks)))
-        f3.append(float(maximal_operating_time(modules=local_modules)))
-    del local_modules, local_robots, local_tasks, local_combined_tasks, local_scenarios, local_map, simulator
-    gc.collect()
-    return [sum(f1) / len(f1), 
-            sum(f2) / len(f2),
-            sum(f3) / len(f3)]
+        gc.collect()
+    else:
+        results = [
+            simulate_scenario(
+                task_priorities, 
+                scenario_names, 
+                max_step, 
+                modules=modules, 
+                robots=robots, 
+                tasks=tasks, 
+                combined_tasks=combined_tasks, 
+                risk_scenarios=risk_scenarios, 
+                simulation_map=simulation_map,
+                )
+            for scenario_names in training_scenarios
+        ]
+        gc.collect()
+    return average_scenario_results(results)
+
+_worker_context: dict = {}
+
+def init_worker(model_name: str, max_step: int, training_scenarios, branching_interval: Optional[int] = None) -> None:
+    """評価ワーカーの初期化（共有メモリ上の静的モデルを一度だけ復元）"""
+    _worker_context['model'] = load_shared_model(model_name)
+    _worker_context['max_step'] = max_step
+    _worker_context['training_scenarios'] = training_scenarios
+    _worker_context['branching_interval'] = branching_interval
+
+def evaluate_order(order: list[list[str]]) -> list[float]:
+    """ワーカー上で1つの優先順位を評価"""
+    return objective(
+        order,
+        **_worker_context['model'],
+        max_step=_worker_context['max_step'],
+        training_scenarios=_worker_context['training_scenarios'],
+        branching_interval=_worker_context['branching_interval'],
+        )
 
 def main():
     """タスクアロケーションの実行"""
     parser = argparse.ArgumentParser(description="Run the robotic system simulator.")
     parser.add_argument("--property_file", type=str, help="Path to the property file")
+    parser.add_argument("--worker", type=str, default=None, 
+                        help="Run as an evaluation worker connected to the broker address (e.g. tcp://host:5555)")
     args = parser.parse_args()
 
     try:
@@ -98,8 +105,23 @@ def main():
     max_step = prop['simulation']['max_step']
     training_scenarios = prop['simulation']['training_scenarios']
     varidate_scenarios = prop['simulation']['varidate_scenarios']
+    # branching_interval の指定があれば訓練シナリオを分岐させながらまとめてシミュレーションする（値は状態の保存間隔）
+    branching_interval = prop['simulation'].get('branching_interval')
 
     seed_rng(prop['task_allocation']['seed'])
+    # 個体群が小さくシナリオが多い場合はシナリオ単位で並列化する
+    scenario_workers = prop['simulation'].get('scenario_workers', 1)
+    scenario_pool = None
+    if scenario_workers > 1:
+        scenario_pool = ScenarioPool(
+            n_workers=scenario_workers, 
+            modules=modules, 
+            robots=robots, 
+            tasks=tasks, 
+            combined_tasks=combined_tasks, 
+            risk_scenarios=risk_scenarios, 
+            simulation_map=simulation_map,
+            )
     def sim_func(order: list[list[int]]) -> list[float]:
         resutls = objective(
             order, 
@@ -110,28 +132,196 @@ def main():
             risk_scenarios=risk_scenarios, 
             simulation_map=simulation_map,
             max_step=max_step, 
-            training_scenarios=training_scenarios
+            training_scenarios=training_scenarios,
+            scenario_pool=scenario_pool,
+            branching_interval=branching_interval,
             )
         return resutls
 
+    if args.worker is not None:
+        # 別ホストの評価ワーカーとして動作（モデルと認証キーは同じ設定ファイル、または MODUTASK_BROKER_AUTHKEY から読み込む）
+        run_worker(args.worker, sim_func, authkey=prop['task_allocation'].get('broker_authkey'))
+        if scenario_pool is not None:
+            scenario_pool.close()
+        return
+
     items = sorted(combined_tasks.keys())
-    encoding = MultiPermutationVariable(items=items, n_multi=len(robots))
+    if prop['task_allocation'].get('respect_dependencies', False) and prop['task_allocation'].get('priority_length') is not None:
+        raise_with_log(ValueError, "respect_dependencies and priority_length cannot be used together.")
+    if prop['task_allocation'].get('respect_dependencies', False):
+        # 各ロボットの優先順位を依存関係の位相順序に限定する（依存先が未完了のタスクで待機しない）
+        encoding = TopologicalMultiPermutationVariable(items=items, n_multi=len(robots), 
+                                                       dependencies=dependency_graph(combined_tasks, items))
+    elif prop['task_allocation'].get('priority_length') is not None:
+        # 各ロボットは先頭 priority_length 個の優先順位だけを持ち、その後は最も近い実行可能なタスクに向かう
+        encoding = TruncatedMultiPermutationVariable(items=items, n_multi=len(robots), 
+                                                     length=prop['task_allocation']['priority_length'])
+    else:
+        encoding = MultiPermutationVariable(items=items, n_multi=len(robots))
+
+    # 静的モデルを共有メモリに一度だけ配置し、ワーカーには遺伝子と目的関数値だけを送る
+    workers = prop['task_allocation'].get('workers', 1)
+    broker = prop['task_allocation'].get('broker')
+    shared_model = None
+    if broker is not None:
+        # ソケット経由で評価を分散（手元の local_workers 個に加え、--worker で起動したワーカーが接続できる）
+        # ループバック以外で待ち受けるには broker_authkey（または MODUTASK_BROKER_AUTHKEY）が必要
+        local_workers = prop['task_allocation'].get('local_workers', 0)
+        if local_workers > 0:
+            shared_model = SharedModel.create(compile_model(
+                modules=modules, 
+                robots=robots, 
+                tasks=tasks, 
+                combined_tasks=combined_tasks, 
+                risk_scenarios=risk_scenarios, 
+                simulation_map=simulation_map,
+                ))
+        evaluator = SocketEvaluator(
+            evaluate_order, 
+            address=broker, 
+            n_local_workers=local_workers, 
+            batch_size=prop['task_allocation'].get('batch_size', 8), 
+            initializer=init_worker if shared_model is not None else None, 
+            initargs=(shared_model.name, max_step, training_scenarios, branching_interval) if shared_model is not None else (),
+            authkey=prop['task_allocation'].get('broker_authkey'),
+            )
+    elif workers > 1:
+        shared_model = SharedModel.create(compile_model(
+            modules=modules, 
+            robots=robots, 
+            tasks=tasks, 
+            combined_tasks=combined_tasks, 
+            risk_scenarios=risk_scenarios, 
+            simulation_map=simulation_map,
+            ))
+        evaluator = PoolEvaluator(
+            evaluate_order, 
+            n_workers=workers, 
+            initializer=init_worker, 
+            initargs=(shared_model.name, max_step, training_scenarios, branching_interval),
+            )
+    elif prop['task_allocation'].get('prefix_sharing') is not None:
+        # 親と前半が共通する子のシミュレーションを親の途中の状態から再開する（逐次評価のみ）
+        prefix_sharing = PrefixSharingEvaluator(
+            modules=modules, 
+            robots=robots, 
+            tasks=tasks, 
+            combined_tasks=combined_tasks, 
+            risk_scenarios=risk_scenarios, 
+            simulation_map=simulation_map, 
+            training_scenarios=training_scenarios, 
+            max_step=max_step, 
+            **prop['task_allocation']['prefix_sharing'],
+            )
+        evaluator = SerialEvaluator(prefix_sharing)
+    else:
+        evaluator = SerialEvaluator(sim_func)
+
+    # telemetry（.csv / .jsonl）の指定があれば世代ごとの計測値を書き出す
+    callbacks = []
+    if isinstance(evaluator, SerialEvaluator) and isinstance(evaluator.func, PrefixSharingEvaluator):
+        callbacks.append(evaluator.func)  # 世代ごとに記録を個体群に絞る
+    if prop['task_allocation'].get('telemetry') is not None:
+        callbacks.append(TelemetryWriter(prop['task_allocation']['telemetry']))
+    # pareto_archive の指定があれば各世代の非支配解をすべて残し、最終世代の個体群の代わりに結果として使う
+    archive = ParetoArchive() if prop['task_allocation'].get('pareto_archive') else None
+    if archive is not None:
+        callbacks.append(archive)
+
+    # racing の指定があれば、シナリオの一部・短いホライズンでの評価で見込みのない遺伝子の完全な評価を省略する
+    racing = prop['task_allocation'].get('racing')
+    if racing is not None:
+        low_scenarios = training_scenarios[:racing.get('scenarios', len(training_scenarios))]
+        low_max_step = max(1, int(max_step * racing.get('horizon', 1.0)))
+        def low_func(order: list[list[int]]) -> list[float]:
+            return objective(
+                order, 
+                modules=modules, 
+                robots=robots,
+                combined_tasks=combined_tasks,
+                tasks=tasks,
+                risk_scenarios=risk_scenarios, 
+                simulation_map=simulation_map,
+                max_step=low_max_step, 
+                training_scenarios=low_scenarios,
+                scenario_pool=scenario_pool,
+                branching_interval=branching_interval,
+                )
+        evaluator = RacingEvaluator(
+            SerialEvaluator(low_func), 
+            evaluator, 
+            encoding, 
+            margin=racing.get('margin', 0.0), 
+            confidence=racing.get('confidence', 0.95), 
+            min_pairs=racing.get('min_pairs', 20),
+            max_pairs=racing.get('max_pairs', 1000),
+            )
+        callbacks.append(evaluator)
+
+    # initial_population（遺伝子の pickle・優先順位の YAML・チェックポイントのディレクトリ）があれば初期個体群に含める
+    initial_genomes = None
+    if prop['task_allocation'].get('initial_population'):
+        initial_genomes = load_initial_genomes(prop['task_allocation']['initial_population'], agent_names=list(robots))
+    # heuristic_seeding があれば、依存関係・クリティカルパス・距離から組み立てた優先順位を初期個体群の一部に使う
+    if prop['task_allocation'].get('heuristic_seeding') is not None:
+        initial_genomes = (initial_genomes or []) + heuristic_genomes(
+            combined_tasks, 
+            robots, 
+            items, 
+            population_size=prop['task_allocation']['population_size'], 
+            **prop['task_allocation']['heuristic_seeding'],
+            )
+
+    # local_search があれば interval 世代ごとに非支配個体の近傍（隣接入れ替え・待機しうるタスクを依存先の後ろへ）を評価する
+    local_search = None
+    if prop['task_allocation'].get('local_search') is not None:
+        local_search_prop = dict(prop['task_allocation']['local_search'])
+        local_search = LocalSearch(
+            moves=[adjacent_swap(local_search_prop.pop('max_position', None)), 
+                   dependency_move(dependency_graph(combined_tasks, items))], 
+            **local_search_prop,
+            )
 
     algo = NSGAII(
         func=sim_func,
         encoding=encoding,
         population_size=prop['task_allocation']['population_size'],
         generations=prop['task_allocation']['generations'],
+        evaluator=evaluator,
+        callbacks=callbacks,
+        hv_ref_point=prop['task_allocation'].get('hv_ref_point'),
+        terminations=make_terminations(prop['task_allocation'].get('termination'), ref_point=prop['task_allocation'].get('hv_ref_point')),
+        surrogate=SurrogateScreen(encoding, **prop['task_allocation']['surrogate']) 
+                  if prop['task_allocation'].get('surrogate') is not None else None,
+        initial_genomes=initial_genomes,
+        local_search=local_search,
     )
+    if archive is not None:
+        archive.extend(list(algo.population))  # 初期個体群
     start = time.time()
     algo.evolve()
     end = time.time()
     print(end - start)
+    print(f"Stopped at generation {algo.generation}: {algo.stop_reason}")
+    if racing is not None:
+        print(f"Raced out: {evaluator.raced}")
+    if local_search is not None:
+        print(f"Local search: {local_search.accepted} / {local_search.evaluations} accepted")
+    for callback in callbacks:
+        callback.close()
+    evaluator.close()
+    if shared_model is not None:
+        shared_model.close()
+    if scenario_pool is not None:
+        scenario_pool.close()
 
-    nds = get_non_dominated_individuals(algo.get_result())
+    nds = archive.individuals() if archive is not None else get_non_dominated_individuals(algo.get_result())
     for ind in nds:
         # print(f"Priority: {ind.genome}")
         print(f"Training: {ind.objectives}")
+    if prop['task_allocation'].get('save_genomes') is not None:
+        # 非支配解の遺伝子を次回の initial_population 用に保存
+        save_genomes([ind.genome for ind in nds], prop['task_allocation']['save_genomes'])
 
     # print("NonD solutions:")
     # for ind in nds:
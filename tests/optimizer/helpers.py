@@ -0,0 +1,103 @@
+"""tests/optimizer の各テストで共通に使うダミー目的関数とモック"""
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from modutask.core.robot.performance import PerformanceAttributes
+from modutask.core.module.module import Module, ModuleState, ModuleType
+from modutask.core.robot.robot import Robot, RobotState, RobotType
+from modutask.core.risk_scenario import ExponentialFailure
+from modutask.core.simulation_map import SimulationMap
+from modutask.core.task.charge import Charge
+from modutask.core.task.manufacture import Manufacture
+from modutask.core.task.transport import Transport
+from modutask.optimizer.my_moo.core.encoding.configuration import ConfigurationVariable
+
+def permutation_displacement(perm: list[int]) -> list[float]:
+    """位置のずれの合計と先頭の要素を返すダミー目的関数（PermutationVariable 用）"""
+    return [float(sum(abs(item - i) for i, item in enumerate(perm))), float(perm[0])]
+
+def displacement_and_head(order: list[list[int]]) -> list[float]:
+    """permutation_displacement の MultiPermutationVariable 用（1台目の順序だけを見る）"""
+    return permutation_displacement(order[0])
+
+def displacement(order: list[list[int]]) -> list[float]:
+    """位置のずれの合計と逆順度合いを返すダミー目的関数"""
+    perm = order[0]
+    f1 = sum(abs(item - i) for i, item in enumerate(perm))
+    f2 = sum(abs(item - (len(perm) - 1 - i)) for i, item in enumerate(perm))
+    return [float(f1), float(f2 + perm[0])]
+
+def make_task(name: str, coordinate: tuple[float, float], workload: float = 1.0, dependencies=(),
+              completed: float = 0.0) -> Manufacture:
+    """製造能力1を必要とする製造タスク"""
+    task = Manufacture(name=name, coordinate=coordinate, total_workload=workload, completed_workload=completed,
+                       required_performance={PerformanceAttributes.MANUFACTURE: 1.0})
+    task.initialize_task_dependency(list(dependencies))
+    return task
+
+def make_robot(name: str, coordinate: tuple[float, float], mobility: float = 1.0, manufacture: float = 1.0) -> Robot:
+    """稼働中でバッテリーの減らない（充電に向かわない）ロボットのモック"""
+    robot = MagicMock(spec=Robot)
+    robot.name = name
+    robot.coordinate = coordinate
+    robot.state = RobotState.ACTIVE
+    robot.is_battery_sufficient.return_value = True
+    robot.total_battery.return_value = 100.0
+    robot.component_mounted = []
+    robot.type = SimpleNamespace(performance={PerformanceAttributes.MOBILITY: mobility,
+                                              PerformanceAttributes.MANUFACTURE: manufacture},
+                                 power_consumption=1.0, recharge_trigger=0.0)
+    return robot
+
+def make_configuration_variable(n_bodies: int = 4) -> ConfigurationVariable:
+    """車体1つとバッテリー1つ（Light）または2つ（Heavy）で組むロボットの構成エンコーディング（車体は2か所に分かれて置かれる）"""
+    body = ModuleType(name='Body', max_battery=0.0)
+    battery = ModuleType(name='Battery', max_battery=10.0)
+    modules = {}
+    for i in range(n_bodies):
+        coordinate = (0.0, 0.0) if i % 2 == 0 else (5.0, 5.0)
+        modules[f'body_{i}'] = Module(body, f'body_{i}', coordinate, 0.0, 0.0, ModuleState.ACTIVE)
+        for j in range(2):
+            name = f'battery_{i}_{j}'
+            modules[name] = Module(battery, name, coordinate, 10.0, 0.0, ModuleState.ACTIVE)
+    performance = {PerformanceAttributes.TRANSPORT: 1.0, PerformanceAttributes.MOBILITY: 1.0,
+                   PerformanceAttributes.MANUFACTURE: 1.0}
+    robot_types = {
+        'Light': RobotType('Light', {body: 1, battery: 1}, performance, power_consumption=1.0, recharge_trigger=1.0),
+        'Heavy': RobotType('Heavy', {body: 1, battery: 2}, performance, power_consumption=2.0, recharge_trigger=1.0),
+    }
+    return ConfigurationVariable(modules=modules, robot_types=robot_types)
+
+def make_model(failure_rate: float = 0.003, n_scenarios: int = 4) -> dict:
+    """
+    シミュレーション用の小さなモデル（simulate_scenario などにそのまま渡せる辞書）
+    車体とバッテリー2つで組んだ3台のロボット、依存関係のある製造タスク4つと運搬タスク1つ、充電ステーション1つ
+    """
+    body = ModuleType(name='Body', max_battery=0.0)
+    battery = ModuleType(name='Battery', max_battery=20.0)
+    robot_type = RobotType('Worker', {body: 1, battery: 2},
+                           {PerformanceAttributes.TRANSPORT: 1.0, PerformanceAttributes.MANUFACTURE: 1.0,
+                            PerformanceAttributes.MOBILITY: 1.0},
+                           power_consumption=1.0, recharge_trigger=4.0)
+    modules = {}
+    robots = {}
+    for i, coordinate in enumerate([(0.0, 0.0), (4.0, 0.0), (0.0, 4.0)]):
+        component = [Module(body, f'body_{i}', coordinate, 0.0, 0.0, ModuleState.ACTIVE)]
+        component += [Module(battery, f'battery_{i}_{j}', coordinate, 20.0, 0.0, ModuleState.ACTIVE) for j in range(2)]
+        modules.update({module.name: module for module in component})
+        robots[f'r{i}'] = Robot(robot_type=robot_type, name=f'r{i}', coordinate=coordinate, component=component)
+    manufacture = {PerformanceAttributes.MANUFACTURE: 1.0}
+    tasks = {
+        'm0': Manufacture('m0', (3.0, 3.0), 6.0, 0.0, manufacture),
+        'm1': Manufacture('m1', (-3.0, 2.0), 8.0, 0.0, manufacture),
+        'm2': Manufacture('m2', (6.0, -2.0), 5.0, 0.0, manufacture),
+        'm3': Manufacture('m3', (-4.0, -4.0), 7.0, 0.0, manufacture),
+        't0': Transport('t0', (1.0, 1.0), {PerformanceAttributes.TRANSPORT: 1.0}, (1.0, 1.0), (5.0, 4.0), 1.0, 5.0, 0.0),
+    }
+    dependencies = {'m2': ['m0'], 'm3': ['m1'], 't0': ['m0']}
+    for name, task in tasks.items():
+        task.initialize_task_dependency([tasks[dep] for dep in dependencies.get(name, [])])
+    risk_scenarios = {f's{i}': ExponentialFailure(name=f's{i}', failure_rate=failure_rate, seed=100 + i)
+                      for i in range(n_scenarios)}
+    simulation_map = SimulationMap({'station': Charge('station', (0.0, 0.0), charging_speed=5.0)})
+    return dict(modules=modules, robots=robots, tasks=tasks, combined_tasks=tasks, risk_scenarios=risk_scenarios,
+                simulation_map=simulation_map)
@@ -0,0 +1,83 @@
+import tempfile
+import unittest
+import numpy as np
+from modutask.optimizer.my_moo import *
+from helpers import displacement_and_head
+
+def brute_force_mask(F: np.ndarray) -> list[bool]:
+    return [not any(dominates(F[j], F[i]) for j in range(len(F)) if j != i) for i in range(len(F))]
+
+class TestNonDominatedMask(unittest.TestCase):
+    def test_matches_pairwise_scan(self):
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            F = rng.integers(0, 5, size=(int(rng.integers(1, 40)), 3)).astype(float)
+            self.assertEqual(list(non_dominated_mask(F)), brute_force_mask(F))
+
+    def test_large_front_and_empty(self):
+        # すべて非支配（非支配解が増えてもバッファに書き込むだけ）
+        x = np.arange(2000, dtype=float)
+        F = np.stack([x, x[::-1]], axis=1)[np.random.default_rng(2).permutation(2000)]
+        self.assertTrue(non_dominated_mask(F).all())
+        self.assertEqual(len(non_dominated_mask(np.empty((0, 2)))), 0)
+
+class TestParetoArchive(unittest.TestCase):
+    def setUp(self):
+        self.encoding = PermutationVariable(items=[0, 1])
+
+    def make(self, objectives, violation=0.0):
+        ind = Individual(self.encoding, genome=[0, 1])
+        ind.set_objectives(ConstrainedObjectives(objectives, constraints=[violation]))
+        return ind
+
+    def test_keeps_only_non_dominated(self):
+        archive = ParetoArchive(max_leaf_size=2)
+        rng = np.random.default_rng(1)
+        F = rng.integers(0, 8, size=(200, 3)).astype(float)
+        archive.extend([self.make(list(row)) for row in F])
+        expected = sorted(set(map(tuple, F[brute_force_mask(F)])))
+        self.assertEqual(sorted(tuple(ind.objectives) for ind in archive), expected)
+        self.assertEqual(len(archive), len(expected))
+        self.assertTrue(archive.covers(expected[0]))
+
+    def test_rejects_covered_and_infeasible(self):
+        archive = ParetoArchive()
+        self.assertTrue(archive.add(self.make([1.0, 2.0])))
+        self.assertFalse(archive.add(self.make([1.0, 2.0])))
+        self.assertFalse(archive.add(self.make([0.0, 0.0], violation=1.0)))
+        self.assertTrue(archive.add(self.make([0.0, 1.0])))
+        self.assertEqual([ind.objectives for ind in archive], [[0.0, 1.0]])
+
+    def test_collects_every_generation(self):
+        archive = ParetoArchive()
+        algo = NSGAII(displacement_and_head, MultiPermutationVariable(items=list(range(6)), n_multi=1), population_size=6,
+                      generations=3, rng_service=RNGService(0), callbacks=[archive])
+        algo.evolve()
+        front = [tuple(ind.objectives) for ind in get_non_dominated_individuals(algo.get_result())]
+        # 最終世代の非支配解はアーカイブの解に弱支配される
+        self.assertTrue(all(archive.covers(objectives) for objectives in front))
+
+    def test_restored_from_checkpoint(self):
+        encoding = MultiPermutationVariable(items=list(range(6)), n_multi=1)
+        def make(generations, tmpdir, resume_from=None):
+            archive = ParetoArchive()
+            algo = NSGAII(displacement_and_head, encoding, population_size=6, generations=generations,
+                          rng_service=RNGService(4), callbacks=[archive], checkpointer=Checkpointer(tmpdir, interval=3),
+                          resume_from=resume_from)
+            if resume_from is None:
+                archive.extend(list(algo.population))  # 初期個体群
+            return algo, archive
+        def objectives(archive):
+            return sorted(tuple(ind.objectives) for ind in archive)
+        with tempfile.TemporaryDirectory() as full_dir, tempfile.TemporaryDirectory() as tmpdir:
+            algo, full = make(6, full_dir)
+            algo.evolve()
+            algo, interrupted = make(3, tmpdir)
+            algo.evolve()
+            algo, resumed = make(6, tmpdir, resume_from=tmpdir)
+            self.assertEqual(objectives(resumed), objectives(interrupted))
+            algo.evolve()
+        self.assertEqual(objectives(resumed), objectives(full))
+
+if __name__ == '__main__':
+    unittest.main()
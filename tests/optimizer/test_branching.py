@@ -0,0 +1,74 @@
+import unittest
+from types import SimpleNamespace
+from modutask.core import ExponentialFailure
+from modutask.simulator.evaluation import BranchingScenario, simulate_branching_scenarios, simulate_scenario
+from helpers import make_model
+
+def make_member(name: str, failure_rate: float, seed: int = 0) -> list[ExponentialFailure]:
+    return [ExponentialFailure(name=name, failure_rate=failure_rate, seed=seed)]
+
+class TestBranchingScenario(unittest.TestCase):
+    def setUp(self):
+        self.module = SimpleNamespace(operating_time=10.0)
+
+    def test_agreement_keeps_trunk(self):
+        branching = BranchingScenario([make_member('a', 0.0), make_member('b', 0.0)])
+        branching.initialize()
+        self.assertFalse(branching.malfunction_module(self.module))
+        self.assertEqual(branching.active, [0, 1])
+        self.assertEqual(branching.splits, [])
+
+    def test_all_fail(self):
+        branching = BranchingScenario([make_member('a', 100.0), make_member('b', 100.0)])
+        branching.initialize()
+        self.assertTrue(branching.malfunction_module(self.module))
+        self.assertEqual(branching.splits, [])
+
+    def test_split_failed_members(self):
+        branching = BranchingScenario([make_member('a', 0.0), make_member('b', 100.0), make_member('c', 0.0)])
+        branching.initialize()
+        self.assertFalse(branching.malfunction_module(self.module))
+        self.assertEqual(branching.active, [0, 2])
+        self.assertEqual(branching.splits, [[1]])
+
+        branching.restrict([1])
+        self.assertTrue(branching.malfunction_module(self.module))
+        self.assertEqual(branching.splits, [])
+
+    def test_member_draws_match_independent_scenario(self):
+        # 分岐前の判定で各訓練シナリオの乱数は単独で実行した場合と同じだけ進む
+        branching = BranchingScenario([make_member('a', 0.0, seed=1), make_member('b', 0.0, seed=2)])
+        branching.initialize()
+        single = ExponentialFailure(name='b', failure_rate=0.0, seed=2)
+        single.initialize()
+        for _ in range(5):
+            branching.malfunction_module(self.module)
+            single.malfunction_module(self.module)
+        self.assertEqual(branching.members[1][0].rng.random(), single.rng.random())
+
+class TestSimulateBranchingScenarios(unittest.TestCase):
+    def setUp(self):
+        self.task_priorities = {'r0': ['m0', 'm2', 't0', 'm1', 'm3'], 'r1': ['m1', 'm3', 'm0', 'm2', 't0'],
+                                'r2': ['t0', 'm0', 'm2', 'm3', 'm1']}
+        self.scenarios = [['s0'], ['s1'], ['s2'], ['s3'], ['s0', 's1'], []]
+
+    def check(self, model: dict, max_step: int):
+        expected = [simulate_scenario(self.task_priorities, names, max_step, **model) for names in self.scenarios]
+        for snapshot_interval in [1, 3, 5, 10, 100]:
+            with self.subTest(snapshot_interval=snapshot_interval):
+                results = simulate_branching_scenarios(self.task_priorities, self.scenarios, max_step,
+                                                       snapshot_interval=snapshot_interval, **model)
+                self.assertEqual(results, expected)
+
+    def test_matches_independent_runs(self):
+        self.check(make_model(), 60)
+
+    def test_matches_independent_runs_with_frequent_failures(self):
+        model = make_model(failure_rate=0.02)
+        self.check(model, 40)
+        # 訓練シナリオごとに結果が分かれる（分岐を実際に通っている）
+        self.assertGreater(len({tuple(simulate_scenario(self.task_priorities, names, 40, **model))
+                                for names in self.scenarios}), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import threading
+import unittest
+from multiprocessing.connection import AuthenticationError, Client
+from unittest import mock
+from modutask.optimizer.my_moo import *
+from modutask.optimizer.my_moo.broker import AUTHKEY_ENV, parse_address
+from helpers import permutation_displacement
+
+def square(genome: int) -> list[float]:
+    return [float(genome * genome)]
+
+def crash_once(genome: tuple[str, int]) -> list[float]:
+    """初回だけワーカープロセスごと落ちるダミー目的関数"""
+    path, value = genome
+    if not os.path.exists(path):
+        open(path, 'w').close()
+        os._exit(1)
+    return [float(value)]
+
+class TestSocketEvaluator(unittest.TestCase):
+    def test_evaluate_keeps_order(self):
+        with SocketEvaluator(square, n_local_workers=2, batch_size=3) as evaluator:
+            self.assertEqual(evaluator.evaluate(list(range(10))), [[float(i * i)] for i in range(10)])
+            self.assertEqual(evaluator.submit(4).result(timeout=10), [16.0])
+
+    def test_unix_socket(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            address = f"unix://{os.path.join(tmpdir, 'broker.sock')}"
+            with SocketEvaluator(square, address=address, n_local_workers=1) as evaluator:
+                self.assertEqual(evaluator.evaluate([1, 2, 3]), [[1.0], [4.0], [9.0]])
+
+    def test_lost_task_is_retried(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'crashed')
+            with SocketEvaluator(crash_once, n_local_workers=2, batch_size=1) as evaluator:
+                self.assertEqual(evaluator.evaluate([(path, 1), (path, 2), (path, 3)]), [[1.0], [2.0], [3.0]])
+                self.assertGreaterEqual(evaluator.broker.lost_tasks, 1)
+
+    def test_rejects_unauthenticated_peers(self):
+        with SocketEvaluator(square, n_local_workers=1, authkey='secret') as evaluator:
+            family, target = parse_address(evaluator.address)
+            with self.assertRaises(AuthenticationError):
+                Client(target, family=family, authkey=b'wrong')
+            with self.assertRaises(AuthenticationError):
+                run_worker(evaluator.address, square, authkey='wrong', connect_timeout=1.0)
+            # 認証に失敗した接続があっても評価は続けられる
+            self.assertEqual(evaluator.evaluate([1, 2, 3]), [[1.0], [4.0], [9.0]])
+            self.assertEqual(evaluator.broker.n_workers, 1)
+
+    def test_remote_worker_with_shared_authkey(self):
+        with mock.patch.dict(os.environ, {AUTHKEY_ENV: 'shared'}):
+            with SocketEvaluator(square, n_local_workers=0) as evaluator:
+                worker = threading.Thread(target=run_worker, args=(evaluator.address, square), daemon=True)
+                worker.start()
+                self.assertEqual(evaluator.evaluate([2, 5]), [[4.0], [25.0]])
+            worker.join(timeout=10)
+            self.assertFalse(worker.is_alive())
+
+    def test_non_loopback_requires_authkey(self):
+        with mock.patch.dict(os.environ, {AUTHKEY_ENV: ''}):
+            with self.assertRaises(ValueError):
+                EvaluationBroker('tcp://0.0.0.0:0')
+            with self.assertRaises(ValueError):
+                run_worker('tcp://127.0.0.1:1', square)
+            broker = EvaluationBroker('tcp://0.0.0.0:0', authkey='secret')
+            broker.close()
+
+    def test_nsgaii_with_socket_evaluator(self):
+        encoding = PermutationVariable(items=list(range(6)))
+        def run(evaluator):
+            algo = NSGAII(func=permutation_displacement, encoding=encoding, population_size=6, generations=3,
+                          evaluator=evaluator, rng_service=RNGService(7))
+            algo.evolve()
+            return [ind.objectives for ind in algo.get_result()]
+        with SocketEvaluator(permutation_displacement, n_local_workers=2) as evaluator:
+            self.assertEqual(run(evaluator), run(SerialEvaluator(permutation_displacement)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+from modutask.optimizer.my_moo import *
+from helpers import displacement, make_configuration_variable
+
+def robot_counts(robots) -> list[float]:
+    """ロボット数（最大化）と Heavy の台数"""
+    return [-float(len(robots)), float(sum(robot.type.name == 'Heavy' for robot in robots))]
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.encoding = MultiPermutationVariable(items=list(range(8)), n_multi=1)
+
+    def make(self, algorithm, generations, checkpointer=None):
+        evaluator = CachedEvaluator(SerialEvaluator(displacement), self.encoding)
+        return algorithm(displacement, self.encoding, population_size=8, generations=generations,
+                         evaluator=evaluator, rng_service=RNGService(21), checkpointer=checkpointer)
+
+    def check_resume(self, algorithm):
+        full = self.make(algorithm, 10)
+        full.evolve()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            interrupted = self.make(algorithm, 6, Checkpointer(tmpdir, interval=3))
+            interrupted.evolve()
+            state = load_checkpoint(tmpdir)
+            self.assertEqual(state['generation'], 6)
+            self.assertEqual(len(state['cache']), len(interrupted.evaluator.cache))
+
+            resumed = self.make(algorithm, 10, Checkpointer(tmpdir, interval=3))
+            resumed.evolve(resume_from=tmpdir)
+            self.assertEqual(resumed.generation, 10)
+            self.assertEqual([ind.genome for ind in resumed.get_result()], [ind.genome for ind in full.get_result()])
+            self.assertEqual([ind.objectives for ind in resumed.get_result()],
+                             [ind.objectives for ind in full.get_result()])
+            self.assertEqual(len(load_checkpoint(tmpdir)['cache']), len(resumed.evaluator.cache))
+
+    def test_resume_nsgaii(self):
+        self.check_resume(NSGAII)
+
+    def test_resume_ibea(self):
+        self.check_resume(IBEAHV)
+
+    def test_resume_in_constructor_skips_initial_population(self):
+        full = self.make(NSGAII, 6)
+        full.evolve()
+        calls = []
+        def counted(order):
+            calls.append(order)
+            return displacement(order)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.make(NSGAII, 3, Checkpointer(tmpdir, interval=3)).evolve()
+            resumed = NSGAII(counted, self.encoding, population_size=8, generations=6,
+                             evaluator=CachedEvaluator(SerialEvaluator(counted), self.encoding),
+                             rng_service=RNGService(21), checkpointer=Checkpointer(tmpdir, interval=3), resume_from=tmpdir)
+            self.assertEqual(calls, [])
+            self.assertEqual(resumed.generation, 3)
+            resumed.evolve()
+        self.assertEqual([ind.genome for ind in resumed.get_result()], [ind.genome for ind in full.get_result()])
+
+    def test_resume_configuration_genomes(self):
+        encoding = make_configuration_variable()
+        def make(generations, checkpointer=None, resume_from=None):
+            return NSGAII(robot_counts, encoding, population_size=6, generations=generations,
+                          evaluator=CachedEvaluator(SerialEvaluator(robot_counts), encoding),
+                          rng_service=RNGService(5), checkpointer=checkpointer, resume_from=resume_from)
+        full = make(4)
+        full.evolve()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            make(2, Checkpointer(tmpdir, interval=2)).evolve()
+            # Robot の遺伝子も pickle で保存・復元できる
+            self.assertEqual(len(load_checkpoint(tmpdir)['genomes']), 6)
+            resumed = make(4, Checkpointer(tmpdir, interval=2), resume_from=tmpdir)
+            resumed.evolve()
+        self.assertEqual([encoding.key(ind.genome) for ind in resumed.get_result()],
+                         [encoding.key(ind.genome) for ind in full.get_result()])
+        self.assertEqual([ind.objectives for ind in resumed.get_result()], [ind.objectives for ind in full.get_result()])
+
+    def test_resume_into_another_directory(self):
+        with tempfile.TemporaryDirectory() as src, tempfile.TemporaryDirectory() as dst:
+            self.make(NSGAII, 3, Checkpointer(src, interval=3)).evolve()
+            resumed = self.make(NSGAII, 6, Checkpointer(dst, interval=3))
+            resumed.evolve(resume_from=src)
+            self.assertEqual(len(load_checkpoint(dst)['cache']), len(resumed.evaluator.cache))
+
+    def test_interrupted_cache_append_is_ignored(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            algo = self.make(NSGAII, 3, Checkpointer(tmpdir, interval=3))
+            algo.evolve()
+            with open(os.path.join(tmpdir, 'cache.pkl'), 'ab') as f:
+                f.write(b'\x80\x05broken')  # 追記中に中断された状態
+            self.assertEqual(len(load_checkpoint(tmpdir)['cache']), len(algo.evaluator.cache))
+
+if __name__ == '__main__':
+    unittest.main()
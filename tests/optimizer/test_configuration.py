@@ -0,0 +1,58 @@
+import unittest
+from modutask.core import Module, ModuleState, Robot, RobotType
+from modutask.optimizer.my_moo import seed_rng
+from helpers import make_configuration_variable
+
+class TestConfigurationRepair(unittest.TestCase):
+    def setUp(self):
+        seed_rng(0)
+        self.encoding = make_configuration_variable()
+
+    def make(self, type_name: str, module_names: list[str], name: str = 'dummy') -> Robot:
+        modules = [self.encoding.modules[module_name] for module_name in module_names]
+        return Robot(robot_type=self.encoding.robot_types[type_name], name=name, coordinate=modules[0].coordinate,
+                     component=modules)
+
+    def test_valid_genome_is_rebuilt_on_current_definitions(self):
+        genome = self.encoding.sample()
+        current = make_configuration_variable()  # 同じ名前の別のモジュール・種類（読み込み直した場合など）
+        repaired = current.repair(genome)
+        self.assertEqual(current.key(repaired), self.encoding.key(genome))
+        for robot in repaired:
+            self.assertIs(robot.type, current.robot_types[robot.type.name])
+            for module in robot.component_required:
+                self.assertIs(module, current.modules[module.name])
+
+    def test_drops_invalid_robots(self):
+        broken = self.encoding.modules['battery_3_0']
+        self.encoding.modules['battery_3_0'] = Module(broken.type, broken.name, broken.coordinate, 10.0, 0.0,
+                                                      ModuleState.ERROR)
+        genome = [
+            self.make('Light', ['body_0', 'battery_0_0'], name='kept'),
+            self.make('Light', ['body_2', 'battery_0_0']),  # 他のロボットとモジュールが重複
+            self.make('Light', ['body_3', 'battery_3_0']),  # 故障したモジュール
+            self.make('Light', ['body_2', 'battery_2_0'], name='also_kept'),
+        ]
+        repaired = self.encoding.repair(genome)
+        self.assertEqual([robot.name for robot in repaired], ['kept', 'also_kept'])
+        self.assertTrue(self.encoding.validate(repaired))
+
+    def test_drops_robots_that_no_longer_fit_definitions(self):
+        current = make_configuration_variable(n_bodies=2)  # body_2 以降のモジュールはない
+        light = self.encoding.robot_types['Light']
+        unknown = RobotType('Unknown', dict(light.required_modules), light.performance, power_consumption=1.0,
+                            recharge_trigger=1.0)
+        # 必要なバッテリー数が変わった種類
+        current.robot_types['Heavy'] = RobotType('Heavy', dict(light.required_modules), light.performance,
+                                                 power_consumption=2.0, recharge_trigger=1.0)
+        genome = [
+            self.make('Light', ['body_0', 'battery_0_0'], name='kept'),
+            self.make('Light', ['body_2', 'battery_2_0']),
+            Robot(robot_type=unknown, name='unknown', coordinate=(5.0, 5.0),
+                  component=[self.encoding.modules['body_1'], self.encoding.modules['battery_1_0']]),
+            self.make('Heavy', ['body_1', 'battery_1_0', 'battery_1_1']),
+        ]
+        self.assertEqual([robot.name for robot in current.repair(genome)], ['kept'])
+
+if __name__ == '__main__':
+    unittest.main()
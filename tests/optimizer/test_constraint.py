@@ -0,0 +1,60 @@
+import pickle
+import unittest
+from modutask.optimizer.my_moo import *
+from modutask.optimizer.my_moo.algorithms.ibea import assign_fitness
+from modutask.optimizer.my_moo.algorithms.nsgaii import fast_non_dominated_sort
+
+def make_individual(encoding, genome, objectives, violation=0.0):
+    ind = Individual(encoding, genome=genome)
+    ind.set_objectives(ConstrainedObjectives(objectives, constraints=[violation]))
+    return ind
+
+class TestConstrainedDominance(unittest.TestCase):
+    def setUp(self):
+        self.encoding = PermutationVariable(items=[0, 1, 2])
+        self.feasible = make_individual(self.encoding, [0, 1, 2], [5.0, 5.0])
+        self.better = make_individual(self.encoding, [0, 2, 1], [1.0, 1.0])
+        self.slightly = make_individual(self.encoding, [1, 0, 2], [0.0, 0.0], violation=1.0)
+        self.badly = make_individual(self.encoding, [2, 1, 0], [0.0, 0.0], violation=3.0)
+
+    def test_constrained_dominates(self):
+        self.assertTrue(constrained_dominates(self.feasible, self.slightly))
+        self.assertTrue(constrained_dominates(self.slightly, self.badly))
+        self.assertFalse(constrained_dominates(self.slightly, self.feasible))
+        self.assertTrue(constrained_dominates(self.better, self.feasible))
+
+    def test_sort_and_filter(self):
+        individuals = [self.badly, self.slightly, self.feasible, self.better]
+        fronts = fast_non_dominated_sort(individuals)
+        self.assertEqual(fronts, [[self.better], [self.feasible], [self.slightly], [self.badly]])
+        self.assertEqual(get_non_dominated_individuals(individuals), [self.better])
+        self.assertEqual(get_non_dominated_individuals([self.badly, self.slightly]), [self.slightly])
+
+    def test_ibea_fitness_ranks_infeasible_last(self):
+        population = [self.badly, self.slightly, self.feasible, self.better]
+        assign_fitness(population, kappa=0.05)
+        fitness = [ind.fitness['ibea_fit'] for ind in population]
+        self.assertLess(max(fitness[2:]), fitness[1])
+        self.assertLess(fitness[1], fitness[0])
+
+class TestConstrainedObjective(unittest.TestCase):
+    def test_skips_expensive_objective(self):
+        calls = []
+        def func(genome):
+            calls.append(genome)
+            return [float(genome[0])]
+        objective = ConstrainedObjective(func, lambda genome: [genome[0] - 1.0], n_objectives=1)
+        encoding = PermutationVariable(items=[0, 1, 2])
+        evaluator = CachedEvaluator(SerialEvaluator(objective), encoding)
+        results = evaluator.evaluate([[0, 1, 2], [2, 1, 0]])
+        self.assertEqual(calls, [[0, 1, 2]])
+        self.assertEqual(objective.skips, 1)
+        self.assertEqual([constraint_violation(values) for values in results], [0.0, 1.0])
+        # キャッシュ・チェックポイントを通しても違反量が残る
+        ind = Individual(encoding, genome=[2, 1, 0])
+        ind.set_objectives(pickle.loads(pickle.dumps(evaluator.evaluate([[2, 1, 0]])[0])))
+        self.assertFalse(ind.feasible)
+        self.assertEqual(ind.copy().constraint_violation, 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from modutask.optimizer.my_moo import seed_rng
+from optimize_configuration import IncrementalObjective, objective
+from helpers import make_configuration_variable
+
+class TestIncrementalObjective(unittest.TestCase):
+    def setUp(self):
+        seed_rng(3)
+        self.encoding = make_configuration_variable(n_bodies=6)
+        for i, module in enumerate(self.encoding.modules.values()):
+            module.operating_time = float(i)  # モジュールごとに寄与が変わるようにする
+
+    def check(self, func: IncrementalObjective, genome):
+        result = func(genome)
+        expected = objective(self.encoding.clone_robots(genome))
+        self.assertEqual(list(result), list(expected))
+        self.assertEqual(result.constraints, expected.constraints)
+
+    def test_repeated_configuration_hits_cache(self):
+        func = IncrementalObjective(self.encoding)
+        genome = self.encoding.sample()
+        self.check(func, genome)
+        misses = func.misses
+        self.check(func, self.encoding.clone_robots(genome))
+        self.assertEqual(func.misses, misses)
+        self.assertEqual(func.hits, len(genome))
+
+    def test_matches_objective_for_mutated_configurations(self):
+        func = IncrementalObjective(self.encoding)
+        parents = [self.encoding.sample() for _ in range(4)]
+        for genome in parents:
+            self.check(func, genome)
+        for _ in range(30):
+            child = self.encoding.mutate(self.encoding.crossover(parents[0], parents[1]))
+            self.check(func, child)
+            parents = parents[1:] + [child]
+        self.assertGreater(func.hits, 0)
+
+    def test_max_cache_size_evicts(self):
+        func = IncrementalObjective(self.encoding, max_cache_size=2)
+        for _ in range(10):
+            genome = self.encoding.sample()
+            self.check(func, genome)
+            self.assertLessEqual(len(func.contributions), 2)
+        # 追い出された後も同じ構成を正しく評価し直す
+        self.check(func, genome)
+
+    def test_empty_configuration(self):
+        func = IncrementalObjective(self.encoding)
+        self.check(func, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+from modutask.optimizer.my_moo import *
+from helpers import displacement_and_head
+
+class TestInitialGenomes(unittest.TestCase):
+    def setUp(self):
+        self.encoding = MultiPermutationVariable(items=list(range(6)), n_multi=1)
+
+    def test_initial_genomes_come_first(self):
+        seeds = [[[5, 4, 3, 2, 1, 0]], [[0, 1, 2, 3, 4, 5]]]
+        population = Population.initialize(5, self.encoding, RNGService(1), initial_genomes=seeds)
+        self.assertEqual(len(population), 5)
+        self.assertEqual([ind.genome for ind in population][:2], seeds)
+
+    def test_random_slots_unchanged(self):
+        # 残りのスロットはランダム生成時と同じ乱数ストリームを使う
+        plain = Population.initialize(4, self.encoding, RNGService(1))
+        seeded = Population.initialize(4, self.encoding, RNGService(1), initial_genomes=[[[0, 1, 2, 3, 4, 5]]])
+        self.assertEqual([ind.genome for ind in seeded][1:], [ind.genome for ind in plain][1:])
+
+    def test_extra_genomes_are_dropped(self):
+        seeds = [[[0, 1, 2, 3, 4, 5]]] * 4
+        population = Population.initialize(2, self.encoding, RNGService(1), initial_genomes=seeds)
+        self.assertEqual(len(population), 2)
+
+    def test_warm_start_keeps_optimum(self):
+        algo = NSGAII(displacement_and_head, self.encoding, population_size=6, generations=3, rng_service=RNGService(2),
+                      initial_genomes=[[[0, 1, 2, 3, 4, 5]]])
+        algo.evolve()
+        self.assertIn([0.0, 0.0], [ind.objectives for ind in algo.get_result()])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+from modutask.optimizer.my_moo import *
+from modutask.optimizer.my_moo.algorithms.island import make_topology
+from helpers import displacement
+
+ENCODING = MultiPermutationVariable(items=list(range(8)), n_multi=1)
+
+def make_nsgaii(rng_service: RNGService) -> NSGAII:
+    return NSGAII(func=displacement, encoding=ENCODING, population_size=8, generations=6, rng_service=rng_service)
+
+class TestIslandModel(unittest.TestCase):
+    def test_topology(self):
+        self.assertEqual(make_topology('ring', 3), {0: [1], 1: [2], 2: [0]})
+        self.assertEqual(make_topology('fully_connected', 3), {0: [1, 2], 1: [0, 2], 2: [0, 1]})
+        with self.assertRaises(ValueError):
+            make_topology('star', 3)
+
+    def test_evolve_is_reproducible(self):
+        results = []
+        for _ in range(2):
+            model = IslandModel(make_nsgaii, ENCODING, n_islands=2, generations=6, migration_interval=2,
+                                n_migrants=2, rng_service=RNGService(11))
+            model.evolve()
+            results.append(sorted(tuple(ind.objectives) for ind in model.get_result()))
+        self.assertTrue(results[0])
+        self.assertEqual(results[0], results[1])
+
+if __name__ == '__main__':
+    unittest.main()
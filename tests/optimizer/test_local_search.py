@@ -0,0 +1,53 @@
+import unittest
+from modutask.optimizer.my_moo import *
+from helpers import displacement_and_head
+
+class TestMoves(unittest.TestCase):
+    def test_adjacent_swap_within_prefix(self):
+        move = adjacent_swap(max_position=2)
+        with use_rng(RNGService(0).stream(0)):
+            self.assertEqual(move([[0, 1, 2, 3]]), [[1, 0, 2, 3]])
+
+    def test_dependency_move(self):
+        move = dependency_move({'c': ['a', 'b']})
+        with use_rng(RNGService(0).stream(0)):
+            self.assertEqual(move([['c', 'a', 'd', 'b', 'e']]), [['a', 'd', 'b', 'c', 'e']])
+            self.assertEqual(move([['a', 'b', 'c']]), [['a', 'b', 'c']])
+
+class TestLocalSearch(unittest.TestCase):
+    def setUp(self):
+        self.encoding = MultiPermutationVariable(items=list(range(6)), n_multi=1)
+
+    def run_algorithm(self, seed: int) -> NSGAII:
+        local_search = LocalSearch([adjacent_swap()], interval=2, budget=3)
+        algo = NSGAII(displacement_and_head, self.encoding, population_size=6, generations=4, rng_service=RNGService(seed),
+                      local_search=local_search)
+        algo.evolve()
+        return algo
+
+    def test_budget(self):
+        algo = self.run_algorithm(0)
+        # 2, 4 世代目に最大3個ずつ
+        self.assertLessEqual(algo.local_search.evaluations, 6)
+        self.assertEqual(algo.evaluations, 6 + 4 * 6 + algo.local_search.evaluations)
+
+    def test_reproducible(self):
+        genomes = [ind.genome for ind in self.run_algorithm(1).population]
+        self.assertEqual(genomes, [ind.genome for ind in self.run_algorithm(1).population])
+
+    def test_neighbors_keep_dependency_order(self):
+        dependencies = {2: [0], 3: [2, 1], 5: [4]}
+        encoding = TopologicalMultiPermutationVariable(items=list(range(6)), n_multi=2, dependencies=dependencies)
+        local_search = LocalSearch([adjacent_swap()], interval=1, budget=50)
+        algo = NSGAII(displacement_and_head, encoding, population_size=6, generations=1,
+                      rng_service=RNGService(2))
+        neighbors = local_search.neighbors(algo)
+        self.assertGreater(len(neighbors), 0)
+        self.assertTrue(all(encoding.validate(genome) for _, genome in neighbors))
+
+    def test_rejects_empty_moves(self):
+        with self.assertRaises(ValueError):
+            LocalSearch([])
+
+if __name__ == '__main__':
+    unittest.main()
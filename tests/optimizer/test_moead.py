@@ -0,0 +1,60 @@
+import unittest
+import numpy as np
+from modutask.optimizer.my_moo import *
+from modutask.optimizer.my_moo.algorithms.moead import pbi, tchebycheff, uniform_weights
+from helpers import displacement
+
+class TestDecomposition(unittest.TestCase):
+    def test_uniform_weights(self):
+        weights = uniform_weights(7, 3)
+        self.assertEqual(weights.shape, (7, 3))
+        np.testing.assert_allclose(weights.sum(axis=1), 1.0)
+        self.assertEqual(len(np.unique(weights, axis=0)), 7)
+        # 各軸の端点を含む
+        for m in range(3):
+            self.assertTrue(np.any(weights[:, m] == 1.0))
+
+    def test_scalarizing_functions(self):
+        F = np.array([[1.0, 3.0], [2.0, 2.0]])
+        weights = np.array([[0.5, 0.5], [0.5, 0.5]])
+        ideal = np.zeros(2)
+        scale = np.ones(2)
+        np.testing.assert_allclose(tchebycheff(F, weights, ideal, scale), [1.5, 1.0])
+        np.testing.assert_allclose(pbi(F, weights, ideal, scale, theta=0.0), [2 * np.sqrt(2), 2 * np.sqrt(2)])
+
+class TestMOEAD(unittest.TestCase):
+    def setUp(self):
+        self.encoding = MultiPermutationVariable(items=list(range(8)), n_multi=1)
+
+    def run_algorithm(self, seed: int, decomposition: str = 'tchebycheff') -> MOEAD:
+        algo = MOEAD(displacement, self.encoding, population_size=10, generations=6, n_neighbors=4,
+                     decomposition=decomposition, rng_service=RNGService(seed))
+        algo.evolve()
+        return algo
+
+    def test_evolve_keeps_population_size(self):
+        for decomposition in ('tchebycheff', 'pbi'):
+            algo = self.run_algorithm(0, decomposition)
+            self.assertEqual(len(algo.get_result()), 10)
+            self.assertEqual(algo.evaluations, 10 + 6 * 10)
+
+    def test_update_replaces_at_most_n_replace(self):
+        algo = MOEAD(displacement, self.encoding, population_size=6, generations=0, n_replace=2,
+                     rng_service=RNGService(0))
+        best = Individual(self.encoding, genome=[list(range(8))])
+        best.set_objectives([-1.0, -1.0])  # すべての部分問題で改善する
+        before = list(algo.population)
+        algo.update([best], [np.array([5, 3, 1])])
+        self.assertEqual([k for k, ind in enumerate(algo.population) if ind is best], [3, 5])
+        self.assertTrue(all(algo.population[k] is before[k] for k in (0, 1, 2, 4)))
+
+    def test_reproducible(self):
+        genomes = [ind.genome for ind in self.run_algorithm(1).population]
+        self.assertEqual(genomes, [ind.genome for ind in self.run_algorithm(1).population])
+
+    def test_rejects_unknown_decomposition(self):
+        with self.assertRaises(ValueError):
+            MOEAD(displacement, self.encoding, population_size=4, decomposition='weighted_sum')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import numpy as np
+from modutask.optimizer.my_moo import *
+from modutask.optimizer.my_moo.algorithms.nsgaiii import associate, das_dennis, default_partitions, normalize
+
+def spread(order: list[list[int]]) -> list[float]:
+    """先頭3つの位置に応じた3目的のダミー目的関数（実行不可能な順序は inf）"""
+    perm = order[0]
+    if perm[0] == 0:
+        return [float('inf')] * 3
+    return [float(perm[0]), float(perm[1]), float(len(perm) * 2 - perm[0] - perm[1])]
+
+class TestReferenceDirections(unittest.TestCase):
+    def test_das_dennis(self):
+        ref_dirs = das_dennis(4, 3)
+        self.assertEqual(ref_dirs.shape, (15, 3))
+        np.testing.assert_allclose(ref_dirs.sum(axis=1), 1.0)
+
+    def test_default_partitions(self):
+        self.assertEqual(default_partitions(5, 50), 3)  # 35 本（4 分割だと 70 本）
+        self.assertEqual(default_partitions(5, 2), 1)
+
+    def test_normalize_and_associate(self):
+        F = np.array([[1.0, 5.0], [3.0, 3.0], [5.0, 1.0]])
+        normalized = normalize(F)
+        np.testing.assert_allclose(normalized, [[0.0, 1.0], [0.5, 0.5], [1.0, 0.0]])
+        niches, distances = associate(normalized, das_dennis(2, 2))
+        self.assertEqual(list(niches), [0, 1, 2])
+        np.testing.assert_allclose(distances, 0.0, atol=1e-6)
+
+class TestNSGAIII(unittest.TestCase):
+    def setUp(self):
+        self.encoding = MultiPermutationVariable(items=list(range(8)), n_multi=1)
+
+    def run_algorithm(self, seed: int) -> NSGAIII:
+        algo = NSGAIII(spread, self.encoding, population_size=12, generations=5, n_partitions=3,
+                       rng_service=RNGService(seed))
+        algo.evolve()
+        return algo
+
+    def test_evolve_keeps_population_size(self):
+        algo = self.run_algorithm(0)
+        self.assertEqual(len(algo.get_result()), 12)
+        self.assertEqual(algo.ref_dirs.shape, (10, 3))
+        self.assertTrue(all(np.all(np.isfinite(ind.objectives)) for ind in algo.get_result()))
+
+    def test_reproducible(self):
+        genomes = [ind.genome for ind in self.run_algorithm(1).population]
+        self.assertEqual(genomes, [ind.genome for ind in self.run_algorithm(1).population])
+
+    def test_rejects_mismatched_ref_dirs(self):
+        with self.assertRaises(ValueError):
+            NSGAIII(spread, self.encoding, population_size=4, generations=1, ref_dirs=das_dennis(2, 2),
+                    rng_service=RNGService(0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from modutask.optimizer.my_moo import MultiPermutationVariable, RNGService, use_rng
+from modutask.simulator.evaluation import (PrefixSharingEvaluator, average_scenario_results, divergence_step,
+                                           simulate_scenario, valid_frontiers)
+from helpers import make_model
+
+class TestValidFrontiers(unittest.TestCase):
+    def test_identical(self):
+        self.assertEqual(valid_frontiers(['a', 'b', 'c'], ['a', 'b', 'c']), [True] * 4)
+
+    def test_late_swap(self):
+        # 先頭2つは同じなので位置0, 1で止まる走査は同じタスクを選ぶ
+        self.assertEqual(valid_frontiers(['a', 'b', 'c', 'd'], ['a', 'b', 'd', 'c']),
+                         [True, True, False, False, True])
+
+    def test_prefix_as_set(self):
+        # 先頭2つが集合として等しければ、位置2で止まる走査も同じタスクを選ぶ
+        self.assertEqual(valid_frontiers(['a', 'b', 'c'], ['b', 'a', 'c']), [False, False, True, True])
+
+    def test_different_length(self):
+        self.assertEqual(valid_frontiers(['a', 'b'], ['a']), [False, False, False])
+
+class TestDivergenceStep(unittest.TestCase):
+    def test_first_invalid_frontier(self):
+        parent = {'r1': ['a', 'b', 'c'], 'r2': ['x', 'y']}
+        child = {'r1': ['a', 'c', 'b'], 'r2': ['x', 'y']}
+        # 各ステップの参照位置（None は充電中・非稼働）
+        frontiers = [(0, 0), (None, 1), (0, 2), (1, 2), (2, 2)]
+        self.assertEqual(divergence_step(frontiers, parent, child, ['r1', 'r2']), 3)
+
+    def test_no_divergence(self):
+        parent = {'r1': ['a', 'b', 'c']}
+        child = {'r1': ['a', 'c', 'b']}
+        self.assertEqual(divergence_step([(0,), (0,), (3,)], parent, child, ['r1']), 3)
+
+class TestPrefixSharingEvaluator(unittest.TestCase):
+    def setUp(self):
+        self.model = make_model()
+        self.scenarios = [['s0'], ['s1'], ['s2']]
+        self.encoding = MultiPermutationVariable(items=sorted(self.model['tasks']), n_multi=len(self.model['robots']))
+
+    def objective(self, order, max_step):
+        task_priorities = {name: list(order[i]) for i, name in enumerate(self.model['robots'])}
+        return average_scenario_results([simulate_scenario(task_priorities, scenario_names, max_step, **self.model)
+                                         for scenario_names in self.scenarios])
+
+    def test_matches_full_simulation_for_mutated_children(self):
+        evaluator = PrefixSharingEvaluator(**self.model, training_scenarios=self.scenarios, max_step=40, snapshot_interval=4)
+        with use_rng(RNGService(0).stream(0)):
+            parent = self.encoding.sample()
+            orders = [parent]
+            for _ in range(12):
+                orders.append(self.encoding.mutate(orders[int(len(orders) * 0.5)]))
+        for order in orders + [parent]:
+            self.assertEqual(evaluator(order), self.objective(order, 40))
+        # 途中の状態からの再開と結果の再利用が起きている
+        self.assertGreater(evaluator.reused_steps, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import numpy as np
+from modutask.optimizer.my_moo import *
+from modutask.optimizer.my_moo.algorithms.nsgaii import fast_non_dominated_sort
+from modutask.simulator.bounds import RemainingWorkloadBound
+from helpers import make_robot, make_task
+
+class TestRemainingWorkloadBound(unittest.TestCase):
+    def setUp(self):
+        self.tasks = {'west': make_task('west', (-10.0, 0.0), 5.0), 'east': make_task('east', (10.0, 0.0), 5.0)}
+        self.robots = {'r0': make_robot('r0', (0.0, 0.0))}
+        self.bound = RemainingWorkloadBound(self.robots, self.tasks, list(self.tasks), {}, max_step=20)
+
+    def test_travel_limits_progress(self):
+        # 最初に向かうタスクには10ステップで着くが、もう一方へはそこからさらに20ステップかかる
+        self.assertEqual(self.bound([['west', 'east']])[0], 5.0)
+        self.assertEqual(self.bound([['east', 'west']])[0], 5.0)
+
+    def test_no_work_without_robots(self):
+        bound = RemainingWorkloadBound(self.robots, self.tasks, list(self.tasks), {}, max_step=5)
+        self.assertEqual(bound([['west', 'east']])[0], 10.0)
+
+class TestBoundPruningEvaluator(unittest.TestCase):
+    def test_dominated_bound_skips_evaluation(self):
+        encoding = PermutationVariable(items=[0, 1, 2])
+        calls = []
+        def func(genome):
+            calls.append(genome)
+            return [float(genome[0]), float(genome[1])]
+        evaluator = BoundPruningEvaluator(SerialEvaluator(func), encoding, bound=lambda genome: [float(genome[0]), 0.0])
+        evaluator.front = np.array([[0.0, 0.0]])
+        results = evaluator.evaluate([[0, 1, 2], [2, 1, 0]])
+        self.assertEqual(results, [[0.0, 1.0], [2.0, 0.0]])
+        self.assertEqual([constraint_violation(values) for values in results], [0.0, float('inf')])
+        self.assertEqual(calls, [[0, 1, 2]])
+        self.assertEqual(evaluator.pruned, 1)
+        self.assertNotIn(encoding.key([2, 1, 0]), evaluator.cache)
+
+    def test_pruned_rank_behind_evaluated(self):
+        encoding = PermutationVariable(items=[0, 1, 2])
+        evaluator = BoundPruningEvaluator(SerialEvaluator(lambda genome: [float(genome[0]), float(genome[1])]), encoding,
+                                          bound=lambda genome: [0.0, 0.0] if genome[0] == 2 else [float(genome[0]), 0.0])
+        evaluator.front = np.array([[0.0, 0.0]])
+        individuals = []
+        for genome in [[2, 0, 1], [0, 1, 2], [1, 2, 0]]:
+            individuals.append(Individual(encoding, genome=genome))
+        for ind, objectives in zip(individuals, evaluator.evaluate([ind.genome for ind in individuals])):
+            ind.set_objectives(objectives)
+        infeasible = Individual(encoding, genome=[0, 2, 1])
+        infeasible.set_objectives(ConstrainedObjectives([9.0, 9.0], constraints=[5.0]))
+        # 評価を省略した [1, 2, 0] の下界 [1, 0] は評価した [2, 0] を支配するが、評価した実行不可能解よりも後ろに並ぶ
+        fronts = fast_non_dominated_sort(individuals + [infeasible])
+        self.assertEqual(fronts, [[individuals[0], individuals[1]], [infeasible], [individuals[2]]])
+        self.assertNotIn(individuals[2], get_non_dominated_individuals(individuals))
+        self.assertFalse(ParetoArchive().add(individuals[2]))
+
+    def test_pruned_never_reach_result(self):
+        encoding = MultiPermutationVariable(items=list(range(6)), n_multi=1)
+        def func(order):
+            return [float(sum(abs(item - i) for i, item in enumerate(order[0]))), float(order[0][0])]
+        evaluator = BoundPruningEvaluator(SerialEvaluator(func), encoding, bound=lambda order: [0.0, float(order[0][0])])
+        algo = NSGAII(func, encoding, population_size=8, generations=6, evaluator=evaluator,
+                      rng_service=RNGService(3), callbacks=[evaluator])
+        algo.evolve()
+        self.assertGreater(evaluator.pruned, 0)
+        front = get_non_dominated_individuals(algo.get_result())
+        self.assertTrue(all(ind.objectives == func(ind.genome) for ind in front))
+
+    def test_empty_front_evaluates_everything(self):
+        encoding = PermutationVariable(items=[0, 1])
+        evaluator = BoundPruningEvaluator(SerialEvaluator(lambda genome: [1.0]), encoding, bound=lambda genome: [0.0])
+        self.assertEqual(evaluator.evaluate([[0, 1], [1, 0]]), [[1.0], [1.0]])
+        self.assertEqual(evaluator.pruned, 0)
+
+if __name__ == '__main__':
+    unittest.main()
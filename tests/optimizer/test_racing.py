@@ -0,0 +1,79 @@
+import tempfile
+import unittest
+import numpy as np
+from modutask.optimizer.my_moo import *
+from helpers import displacement
+
+def rough_displacement(order: list[list[int]]) -> list[float]:
+    """低忠実度版（短いホライズンのように、最大1だけ悲観側に外れる）"""
+    f1, f2 = displacement(order)
+    return [f1 + order[0][1] % 2, f2]
+
+class TestRacingEvaluator(unittest.TestCase):
+    def setUp(self):
+        self.encoding = MultiPermutationVariable(items=list(range(8)), n_multi=1)
+
+    def make(self, min_pairs=8):
+        return RacingEvaluator(SerialEvaluator(rough_displacement), SerialEvaluator(displacement), self.encoding,
+                               confidence=1.0, min_pairs=min_pairs)
+
+    def test_races_out_dominated_genomes(self):
+        evaluator = self.make()
+        algo = NSGAII(displacement, self.encoding, population_size=10, generations=8, evaluator=evaluator,
+                      rng_service=RNGService(3), callbacks=[evaluator])
+        algo.evolve()
+        self.assertGreater(evaluator.raced, 0)
+        high_keys = {key for fidelity, key in evaluator.cache if fidelity == 'high'}
+        # 完全に評価されなかった個体は非支配解にならない
+        for ind in get_non_dominated_individuals(algo.get_result()):
+            self.assertIn(self.encoding.key(ind.genome), high_keys)
+
+    def test_registers_itself_as_callback(self):
+        evaluator = self.make()
+        algo = NSGAII(displacement, self.encoding, population_size=10, generations=8, evaluator=evaluator,
+                      rng_service=RNGService(3))
+        self.assertEqual(algo.callbacks, [evaluator])
+        algo.evolve()
+        self.assertGreater(evaluator.raced, 0)
+
+    def test_raced_out_marked_infeasible(self):
+        evaluator = self.make(min_pairs=1)
+        evaluator.differences.append([0.0, 0.0])
+        evaluator.front = np.array([[0.0, 0.0]])
+        # submit も evaluate を通してレーシングする
+        objectives = evaluator.submit([[0, 1, 2, 3, 4, 5, 6, 7]]).result()
+        self.assertEqual(evaluator.raced, 1)
+        self.assertEqual(list(objectives), rough_displacement([[0, 1, 2, 3, 4, 5, 6, 7]]))
+        self.assertEqual(constraint_violation(objectives), float('inf'))
+        self.assertNotIn(('high', self.encoding.key([[0, 1, 2, 3, 4, 5, 6, 7]])), evaluator.cache)
+
+    def test_differences_keep_recent_window(self):
+        evaluator = RacingEvaluator(SerialEvaluator(rough_displacement), SerialEvaluator(displacement), self.encoding,
+                                    confidence=1.0, min_pairs=4, max_pairs=5)
+        algo = NSGAII(displacement, self.encoding, population_size=10, generations=3, evaluator=evaluator,
+                      rng_service=RNGService(3))
+        algo.evolve()
+        self.assertEqual(len(evaluator.differences), 5)
+        self.assertEqual(evaluator.current_margin().shape, (2,))
+        with self.assertRaises(ValueError):
+            RacingEvaluator(SerialEvaluator(rough_displacement), SerialEvaluator(displacement), self.encoding,
+                            min_pairs=10, max_pairs=5)
+
+    def test_fidelities_are_cached_separately(self):
+        evaluator = self.make(min_pairs=1000)
+        genome = [[7, 6, 5, 4, 3, 2, 1, 0]]
+        self.assertEqual(evaluator.evaluate([genome]), [displacement(genome)])
+        key = self.encoding.key(genome)
+        self.assertEqual(evaluator.cache[('low', key)], rough_displacement(genome))
+        self.assertEqual(evaluator.cache[('high', key)], displacement(genome))
+
+    def test_checkpoint_keeps_fidelities(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            evaluator = self.make()
+            algo = NSGAII(displacement, self.encoding, population_size=6, generations=2, evaluator=evaluator,
+                          rng_service=RNGService(3), callbacks=[evaluator], checkpointer=Checkpointer(tmpdir, 2))
+            algo.evolve()
+            self.assertEqual(load_checkpoint(tmpdir)['cache'], evaluator.cache)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+import re
+import unittest
+from modutask.io import clone_module, clone_risk_scenarios, clone_robots, clone_simulation_map, clone_tasks
+from modutask.optimizer.my_moo import Individual, MultiPermutationVariable, RNGService
+from modutask.optimizer.replanning import ForkObjective, RollingHorizonPlanner, select_plan
+from modutask.simulator.evaluation import scenario_objectives, simulate_scenario
+from modutask.simulator.simulation import Simulator
+from helpers import make_model
+
+PRIORITIES = {'r0': ['m0', 'm2', 't0', 'm1', 'm3'], 'r1': ['m1', 'm3', 'm0', 'm2', 't0'], 'r2': ['t0', 'm0', 'm2', 'm3', 'm1']}
+
+def make_simulator(model: dict, scenario_names: list[str], task_priorities: dict = PRIORITIES) -> Simulator:
+    modules = clone_module(modules=model['modules'])
+    robots = clone_robots(robots=model['robots'], modules=modules)
+    scenarios = clone_risk_scenarios(risk_scenarios=model['risk_scenarios'])
+    return Simulator(
+        tasks=clone_tasks(tasks=model['combined_tasks'], modules=modules, robots=robots),
+        robots=robots,
+        task_priorities=task_priorities,
+        scenarios=[scenarios[name] for name in scenario_names],
+        simulation_map=clone_simulation_map(simulation_map=model['simulation_map']),
+        modules=modules,
+        )
+
+def run(simulator: Simulator, steps: int) -> Simulator:
+    for _ in range(steps):
+        simulator.run_simulation()
+    return simulator
+
+def objectives(simulator: Simulator) -> list[float]:
+    return scenario_objectives(task_names=['m0', 'm1', 'm2', 'm3', 't0'], combined_tasks=simulator.tasks,
+                               modules=simulator.modules)
+
+class TestSimulatorFork(unittest.TestCase):
+    def setUp(self):
+        self.model = make_model()
+
+    def test_fork_runs_like_original(self):
+        for scenario in ['s0', 's1', 's2']:
+            original = run(make_simulator(self.model, [scenario]), 10)
+            fork = run(original.fork(), 30)
+            run(original, 30)
+            self.assertEqual(fork.current_step, 40)
+            self.assertEqual(objectives(fork), objectives(original))
+            self.assertEqual(objectives(fork), simulate_scenario(PRIORITIES, [scenario], 40, **self.model))
+
+    def test_fork_leaves_original_untouched(self):
+        original = run(make_simulator(self.model, ['s1']), 10)
+        before = (objectives(original), original.task_priorities(), original.scenarios[0].rng.bit_generator.state)
+        reversed_priorities = {name: list(reversed(priority)) for name, priority in PRIORITIES.items()}
+        fork = run(original.fork(task_priorities=reversed_priorities, scenarios=[self.model['risk_scenarios']['s2']]), 20)
+        self.assertEqual(fork.task_priorities(), reversed_priorities)
+        self.assertEqual((objectives(original), original.task_priorities(), original.scenarios[0].rng.bit_generator.state),
+                         before)
+        self.assertEqual(original.current_step, 10)
+        # 元の Simulator はそのまま続けても分岐しなかった場合と同じ結果になる
+        self.assertEqual(objectives(run(original, 30)), simulate_scenario(PRIORITIES, ['s1'], 40, **self.model))
+
+    def test_restore_same_snapshot_twice(self):
+        snapshot = run(make_simulator(self.model, ['s0']), 5).snapshot()
+        first = run(Simulator.restore(snapshot), 20)
+        second = run(Simulator.restore(snapshot), 20)
+        self.assertEqual(objectives(first), objectives(second))
+        self.assertIsNot(first.tasks['m0'], second.tasks['m0'])
+
+    def test_reset_scenarios_copies_and_initializes(self):
+        simulator = make_simulator(self.model, ['s0'])
+        scenario = self.model['risk_scenarios']['s3']
+        simulator.reset_scenarios([scenario])
+        self.assertIsNone(scenario.rng)  # 渡したシナリオの乱数は進めない
+        self.assertIsNot(simulator.scenarios[0], scenario)
+        self.assertIsNotNone(simulator.scenarios[0].rng)
+
+    def test_set_task_priorities(self):
+        simulator = make_simulator(self.model, [])
+        with self.assertRaises(ValueError):
+            simulator.set_task_priorities({'r0': PRIORITIES['r0']})
+        reversed_priorities = {name: list(reversed(priority)) for name, priority in PRIORITIES.items()}
+        simulator.set_task_priorities(reversed_priorities)
+        reversed_priorities['r0'].pop()  # 渡したリストとは共有しない
+        self.assertEqual(simulator.task_priorities()['r0'], list(reversed(PRIORITIES['r0'])))
+
+class TestForkObjective(unittest.TestCase):
+    def setUp(self):
+        self.model = make_model()
+        self.simulator = run(make_simulator(self.model, ['s0']), 8)
+        self.order = [list(reversed(PRIORITIES[name])) for name in ['r0', 'r1', 'r2']]
+
+    def test_matches_forked_run(self):
+        planning = [[self.model['risk_scenarios']['s1']], [self.model['risk_scenarios']['s2']]]
+        objective = ForkObjective(self.simulator.snapshot(), ['m0', 'm1', 'm2', 'm3', 't0'], horizon=15,
+                                  planning_scenarios=planning)
+        task_priorities = dict(zip(['r0', 'r1', 'r2'], self.order))
+        expected = [objectives(run(self.simulator.fork(task_priorities, scenarios), 15)) for scenarios in planning]
+        self.assertEqual(objective(self.order), [sum(values) / 2 for values in zip(*expected)])
+        self.assertEqual(self.simulator.current_step, 8)
+
+    def test_without_planning_scenarios_assumes_no_failure(self):
+        objective = ForkObjective(self.simulator.snapshot(), ['m0', 'm1', 'm2', 'm3', 't0'], horizon=15)
+        task_priorities = dict(zip(['r0', 'r1', 'r2'], self.order))
+        self.assertEqual(objective(self.order), objectives(run(self.simulator.fork(task_priorities, []), 15)))
+
+    def test_requires_modules(self):
+        simulator = make_simulator(self.model, [])
+        simulator.modules = None
+        with self.assertRaises(ValueError):
+            ForkObjective(simulator.snapshot(), ['m0'], horizon=5)
+
+class TestSelectPlan(unittest.TestCase):
+    def test_lexicographic_minimum(self):
+        encoding = MultiPermutationVariable(items=[0, 1], n_multi=1)
+        individuals = []
+        for objectives_ in ([3.0, 0.0, 0.0], [1.0, 5.0, 2.0], [1.0, 4.0, 9.0]):
+            ind = Individual(encoding, genome=[[0, 1]])
+            ind.set_objectives(objectives_)
+            individuals.append(ind)
+        self.assertIs(select_plan(individuals), individuals[2])
+
+class TestRollingHorizonPlanner(unittest.TestCase):
+    def make_planner(self, model: dict, scenario_names: list[str], **kwargs) -> RollingHorizonPlanner:
+        return RollingHorizonPlanner(make_simulator(model, scenario_names), ['m0', 'm1', 'm2', 'm3', 't0'], horizon=10,
+                                     population_size=4, generations=2, rng_service=RNGService(0), **kwargs)
+
+    def test_replans_on_failure(self):
+        model = make_model(failure_rate=0.01)
+        planner = self.make_planner(model, ['s0'])
+        planner.run(30)
+        failed = {name for name, module in planner.simulator.modules.items() if module.state.name == 'ERROR'}
+        self.assertGreater(len(failed), 0)
+        self.assertTrue(all(entry['reason'].startswith('failure') for entry in planner.history))
+        # max_step の前までに故障したモジュールは、いずれかの計画し直しの理由に一度だけ現れる
+        reported = [name for entry in planner.history for name in re.findall(r"'(\w+)'", entry['reason'])]
+        self.assertEqual(len(reported), len(set(reported)))
+        self.assertEqual(set(reported), planner.failed_modules)
+        self.assertLessEqual(set(reported), failed)
+        steps = [entry['step'] for entry in planner.history]
+        self.assertEqual(steps, sorted(set(steps)))
+
+    def test_replans_at_interval(self):
+        planner = self.make_planner(make_model(failure_rate=0.0), [], interval=5)
+        planner.run(20)
+        self.assertEqual([entry['step'] for entry in planner.history], [5, 10, 15])
+        self.assertEqual([entry['reason'] for entry in planner.history], ['interval'] * 3)
+        self.assertEqual(planner.simulator.current_step, 20)
+
+    def test_keeps_current_plan_without_triggers(self):
+        planner = self.make_planner(make_model(failure_rate=0.0), [], replan_on_failure=True)
+        planner.run(20)
+        self.assertEqual(planner.history, [])
+        self.assertEqual(planner.simulator.task_priorities(), PRIORITIES)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+import math
+from modutask.optimizer.my_moo import *
+
+def tour_lengths(order: list[list[int]]) -> list[float]:
+    """2種類の距離で巡回路長を計算するダミー目的関数"""
+    perm = order[0]
+    f1 = sum(abs(perm[i] - perm[(i + 1) % len(perm)]) for i in range(len(perm)))
+    f2 = sum(math.sin(perm[i]) * i for i in range(len(perm)))
+    return [float(f1), float(f2)]
+
+class TestRNGService(unittest.TestCase):
+    def test_stream_depends_only_on_key(self):
+        service = RNGService(1234)
+        a = service.stream(1, 3, 5).random(4)
+        service.stream(1, 0, 0).random(100)  # 他のストリームの消費は影響しない
+        b = RNGService(1234).stream(1, 3, 5).random(4)
+        self.assertEqual(a.tolist(), b.tolist())
+        self.assertNotEqual(a.tolist(), service.stream(1, 3, 6).random(4).tolist())
+
+    def test_spawn_extends_key(self):
+        service = RNGService(42)
+        self.assertEqual(service.spawn(2).stream(7).random(3).tolist(), service.stream(2, 7).random(3).tolist())
+
+    def test_use_rng_restores_previous(self):
+        before = get_rng()
+        with use_rng(RNGService(1).stream(0)) as rng:
+            self.assertIs(get_rng(), rng)
+        self.assertIs(get_rng(), before)
+
+    def test_nsgaii_is_reproducible_across_workers(self):
+        encoding = MultiPermutationVariable(items=list(range(12)), n_multi=1)
+        results = []
+        for evaluator in [SerialEvaluator(tour_lengths), PoolEvaluator(tour_lengths, n_workers=2)]:
+            with evaluator:
+                algo = NSGAII(func=tour_lengths, encoding=encoding, population_size=8, generations=5,
+                              evaluator=evaluator, rng_service=RNGService(7))
+                algo.evolve()
+                results.append([(ind.genome, ind.objectives) for ind in algo.get_result()])
+        self.assertEqual(results[0], results[1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from modutask.io import clone_module, clone_risk_scenarios, clone_robots, clone_simulation_map, clone_tasks
+from modutask.simulator.evaluation import (ScenarioPool, average_scenario_results, simulate_scenario,
+                                           variance_remaining_workload)
+from modutask.simulator.simulation import Simulator
+from helpers import make_model
+
+PRIORITIES = {'r0': ['m0', 'm2', 't0', 'm1', 'm3'], 'r1': ['m1', 'm3', 'm0', 'm2', 't0'], 'r2': ['t0', 'm0', 'm2', 'm3', 'm1']}
+SCENARIOS = [['s0'], ['s1'], ['s2'], ['s3'], ['s0', 's2'], []]
+
+class TestScenarioPool(unittest.TestCase):
+    def test_matches_serial_simulation(self):
+        model = make_model(failure_rate=0.01)
+        expected = [simulate_scenario(PRIORITIES, names, 40, **model) for names in SCENARIOS]
+        self.assertGreater(len({tuple(values) for values in expected}), 1)
+        with ScenarioPool(3, **model) as pool:
+            for _ in range(2):  # ワーカーの状態が前回の実行に影響しない
+                results = pool.run(PRIORITIES, SCENARIOS, 40)
+                self.assertEqual(results, expected)
+                self.assertEqual(average_scenario_results(results), average_scenario_results(expected))
+
+class TestSimulateScenario(unittest.TestCase):
+    def test_objectives_use_simulated_copies(self):
+        model = make_model()
+        result = simulate_scenario(PRIORITIES, ['s1'], 30, **model)
+        # 入力のタスク・モジュールは変更しない
+        self.assertTrue(all(task.completed_workload == 0.0 for task in model['combined_tasks'].values()))
+        self.assertTrue(all(module.operating_time == 0.0 for module in model['modules'].values()))
+
+        modules = clone_module(modules=model['modules'])
+        robots = clone_robots(robots=model['robots'], modules=modules)
+        tasks = clone_tasks(tasks=model['combined_tasks'], modules=modules, robots=robots)
+        simulator = Simulator(tasks=tasks, robots=robots, task_priorities=PRIORITIES,
+                              scenarios=[clone_risk_scenarios(risk_scenarios=model['risk_scenarios'])['s1']],
+                              simulation_map=clone_simulation_map(simulation_map=model['simulation_map']))
+        for _ in range(30):
+            simulator.run_simulation()
+        remaining = [tasks[name].total_workload - tasks[name].completed_workload for name in model['tasks']]
+        self.assertLess(sum(remaining), sum(task.total_workload for task in model['tasks'].values()))
+        self.assertEqual(result[0], sum(remaining))
+        simulated = {name: tasks[name] for name in model['tasks']}
+        self.assertEqual(result[1], variance_remaining_workload(tasks=simulated))
+        self.assertNotEqual(result[1], variance_remaining_workload(tasks=model['tasks']))
+        self.assertEqual(result[2], max(module.operating_time for module in modules.values()))
+
+if __name__ == '__main__':
+    unittest.main()
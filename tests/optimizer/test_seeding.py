@@ -0,0 +1,82 @@
+import unittest
+from modutask.optimizer.my_moo import MultiPermutationVariable, RNGService
+from modutask.core import Robot
+from modutask.optimizer.seeding import (HeuristicSeeder, critical_path_lengths, heuristic_genomes, match_robots,
+                                        topological_order, transfer_genome)
+from helpers import make_configuration_variable, make_robot, make_task
+
+class TestHeuristicSeeder(unittest.TestCase):
+    def setUp(self):
+        # a -> c -> d のチェーンと独立した b
+        a = make_task('a', (0.0, 0.0), 5.0)
+        b = make_task('b', (10.0, 0.0), 5.0)
+        c = make_task('c', (0.0, 1.0), 5.0, [a])
+        d = make_task('d', (0.0, 2.0), 5.0, [c])
+        self.tasks = {task.name: task for task in [a, b, c, d]}
+        self.items = ['a', 'b', 'c', 'd']
+        self.robots = {'r0': make_robot('r0', (0.0, 0.0)), 'r1': make_robot('r1', (10.0, 0.0))}
+
+    def test_topological_order(self):
+        self.assertEqual(topological_order(self.tasks, ['d', 'c', 'b', 'a']), ['a', 'c', 'd', 'b'])
+
+    def test_cycle(self):
+        self.tasks['a'].initialize_task_dependency([self.tasks['d']])
+        with self.assertRaises(ValueError):
+            topological_order(self.tasks, self.items)
+
+    def test_critical_path(self):
+        self.assertEqual(critical_path_lengths(self.tasks, self.items), {'a': 15.0, 'b': 5.0, 'c': 10.0, 'd': 5.0})
+
+    def test_deterministic_schedule(self):
+        genome = HeuristicSeeder(self.tasks, self.robots, self.items).genome(0.0)
+        # クリティカルパス上のチェーンは近い r0 に、離れた b は r1 に割り当てられる
+        self.assertEqual(genome, [['a', 'c', 'd', 'b'], ['b', 'a', 'c', 'd']])
+
+    def test_genomes_are_valid_and_reproducible(self):
+        encoding = MultiPermutationVariable(items=self.items, n_multi=len(self.robots))
+        genomes = heuristic_genomes(self.tasks, self.robots, self.items, population_size=7, ratio=0.5,
+                                    rng_service=RNGService(3), randomness=1.0)
+        self.assertEqual(len(genomes), 4)
+        self.assertTrue(all(encoding.validate(genome) for genome in genomes))
+        self.assertEqual(genomes, heuristic_genomes(self.tasks, self.robots, self.items, population_size=7, ratio=0.5,
+                                                    rng_service=RNGService(3), randomness=1.0))
+
+class TestTransferGenome(unittest.TestCase):
+    def setUp(self):
+        self.encoding = make_configuration_variable()
+
+    def make(self, name: str, type_name: str, module_names: list[str]) -> Robot:
+        modules = [self.encoding.modules[module_name] for module_name in module_names]
+        return Robot(robot_type=self.encoding.robot_types[type_name], name=name, coordinate=modules[0].coordinate,
+                     component=modules)
+
+    def test_maps_by_type_and_modules(self):
+        previous = {'robot_000': self.make('robot_000', 'Light', ['body_0', 'battery_0_0']),
+                    'robot_001': self.make('robot_001', 'Heavy', ['body_1', 'battery_1_0', 'battery_1_1'])}
+        robots = {'robot_000': self.make('robot_000', 'Heavy', ['body_1', 'battery_1_0', 'battery_1_1']),
+                  'robot_001': self.make('robot_001', 'Light', ['body_0', 'battery_0_1']),
+                  'robot_002': self.make('robot_002', 'Light', ['body_2', 'battery_2_0'])}
+        self.assertEqual(match_robots(previous, robots),
+                         {'robot_000': 'robot_001', 'robot_001': 'robot_000', 'robot_002': 'robot_000'})
+        genome = [['transport_robot_001_battery_3_0', 'm0', 'transport_robot_000_battery_3_1', 'm1'],
+                  ['m1', 'transport_robot_001_battery_3_0', 'm0']]
+        # 位置ではなく対応するロボットの優先順位を使い、運搬タスクは対応先のロボット名に付け替える
+        self.assertEqual(transfer_genome(genome, previous, robots), [
+            ['m1', 'transport_robot_000_battery_3_0', 'm0'],
+            ['transport_robot_000_battery_3_0', 'm0', 'transport_robot_001_battery_3_1', 'm1'],
+            ['transport_robot_000_battery_3_0', 'm0', 'transport_robot_001_battery_3_1', 'm1'],
+        ])
+
+    def test_drops_transports_of_unmatched_robots(self):
+        previous = {'r': self.make('r', 'Light', ['body_0', 'battery_0_0']),
+                    'r_2': self.make('r_2', 'Heavy', ['body_1', 'battery_1_0', 'battery_1_1'])}
+        robots = {'x': self.make('x', 'Light', ['body_0', 'battery_0_1'])}
+        genome = [['transport_r_2_battery_3_0', 'm0', 'transport_r_battery_3_1'], ['m0']]
+        self.assertEqual(transfer_genome(genome, previous, robots), [['m0', 'transport_x_battery_3_1']])
+
+    def test_requires_previous_robots(self):
+        with self.assertRaises(ValueError):
+            match_robots({}, {'x': self.make('x', 'Light', ['body_0', 'battery_0_0'])})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+from modutask.io.snapshot import SharedModel, compile_model, load_shared_model, restore_model
+from modutask.optimizer.my_moo import PoolEvaluator, SerialEvaluator
+from modutask.simulator.evaluation import simulate_scenario
+from task_allocation import evaluate_order, init_worker, objective
+from helpers import make_model
+
+PRIORITIES = {'r0': ['m0', 'm2', 't0', 'm1', 'm3'], 'r1': ['m1', 'm3', 'm0', 'm2', 't0'], 'r2': ['t0', 'm0', 'm2', 'm3', 'm1']}
+SCENARIOS = [['s0'], ['s1'], ['s2', 's3'], []]
+
+def simulate_all(model: dict) -> list[list[float]]:
+    return [simulate_scenario(PRIORITIES, names, 50, **model) for names in SCENARIOS]
+
+class TestCompiledModel(unittest.TestCase):
+    def setUp(self):
+        self.model = make_model()
+
+    def test_restore_model_simulates_identically(self):
+        restored = restore_model(compile_model(**self.model))
+        self.assertEqual(list(restored['combined_tasks']), list(self.model['combined_tasks']))
+        self.assertEqual(simulate_all(restored), simulate_all(self.model))
+
+    def test_shared_model_round_trip(self):
+        with SharedModel.create(compile_model(**self.model)) as shared:
+            restored = restore_model(shared.load())
+            self.assertEqual(simulate_all(restored), simulate_all(self.model))
+            # ワーカー側の読み込みはプロセスごとに一度だけ復元する
+            self.assertIs(load_shared_model(shared.name), load_shared_model(shared.name))
+            self.assertEqual(simulate_all(load_shared_model(shared.name)), simulate_all(self.model))
+
+class TestPoolEvaluator(unittest.TestCase):
+    def test_results_in_input_order(self):
+        model = make_model(failure_rate=0.01)
+        names = list(PRIORITIES)
+        orders = [[list(PRIORITIES[name]) for name in names]]
+        for shift in range(1, 6):
+            orders.append([priority[shift:] + priority[:shift] for priority in orders[0]])
+        expected = SerialEvaluator(
+            lambda order: objective(order, **model, max_step=40, training_scenarios=SCENARIOS)).evaluate(orders)
+        self.assertGreater(len({tuple(values) for values in expected}), 1)
+        with SharedModel.create(compile_model(**model)) as shared:
+            with PoolEvaluator(evaluate_order, n_workers=3, initializer=init_worker,
+                               initargs=(shared.name, 40, SCENARIOS)) as evaluator:
+                self.assertEqual(evaluator.evaluate(orders), expected)
+                self.assertEqual([evaluator.submit(order).result() for order in orders], expected)
+
+if __name__ == '__main__':
+    unittest.main()
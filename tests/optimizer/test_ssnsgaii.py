@@ -0,0 +1,36 @@
+import unittest
+from modutask.optimizer.my_moo import *
+from modutask.optimizer.my_moo.algorithms.nsgaii import fast_non_dominated_sort
+from modutask.optimizer.my_moo.algorithms.ssnsgaii import insert_into_fronts
+from helpers import displacement
+
+class TestSteadyStateNSGAII(unittest.TestCase):
+    def test_insert_matches_full_sort(self):
+        encoding = MultiPermutationVariable(items=list(range(8)), n_multi=1)
+        population = Population.initialize(30, encoding, RNGService(3))
+        population.evaluate(SerialEvaluator(displacement))
+        individuals = list(population)
+        fronts: list = []
+        inserted = []
+        for ind in individuals:
+            if any(ind == other for other in inserted):
+                continue
+            inserted.append(ind)
+            insert_into_fronts(fronts, ind)
+        expected = {id(ind): ind.fitness['rank'] for ind in inserted}
+        for front in fast_non_dominated_sort(inserted):
+            for ind in front:
+                self.assertEqual(expected[id(ind)], ind.fitness['rank'])
+
+    def test_evolve_keeps_population_size(self):
+        encoding = MultiPermutationVariable(items=list(range(8)), n_multi=1)
+        algo = SteadyStateNSGAII(func=displacement, encoding=encoding, population_size=10, max_evaluations=60,
+                                 rng_service=RNGService(5))
+        algo.evolve()
+        self.assertEqual(algo.evaluations, 60)
+        self.assertLessEqual(len(algo.get_result()), 10)
+        ranks = [ind.fitness['rank'] for ind in algo.get_result()]
+        self.assertEqual(min(ranks), 0)
+
+if __name__ == '__main__':
+    unittest.main()
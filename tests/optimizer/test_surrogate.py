@@ -0,0 +1,99 @@
+import math
+import unittest
+import numpy as np
+from modutask.optimizer.my_moo import *
+from modutask.optimizer.my_moo.surrogate import non_dominated_ranks
+from helpers import displacement
+
+def rough_displacement(order: list[list[int]]) -> list[float]:
+    """低忠実度版（最大1だけ悲観側に外れる）"""
+    f1, f2 = displacement(order)
+    return [f1 + order[0][1] % 2, f2]
+
+class TestSurrogateScreen(unittest.TestCase):
+    def setUp(self):
+        self.encoding = MultiPermutationVariable(items=list(range(8)), n_multi=1)
+
+    def test_non_dominated_ranks(self):
+        Y = np.array([[1.0, 3.0], [2.0, 2.0], [3.0, 3.0], [1.0, 3.0], [4.0, 4.0]])
+        self.assertEqual(non_dominated_ranks(Y), [0, 0, 1, 0, 2])
+
+    def test_features(self):
+        self.assertEqual(self.encoding.features([[2, 0, 1, 3, 4, 5, 6, 7]])[:3], [1 / 7, 2 / 7, 0.0])
+        # 単一の順列でも同じ正規化
+        single = PermutationVariable(items=list(range(8)))
+        self.assertEqual(single.features([2, 0, 1, 3, 4, 5, 6, 7]), self.encoding.features([[2, 0, 1, 3, 4, 5, 6, 7]]))
+
+    def test_screening_keeps_true_evaluation_count(self):
+        surrogate = SurrogateScreen(self.encoding, true_ratio=0.25, exploration=0.25, min_samples=10)
+        algo = NSGAII(displacement, self.encoding, population_size=8, generations=4,
+                      rng_service=RNGService(6), surrogate=surrogate)
+        algo.evolve()
+        self.assertEqual(algo.evaluations, 8 * 5)
+        self.assertEqual(surrogate.screened, 3 * (32 - 8))  # 1世代目は学習データが min_samples に満たない
+        self.assertEqual(len(surrogate.X), 40)
+
+    def test_before_min_samples_matches_plain_run(self):
+        plain = NSGAII(displacement, self.encoding, population_size=8, generations=3, rng_service=RNGService(6))
+        plain.evolve()
+        screened = NSGAII(displacement, self.encoding, population_size=8, generations=3, rng_service=RNGService(6),
+                          surrogate=SurrogateScreen(self.encoding, min_samples=1000))
+        screened.evolve()
+        self.assertEqual([ind.genome for ind in screened.get_result()], [ind.genome for ind in plain.get_result()])
+
+    def test_skips_infeasible_and_non_finite(self):
+        surrogate = SurrogateScreen(self.encoding, min_samples=2)
+        individuals = []
+        for objectives in ([1.0, 2.0], ConstrainedObjectives([0.0, 0.0], constraints=[math.inf]),
+                           dominated_objectives([math.inf, math.inf]), [2.0, 1.0]):
+            ind = Individual(self.encoding, genome=self.encoding.sample())
+            ind.set_objectives(objectives)
+            individuals.append(ind)
+        surrogate.observe(individuals)
+        self.assertEqual(surrogate.Y, [[1.0, 2.0], [2.0, 1.0]])
+        surrogate.fit()
+        self.assertEqual(surrogate.n_fitted, 2)
+
+    def check_trained_on_true_evaluations(self, make_evaluator, skipped, callbacks=None):
+        evaluated = []
+        def true_displacement(order):
+            evaluated.append(displacement(order))
+            return evaluated[-1]
+        evaluator = make_evaluator(true_displacement)
+        callbacks = callbacks(evaluator) if callbacks is not None else None
+        surrogate = SurrogateScreen(self.encoding, true_ratio=0.5, exploration=0.25, min_samples=10)
+        algo = NSGAII(displacement, self.encoding, population_size=10, generations=8, evaluator=evaluator,
+                      rng_service=RNGService(3), surrogate=surrogate, callbacks=callbacks)
+        algo.evolve()
+        self.assertGreater(skipped(evaluator), 0)
+        self.assertGreater(surrogate.screened, 0)
+        # 学習データは真の評価で得た値だけ（評価を省略した個体の値は含まない。キャッシュから再利用した値は重複しうる）
+        self.assertLessEqual({tuple(values) for values in surrogate.Y}, {tuple(values) for values in evaluated})
+
+    def test_with_racing(self):
+        self.check_trained_on_true_evaluations(
+            lambda func: RacingEvaluator(SerialEvaluator(rough_displacement), SerialEvaluator(func), self.encoding,
+                                         confidence=1.0, min_pairs=8),
+            lambda evaluator: evaluator.raced)
+
+    def test_with_pruning(self):
+        self.check_trained_on_true_evaluations(
+            lambda func: BoundPruningEvaluator(SerialEvaluator(func), self.encoding, bound=displacement),
+            lambda evaluator: evaluator.pruned)
+
+    def test_with_pruning_and_racing(self):
+        # 下界で枝刈りした残りを低忠実度の評価でレーシングする
+        self.check_trained_on_true_evaluations(
+            lambda func: BoundPruningEvaluator(
+                RacingEvaluator(SerialEvaluator(rough_displacement), SerialEvaluator(func), self.encoding,
+                                confidence=1.0, min_pairs=8),
+                self.encoding, bound=lambda order: [value - 2.0 for value in displacement(order)]),
+            lambda evaluator: evaluator.pruned + evaluator.evaluator.raced,
+            callbacks=lambda evaluator: [evaluator.evaluator])
+
+    def test_invalid_ratio(self):
+        with self.assertRaises(ValueError):
+            SurrogateScreen(self.encoding, true_ratio=0.0)
+
+if __name__ == '__main__':
+    unittest.main()
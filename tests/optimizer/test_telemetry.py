@@ -0,0 +1,63 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+from modutask.optimizer.my_moo import *
+from helpers import displacement
+
+class RecordCollector(BaseCallback):
+    def __init__(self):
+        self.records = []
+
+    def on_generation(self, algorithm, record):
+        self.records.append(record)
+
+class TestTelemetry(unittest.TestCase):
+    def setUp(self):
+        self.encoding = MultiPermutationVariable(items=list(range(8)), n_multi=1)
+
+    def test_records_per_generation(self):
+        collector = RecordCollector()
+        evaluator = CachedEvaluator(SerialEvaluator(displacement), self.encoding)
+        algo = NSGAII(displacement, self.encoding, population_size=8, generations=5, evaluator=evaluator,
+                      rng_service=RNGService(2), callbacks=[collector], hv_ref_point=[100.0, 100.0])
+        initial_hits = evaluator.hits
+        algo.evolve()
+        self.assertEqual([record.generation for record in collector.records], [1, 2, 3, 4, 5])
+        for record in collector.records:
+            self.assertEqual(record.evaluations, 8)
+            self.assertGreaterEqual(record.front_size, 1)
+            self.assertGreater(record.hypervolume, 0.0)
+        self.assertEqual(sum(record.cache_hits for record in collector.records), evaluator.hits - initial_hits)
+        hypervolumes = [record.hypervolume for record in collector.records]
+        self.assertEqual(hypervolumes, sorted(hypervolumes))  # エリート保存のためHVは減らない
+
+    def test_hypervolume_tracker(self):
+        tracker = HypervolumeTracker([4.0, 4.0])
+        front = [Individual(self.encoding, genome=[[0]]), Individual(self.encoding, genome=[[1]])]
+        front[0].set_objectives([1.0, 2.0])
+        front[1].set_objectives([2.0, 1.0])
+        self.assertAlmostEqual(tracker(front), 8.0)
+        self.assertAlmostEqual(tracker(list(reversed(front))), 8.0)
+
+    def test_writer_formats(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name in ('telemetry.csv', 'telemetry.jsonl'):
+                path = os.path.join(tmpdir, name)
+                writer = TelemetryWriter(path)
+                algo = IBEAHV(displacement, self.encoding, population_size=6, generations=3,
+                              rng_service=RNGService(4), callbacks=[writer])
+                algo.evolve()
+                writer.close()
+                with open(path) as f:
+                    if name.endswith('.csv'):
+                        rows = list(csv.DictReader(f))
+                    else:
+                        rows = [json.loads(line) for line in f]
+                self.assertEqual([int(row['generation']) for row in rows], [1, 2, 3])
+            with self.assertRaises(ValueError):
+                TelemetryWriter(os.path.join(tmpdir, 'telemetry.txt'))
+
+if __name__ == '__main__':
+    unittest.main()
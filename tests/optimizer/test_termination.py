@@ -0,0 +1,67 @@
+import unittest
+from modutask.optimizer.my_moo import *
+from helpers import displacement
+
+class TestTermination(unittest.TestCase):
+    def setUp(self):
+        self.encoding = MultiPermutationVariable(items=list(range(6)), n_multi=1)
+
+    def make(self, terminations, generations=200):
+        return NSGAII(displacement, self.encoding, population_size=8, generations=generations,
+                      rng_service=RNGService(8), terminations=terminations)
+
+    def test_generations(self):
+        algo = self.make([], generations=3)
+        algo.evolve()
+        self.assertEqual(algo.generation, 3)
+        self.assertTrue(algo.stop_reason.startswith('generations'))
+
+    def test_max_evaluations(self):
+        algo = self.make([MaxEvaluations(50)])
+        algo.evolve()
+        self.assertEqual(algo.evaluations, 48)  # 初期個体群8 + 5世代 × 8
+        self.assertTrue(algo.stop_reason.startswith('max_evaluations'))
+
+    def test_max_evaluations_with_local_search(self):
+        # 局所探索で評価が増える世代を見込み、上限を超えない
+        local_search = LocalSearch([adjacent_swap()], interval=1, budget=4)
+        algo = NSGAII(displacement, self.encoding, population_size=8, generations=200, rng_service=RNGService(8),
+                      local_search=local_search, terminations=[MaxEvaluations(66)])
+        algo.evolve()
+        self.assertGreater(local_search.evaluations, 0)
+        self.assertLessEqual(algo.evaluations, 66)
+        self.assertTrue(algo.stop_reason.startswith('max_evaluations'))
+
+    def test_max_evaluations_counts_only_true_evaluations(self):
+        # 6要素の順列は重複しやすく、キャッシュヒットは評価回数に数えない
+        evaluator = CachedEvaluator(SerialEvaluator(displacement), self.encoding)
+        algo = NSGAII(displacement, self.encoding, population_size=8, generations=200, rng_service=RNGService(8),
+                      evaluator=evaluator, local_search=LocalSearch([adjacent_swap()], interval=2, budget=4),
+                      terminations=[MaxEvaluations(60)])
+        algo.evolve()
+        self.assertGreater(evaluator.hits, 0)
+        self.assertEqual(algo.evaluations, evaluator.misses)
+        self.assertLessEqual(algo.evaluations, 60)
+        self.assertTrue(algo.stop_reason.startswith('max_evaluations'))
+
+    def test_hypervolume_stagnation(self):
+        algo = self.make([HypervolumeStagnation([40.0, 40.0], window=5, epsilon=1e-9)])
+        algo.evolve()
+        self.assertLess(algo.generation, 200)
+        self.assertTrue(algo.stop_reason.startswith('hv_stagnation'))
+
+    def test_time_limit(self):
+        algo = self.make([TimeLimit(0.0)])
+        algo.evolve()
+        self.assertEqual(algo.generation, 1)
+        self.assertTrue(algo.stop_reason.startswith('time_limit'))
+
+    def test_make_terminations(self):
+        terminations = make_terminations({'hv_window': 10, 'max_evaluations': 100, 'time_limit': 60}, ref_point=[1.0, 1.0])
+        self.assertEqual([type(t) for t in terminations], [HypervolumeStagnation, MaxEvaluations, TimeLimit])
+        self.assertEqual(make_terminations(None), [])
+        with self.assertRaises(ValueError):
+            make_terminations({'hv_window': 10})
+
+if __name__ == '__main__':
+    unittest.main()
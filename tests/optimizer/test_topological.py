@@ -0,0 +1,50 @@
+import unittest
+from modutask.optimizer.my_moo import *
+
+DEPENDENCIES = {'c': ['a'], 'd': ['c', 'b'], 'f': ['e']}
+
+def is_topological(permutation):
+    position = {item: i for i, item in enumerate(permutation)}
+    return all(position[dep] < position[item] for item, deps in DEPENDENCIES.items() for dep in deps)
+
+class TestTopologicalRepair(unittest.TestCase):
+    def setUp(self):
+        self.encoding = TopologicalMultiPermutationVariable(items=list('abcdef'), n_multi=2, dependencies=DEPENDENCIES)
+
+    def test_stable(self):
+        # 依存先の揃っていない要素は最後の依存先の直後にずれ、他の要素の相対順序は保たれる
+        repaired = topological_repair(['d', 'f', 'c', 'b', 'e', 'a'], self.encoding.predecessors, self.encoding.successors)
+        self.assertEqual(repaired, ['b', 'e', 'f', 'a', 'c', 'd'])
+
+    def test_valid_order_unchanged(self):
+        order = ['e', 'a', 'f', 'b', 'c', 'd']
+        self.assertEqual(topological_repair(order, self.encoding.predecessors, self.encoding.successors), order)
+
+    def test_cycle(self):
+        with self.assertRaises(ValueError):
+            TopologicalMultiPermutationVariable(items=['a', 'b'], n_multi=1, dependencies={'a': ['b'], 'b': ['a']})
+
+class TestTopologicalOperators(unittest.TestCase):
+    def setUp(self):
+        self.encoding = TopologicalMultiPermutationVariable(items=list('abcdef'), n_multi=2, dependencies=DEPENDENCIES)
+
+    def test_operators_keep_order(self):
+        with use_rng(RNGService(0).stream(0)):
+            for _ in range(50):
+                parent1, parent2 = self.encoding.sample(), self.encoding.sample()
+                child = self.encoding.crossover(parent1, parent2)
+                mutant = self.encoding.mutate(child)
+                for genome in [parent1, parent2, child, mutant]:
+                    self.assertTrue(self.encoding.validate(genome))
+                    self.assertTrue(all(is_topological(permutation) for permutation in genome))
+
+    def test_validate_rejects_violation(self):
+        self.assertFalse(self.encoding.validate([list('abcdef'), list('dabcef')]))
+
+    def test_repair(self):
+        with use_rng(RNGService(0).stream(0)):
+            repaired = self.encoding.repair([['d', 'c', 'x']])
+        self.assertTrue(self.encoding.validate(repaired))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from modutask.optimizer.my_moo import *
+from modutask.simulator.agent import RobotAgent
+from helpers import make_robot, make_task
+
+class TestTruncatedMultiPermutationVariable(unittest.TestCase):
+    def setUp(self):
+        self.encoding = TruncatedMultiPermutationVariable(items=list(range(20)), n_multi=3, length=4)
+
+    def test_operators_keep_prefix_length(self):
+        with use_rng(RNGService(0).stream(0)):
+            for _ in range(50):
+                parent1, parent2 = self.encoding.sample(), self.encoding.sample()
+                child = self.encoding.crossover(parent1, parent2)
+                mutant = self.encoding.mutate(child)
+                for genome in [parent1, parent2, child, mutant]:
+                    self.assertTrue(self.encoding.validate(genome))
+
+    def test_repair_truncates_full_permutation(self):
+        with use_rng(RNGService(0).stream(0)):
+            repaired = self.encoding.repair([list(range(19, -1, -1)), [3, 3, 99]])
+        self.assertEqual(repaired[0], [19, 18, 17, 16])
+        self.assertEqual(repaired[1][0], 3)
+        self.assertTrue(self.encoding.validate(repaired))
+
+    def test_length_limited_by_items(self):
+        encoding = TruncatedMultiPermutationVariable(items=['a', 'b'], n_multi=1, length=5)
+        with use_rng(RNGService(0).stream(0)):
+            self.assertEqual(sorted(encoding.sample()[0]), ['a', 'b'])
+
+class TestNearestReadyFallback(unittest.TestCase):
+    def setUp(self):
+        self.robot = make_robot('r0', (0.0, 0.0))
+
+    def test_prefix_first(self):
+        tasks = {'far': make_task('far', (9.0, 0.0)), 'near': make_task('near', (1.0, 0.0))}
+        agent = RobotAgent(self.robot, ['far'])
+        agent.update_task(tasks)
+        self.assertIs(agent.assigned_task, tasks['far'])
+        self.assertEqual(agent.frontier, 0)
+
+    def test_nearest_ready_after_prefix(self):
+        done = make_task('done', (0.0, 0.0), completed=1.0)
+        blocker = make_task('blocker', (5.0, 0.0))
+        tasks = {
+            'done': done,
+            'blocked': make_task('blocked', (1.0, 0.0), dependencies=[blocker]),
+            'blocker': blocker,
+            'far': make_task('far', (8.0, 0.0)),
+            }
+        agent = RobotAgent(self.robot, ['done'])
+        agent.update_task(tasks)
+        self.assertIs(agent.assigned_task, blocker)
+        self.assertEqual(agent.frontier, 1)
+
+    def test_no_fallback_when_all_complete(self):
+        tasks = {'done': make_task('done', (0.0, 0.0), completed=1.0)}
+        agent = RobotAgent(self.robot, ['done'])
+        agent.update_task(tasks)
+        self.assertIsNone(agent.assigned_task)
+
+if __name__ == '__main__':
+    unittest.main()
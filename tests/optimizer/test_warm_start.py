@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+import yaml
+from modutask.optimizer.my_moo import *
+from helpers import displacement_and_head
+
+class TestRepair(unittest.TestCase):
+    def test_permutation_keeps_relative_order(self):
+        encoding = PermutationVariable(items=list(range(5)))
+        with use_rng(RNGService(0).stream(0)):
+            repaired = encoding.repair([3, 9, 1, 3, 0])
+        self.assertEqual(repaired[:3], [3, 1, 0])
+        self.assertTrue(encoding.validate(repaired))
+
+    def test_multi_permutation_count(self):
+        encoding = MultiPermutationVariable(items=['a', 'b', 'c'], n_multi=2)
+        with use_rng(RNGService(0).stream(0)):
+            self.assertTrue(encoding.validate(encoding.repair([['c', 'a']])))
+            self.assertEqual(encoding.repair([['c', 'b', 'a'], ['a', 'b', 'c'], ['b', 'a', 'c']]),
+                             [['c', 'b', 'a'], ['a', 'b', 'c']])
+
+    def test_valid_genome_unchanged(self):
+        encoding = MultiPermutationVariable(items=[0, 1, 2], n_multi=1)
+        self.assertEqual(encoding.repair([[2, 0, 1]]), [[2, 0, 1]])
+
+    def test_initialize_repairs_initial_genomes(self):
+        encoding = MultiPermutationVariable(items=list(range(4)), n_multi=1)
+        population = Population.initialize(3, encoding, RNGService(1), initial_genomes=[[[0, 1, 7]]])
+        self.assertEqual(population[0].genome[0][:2], [0, 1])
+        self.assertTrue(all(encoding.validate(ind.genome) for ind in population))
+
+class TestLoadInitialGenomes(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.encoding = MultiPermutationVariable(items=list(range(6)), n_multi=1)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_genome_file(self):
+        path = os.path.join(self.tmp.name, 'genomes.pkl')
+        save_genomes([[[0, 1, 2, 3, 4, 5]], [[5, 4, 3, 2, 1, 0]]], path)
+        self.assertEqual(load_initial_genomes([path]), [[[0, 1, 2, 3, 4, 5]], [[5, 4, 3, 2, 1, 0]]])
+
+    def test_priority_yaml(self):
+        path = os.path.join(self.tmp.name, 'task_priority.yaml')
+        with open(path, 'w') as f:
+            yaml.dump({'robot_001': ['b', 'a'], 'robot_000': ['a', 'b']}, f)
+        self.assertEqual(load_initial_genomes([path], agent_names=['robot_000', 'robot_001', 'robot_002']),
+                         [[['a', 'b'], ['b', 'a'], []]])
+        with self.assertRaises(ValueError):
+            load_initial_genomes([path])
+
+    def test_checkpoint(self):
+        directory = os.path.join(self.tmp.name, 'checkpoint')
+        algo = NSGAII(displacement_and_head, self.encoding, population_size=6, generations=2, rng_service=RNGService(2),
+                      checkpointer=Checkpointer(directory, interval=1))
+        algo.evolve()
+        genomes = load_initial_genomes([directory])
+        self.assertEqual(genomes, [ind.genome for ind in algo.get_result()])
+
+        warm = NSGAII(displacement_and_head, self.encoding, population_size=6, generations=0, rng_service=RNGService(3),
+                      initial_genomes=genomes)
+        self.assertEqual([ind.genome for ind in warm.population], genomes)
+
+if __name__ == '__main__':
+    unittest.main()